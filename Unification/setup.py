@@ -10,8 +10,8 @@ setup(name="symcollab-unification",
         "symcollab-algebra",
         "symcollab-xor",
         # Outside dependencies
+        "numpy~=1.23.5",
         "scipy~=1.9.3",
-        "sympy~=1.11.1",
         "z3-solver~=4.11.2.0"
     ],
 )
@@ -1,8 +1,10 @@
 from typing import Set
 from symcollab.algebra import Equation, SubstituteTerm
 from .unif import unif as syntactic_unif
+from .matching import match
+from .cache import UnificationCache
 
-__all__ = ['unify']
+__all__ = ['unify', 'match', 'UnificationCache']
 
 def unify(equations : Set[Equation], theory = None, rewriteSystem = None) -> Set[SubstituteTerm]:
     """
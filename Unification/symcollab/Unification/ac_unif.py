@@ -11,15 +11,8 @@ To-Do:
 """
 from collections import Counter
 from copy import deepcopy
-from itertools import product, combinations
-from typing import Set, Dict, Tuple, List, Optional
-
-import functools
-
-from sympy.solvers.diophantine.diophantine import diop_linear
-from sympy.core.sorting import default_sort_key
-from sympy import symbols
-import sympy
+from typing import Set, Dict, Iterator, Tuple, List, Optional
+import time
 
 from symcollab.algebra import Equation, get_vars, Variable, SubstituteTerm, Constant, Term, Function
 from symcollab.Unification.common import (
@@ -29,37 +22,6 @@ from symcollab.Unification.unif import unif as syntactic_unification
 from symcollab.Unification.registry import Unification_Algorithms
 
 
-def infinite_sequences(vector_len):
-    """
-    Generate positive instantiations of a vector of a specfied length.
-
-    Ex: infinite_sequences(3)
-    [0, 0, 1], [0, 1, 0], [0, 1, 1], [1, 0, 0]. [1, 0, 1], [1, 1, 0], [1, 1, 1], ...
-    """
-    first_elem = [0 for _ in range(vector_len)]
-    yield first_elem
-    result = [first_elem]
-
-    # All the possible ways to increment a vector
-    # Skip first one since it's [0, 0, 0]
-    incr_vectors = list(product(*(range(2) for _ in range(vector_len))))[1:]
-
-    last_result = result
-
-    while True:
-        next_result = []
-        for last_inst, incr_vector in product(last_result, incr_vectors):
-            # Sum both vectors
-            possible_vector = list(map(sum, zip(last_inst, incr_vector)))
-
-            if possible_vector not in result:
-                yield possible_vector
-                next_result.append(possible_vector)
-
-        result.extend(next_result)
-        last_result = next_result
-
-
 def flatten_term(t: Term, ac_symbol: Function) -> List[Term]:
     """
     Takes a term that's rooted with an ac_symbol and flattens
@@ -138,76 +100,6 @@ def n_fresh_variables(existing_vars: Set[Variable], n: int, prefix: str = "z") -
     return new_vars
 
 
-def valid_subsets(basis_table):
-    """
-    From a basis table solution, find the subset
-    of vectors needed to satisfy the following constraints
-
-    (1) All entries are non-negative with respect to the basis vector
-    (2) The sum of every column is greater than zero
-    """
-    for num_rows in range(len(basis_table)):
-        for c in combinations(basis_table, num_rows):
-            if all(sum(col) > 0 for col in zip(*c)):
-                yield c
-
-
-
-def generate_basis_table(basis_vector):
-    """
-    From a basis vector solution of a diophantine
-    equation, generate a basis table 
-    that satisfy the following constraints.
-
-    (1) All entries are non-negative with respect to the basis vector
-    (2) The sum of every column is greater than zero
-
-    This is implemented as a generator, so you can generate infinite
-    basis tables.
-    """
-    free_symbols = list(functools.reduce(lambda c, n: c.union(n), (x.free_symbols for x in basis_vector)))
-    possible_instantiations = infinite_sequences(len(free_symbols))
-    next(possible_instantiations) # Throw away all zero instantation
-    memory = []
-    basis_table = []
-    while True:
-        finish_generating = False
-        while not finish_generating:
-            # Instantiate free variables until a valid vector is found
-            # Valid is defined as every entry being non-negative with respect to the basis vector.
-            valid = False
-            while not valid:
-                vector = []
-                inst = next(possible_instantiations)
-                for entry in basis_vector:
-                    for var_name, count in zip(free_symbols, inst):
-                        entry = entry.subs(var_name, count)
-                    vector.append(int(entry))
-                # Check validity
-                valid = all((entry >= 0 for entry in vector))
-
-            # Add row to the table
-            basis_table.append(vector)
-
-            # Check to see if table is finished
-            # A table is finished if the sum of every column is greater than 0
-            finish_generating = all(sum(col) > 0 for col in zip(*basis_table))
-        
-        # Yield valid subsets which includes the last row generated
-        # Rationale: Avoid repeat yields
-        # for num_rows in range(len(basis_table[:-1])):
-        #     for c in combinations(basis_table[:-1], num_rows):
-        #         c = [basis_table[-1]] + list(c)
-        #         if all(sum(col) > 0 for col in zip(*c)):
-        #             yield c
-        for num_rows in range(1, len(basis_table)):
-            for c in combinations(basis_table, num_rows):
-                if all(sum(col) > 0 for col in zip(*c)):
-                    set_c = { frozenset(l) for l in c }
-                    if set_c not in memory:
-                        yield c
-                        memory.append(set_c)
-
 def vars_from_equations(U: Set[Equation]):
     """
     Return all variables from a
@@ -220,14 +112,36 @@ def vars_from_equations(U: Set[Equation]):
         ALL_VARS = ALL_VARS.union(LS).union(RS)
     return ALL_VARS
 
-def stickel_method(U: Set[Equation], ac_symbol: Function) -> SubstituteTerm:
+def stickel_method(U: Set[Equation], ac_symbol: Function,
+                   limit: Optional[int] = None,
+                   timeout: Optional[float] = None) -> Iterator[SubstituteTerm]:
     """
-    Convert a set of term equations into a single
-    linear homogeneous diophantine equation
-    and solve it using stickel's method.
-    
-    The current diophantine solver uses Z3.
+    Convert a set of term equations into a system of
+    linear homogeneous diophantine equations, one for
+    every term equation, and solve it using stickel's method.
+
+    The minimal solutions of the system are computed with
+    a native Hilbert basis solver, and unifiers are lazily
+    generated from the subsets of the basis that instantiate
+    every variable, starting with the smallest subsets.
+    Subsets that assign more than one row to a term that isn't
+    a variable can't unify, and neither can their supersets,
+    so those are never tried.
+
+    Parameters
+    ----------
+    U : Set[Equation]
+        The equations to unify.
+    ac_symbol : Function
+        The associative and commutative function.
+    limit : int, optional
+        Stop after generating this many unifiers.
+    timeout : float, optional
+        Stop after this many seconds.
     """
+    # numpy is slow to import, so only load it when solving
+    from symcollab.Unification.diophantine import covering_subsets, hilbert_basis
+
     # Gather all variables for fresh var calculation
     ALL_VARS = vars_from_equations(U)
     original_from_generalized : Dict[Variable, Term] = dict()
@@ -252,74 +166,55 @@ def stickel_method(U: Set[Equation], ac_symbol: Function) -> SubstituteTerm:
                 original_from_generalized[vt] = t
         return vt
 
-    var_count = Counter()
-    # Go through each equation
+    # Multiplicity of every generalized variable in every equation
+    equation_counts: List[Counter] = []
     for e in U:
         LS, RS = flatten_equation(e, ac_symbol)
-        # print("LS", LS)
-        # print("RS", RS)
 
         # Generalize left and right sides
         LS_VARS = [generalize_term(t) for t in LS]
         RS_VARS = [generalize_term(t) for t in RS]
 
-        # Calculate multiplicity
-        VARS_IN_EQ = set(LS_VARS).union(set(RS_VARS))
-        for x in VARS_IN_EQ:
-            num = LS_VARS.count(x) - RS_VARS.count(x)
-            var_count[x] += num
-
-    # Create the equation with variable coeficients
-    # being the counts above
-    sympy_expression = 0
-    var_map: Dict[sympy.core.Symbol, Variable] = dict()
-    for x, count in var_count.items():
-        # Construct Z3 variable
-        sympy_var = symbols(x.symbol + "_0", integer=True, positive=True)
-        var_map[sympy_var] = x
-
-        # Construct part of expression
-        sympy_expression += count * sympy_var
-
-
-    # Determine the ordering of the diophantine solver output
-    sympy_ordering = list(sympy_expression.expand(force=True).free_symbols)
-    sympy_ordering.sort(key=default_sort_key)
-
-    # Solve diophantine equation
-    # print(original_from_generalized)
-    # print(sympy_expression)
-    basis_vector = diop_linear(sympy_expression)
-    basis_tables = generate_basis_table(basis_vector)
-
-    sigma = False
-    while not sigma:
-        # Generate the basis table
-        basis_table = next(basis_tables)
-        # print(basis_table)
+        var_count = Counter(LS_VARS)
+        var_count.subtract(RS_VARS)
+        equation_counts.append(var_count)
+
+    # One column for every generalized variable, in the order they were found
+    columns = list(original_from_generalized)
+    coefficients = [[var_count[x] for x in columns] for var_count in equation_counts]
+    basis = hilbert_basis(coefficients)
+
+    if limit is not None and limit <= 0:
+        return
+    deadline = None if timeout is None else time.monotonic() + timeout
+    exclusive = [
+        column for column, gen_var in enumerate(columns)
+        if not isinstance(original_from_generalized[gen_var], Variable)
+    ]
+    found = 0
+    for subset in covering_subsets(basis, exclusive):
+        if deadline is not None and time.monotonic() >= deadline:
+            return
+        basis_table = basis[list(subset)]
 
         # Create variables representing each row
         row_vars = n_fresh_variables(ALL_VARS, len(basis_table))
-        ALL_VARS = ALL_VARS.union(set(row_vars))
 
         # Craft intermediate substitution from basis table
         sub_basis: Dict[Variable, Term] = dict()
-        for column, sympy_var in enumerate(sympy_ordering):
+        for column, gen_var in enumerate(columns):
             term = None
             for i, row in enumerate(basis_table):
-                if row[column] == 0:
-                    continue
                 row_var = row_vars[i]
                 for _ in range(row[column]):
                     if term is None:
                         term = row_var
                     else: # z_2 + z_4
                         term = ac_symbol(term, row_var)
-            sub_basis[var_map[sympy_var]] = term
+            sub_basis[gen_var] = term
 
-        # [TODO] [IN PROGRESS] Unify variables in the generalized terms with
+        # Unify variables in the generalized terms with
         # their counterparts in the original terms.
-        # print(sub_basis)
         new_eqs = set()
         for gen_var, basis_var in sub_basis.items():
             rhs = original_from_generalized[gen_var]
@@ -328,11 +223,11 @@ def stickel_method(U: Set[Equation], ac_symbol: Function) -> SubstituteTerm:
                 rhs
             ))
         sigma = syntactic_unification(new_eqs)
-
-
-    # Currently returning one posisble unifier but we can keep generating
-    # using the basis vector
-    return {sigma}
+        if sigma:
+            yield sigma
+            found += 1
+            if limit is not None and found >= limit:
+                return
 
 def get_functions(t: Term) -> Set[Function]:
     """Return all function signatures found in a term once each"""
@@ -349,8 +244,14 @@ def get_functions(t: Term) -> Set[Function]:
 #Assumes currently that we have a single AC-symbol
 #need to update to allow other function symbols and cons
 @Unification_Algorithms.register('AC')
-def ac_unify(U: Set[Equation], ac_symbol: Function):
-
+def ac_unify(U: Set[Equation], ac_symbol: Function,
+             limit: Optional[int] = 1, timeout: Optional[float] = None):
+    """
+    Returns a set of AC unifiers of the equations, which
+    by default only has one of them. Use a limit of None
+    for a complete set of unifiers, or see ac_unifiers to
+    generate them one at a time.
+    """
     # Return no unifiers for a set of empty equations
     if len(U) == 0:
         return False # TODO: return set()
@@ -364,6 +265,30 @@ def ac_unify(U: Set[Equation], ac_symbol: Function):
         return False # TODO: return set()
 
     # Send the problem to the diophantine solver
-    delta = stickel_method(U, ac_symbol)
+    delta = stickel_method(U, ac_symbol, limit, timeout)
 
     return set(delta)
+
+def ac_unifiers(U: Set[Equation], ac_symbol: Function,
+                limit: Optional[int] = None,
+                timeout: Optional[float] = None) -> Iterator[SubstituteTerm]:
+    """
+    Lazily generates a complete set of AC unifiers of the equations.
+    A limit or timeout stops the generation early, in which case
+    the unifiers generated so far may not be complete.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> x, y = Variable("x"), Variable("y")
+    >>> a, b = Constant("a"), Constant("b")
+    >>> for sigma in ac_unifiers({Equation(f(x, y), f(a, b))}, f):
+    ...     print(x * sigma, y * sigma)
+    a b
+    b a
+    """
+    U = delete_trivial(U)
+    if len(U) == 0 or occurs_check(U) or function_clash(U):
+        return
+    yield from stickel_method(U, ac_symbol, limit, timeout)
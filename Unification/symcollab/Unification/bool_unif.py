@@ -1,7 +1,5 @@
-import copy
 import functools
 
-from copy import deepcopy
 from symcollab.xor.xorhelper import *
 from .registry import Unification_Algorithms
 
@@ -276,23 +274,17 @@ class BSubstitution:
         return new_terms
 
     def compose(self, other):
-        #modify self.mappings?
-        current = copy.deepcopy(self)
-        current_mappings = current.mappings
-        other_mappings = other.mappings
-
-        already_exists = False
-        for other_mapping in other_mappings:
-            other_domain = other_mapping.domain
-            for current_mapping in current_mappings:
-                if(current_mapping.domain == other_mapping.domain):
-                    if(current_mapping.range == other_mapping.range):
-                        already_exists = True
-                    else:
-                        return (False, current)
-            if(not already_exists):
-                current.mappings.append(other_mapping)
-        return (True, current)
+        #Returns whether the substitutions agree, and their union
+        current = {mapping.domain.name: mapping.range for mapping in self.mappings}
+        new_mappings = list(self.mappings)
+        for other_mapping in other.mappings:
+            current_range = current.get(other_mapping.domain.name)
+            if(current_range is None):
+                current[other_mapping.domain.name] = other_mapping.range
+                new_mappings.append(other_mapping)
+            elif(current_range != other_mapping.range):
+                return (False, BSubstitution(new_mappings))
+        return (True, BSubstitution(new_mappings))
 
     def print(self):
         for mapping in self.mappings:
@@ -321,22 +313,16 @@ def f_depth(t):
                 current_high = high
         return (current_low + 1, current_high + 1)
     elif (type == "Xor_BTerm"):
-        range_low = 0
-        range_high = 0
-        best_low = 0
+        depths = [f_depth(arg) for arg in t.arguments]
+        range_high = max([high for (low, high) in depths], default=0)
+        best_low = max([low for (low, high) in depths], default=0)
+        #check if there is overlap between any two arguments,
+        #regardless of the order they are listed in
         over_lapping = False
-        for arg in t.arguments:
-            (low, high) = f_depth(arg)
-            #check if there is overlap
-            if((high > range_low) and (low < range_high)):
-                over_lapping = True
-            #update things properly
-            if(high > range_high):
-                range_high = high
-            if(low < range_low):
-                range_low = low
-            if(low > best_low):
-                best_low = low
+        for i in range(0, len(depths)):
+            for j in range(0, len(depths)):
+                if((i != j) and (depths[i][1] > 0) and (depths[i][0] < depths[j][1])):
+                    over_lapping = True
         if(over_lapping):
             return (0, range_high)
         else:
@@ -356,188 +342,6 @@ def f_depth(t):
         print("error in f_depth3")
         return None
 
-class Constrained_boolean_term():
-    # b1*f(c1)+b2*f(c2), [b3*c3], [b4*f(c4), f(c4)]
-    def __init__(self, term, disappeared_terms, dup_pairs):
-        self.term = term
-        self.disappeared_terms = disappeared_terms
-        self.dup_pairs = dup_pairs
-
-    def simplify(self):
-        self.term = self.term.simplify()
-
-    def apply_a_subst(self, subst):
-        term = self.term
-        disappeared_terms = self.disappeared_terms
-        dup_pairs = self.dup_pairs
-        new_term = subst.apply_to_term(term)
-        return Constrained_boolean_term(new_term, disappeared_terms, dup_pairs)
-
-    def print(self):
-        print("{", end=" ")
-
-        print(self.term)
-
-        print(" | ", end=" ")
-
-        print("[", end=" ")
-        for dis_term in self.disappeared_terms:
-            print(dis_term)
-        print("]", end=" ")
-
-        print(" | ", end=" ")
-
-        print("[", end=" ")
-        for (left, right) in self.dup_pairs:
-            print(left, right)
-        print("]", end=" ")
-
-        print("}", end=" ")
-
-class Unification_state():
-    def __init__(self, constrained_terms, current_subst):
-        self.constrained_terms = constrained_terms
-        self.current_subst = current_subst
-    def print(self):
-        for t in self.constrained_terms:
-            t.print()
-        print(" | ", end = " ")
-        self.current_subst.print()
-    def simplify(self):
-        new_constrained_terms = []
-        for t in self.constrained_terms:
-            t.simplify()
-            if(t.term != Zero_BTerm()):
-                new_constrained_terms.append(t)
-        self.constrained_terms = new_constrained_terms
-
-    def apply_a_subst(self, subst):
-        constrained_terms = self.constrained_terms
-        current_subst = self.current_subst
-        new_constrained_terms = []
-        for t in constrained_terms:
-            new_constrained_terms.append(t.apply_a_subst(subst))
-        return Unification_state(new_constrained_terms, current_subst)
-
-def disappear(state):
-    #Takes a unification state, applies the disappear rule, and returns the new state
-    #It focuses on the first constrained term.
-    constrained_terms = state.constrained_terms
-    current_subst = state.current_subst
-
-    first_term = constrained_terms[0]
-    term = first_term.term
-    disappeared_terms = first_term.disappeared_terms
-    dup_pairs = first_term.dup_pairs
-
-    state2 = copy.deepcopy(state)
-    constrained_terms2 = state2.constrained_terms
-    current_subst2 = state2.current_subst
-
-    first_term2 = constrained_terms2[0]
-    term2 = first_term2.term
-    disappeared_terms2 = first_term2.disappeared_terms
-    dup_pairs2 = first_term2.dup_pairs
-
-    term_type = term.get_type()
-    if(term_type == "Mul_BTerm"):
-        left = term.left
-        right = term.right
-
-        if(left.get_type() == "Variable_BTerm"):
-            b_var = left
-            #b_term = right
-        elif(right.get_type() == "Variable_BTerm"):
-            b_var = right
-            #b_term = left
-        else:
-            print("error1 while applying the disappear rule")
-            return (False, state, state)
-
-        allowed = True
-        for disappeared_term in disappeared_terms:
-            if(term == disappeared_term):
-                allowed = False
-        if(allowed):
-            del constrained_terms[0]
-
-            new_subst = BSubstitution([BMapping(b_var, Zero_BTerm())])
-            (flag, return_subst) = current_subst.compose(new_subst)
-            return_state1 = Unification_state(constrained_terms, return_subst)
-            return_state1 = return_state1.apply_a_subst(new_subst)
-            return_state1.simplify()
-
-            disappeared_terms2.append(term2)
-            new_first_term = Constrained_boolean_term(term2, disappeared_terms2, dup_pairs2)
-            del constrained_terms2[0]
-            constrained_terms2.append(new_first_term)
-            return_state2 = Unification_state(constrained_terms2, current_subst2)
-
-            return (True, return_state1, return_state2)
-
-    if(term_type == "Xor_BTerm"):
-        #Find an allowed mul-term
-        #If there isn't any, return false
-        arguments = term.arguments
-
-        found_one = False
-        for argument in arguments:
-            if(argument.get_type() == "Mul_BTerm"):
-                allowed = True
-                for disappeared_term in disappeared_terms:
-                    if (argument == disappeared_term):
-                        allowed = False
-                if(allowed):
-                    found_one = True
-                    mul_term = argument
-                    break
-
-        if(not found_one):
-            return (False, state, state)
-
-        #get a multerm
-        left = mul_term.left
-        right = mul_term.right
-
-        if (left.get_type() == "Variable_BTerm"):
-            b_var = left
-            # b_term = right
-        elif (right.get_type() == "Variable_BTerm"):
-            b_var = right
-            # b_term = left
-        else:
-            print("error2 while applying the disappear rule")
-            return (False, state, state)
-
-        new_subst = BSubstitution([BMapping(b_var, Zero_BTerm())])
-        (flag, return_subst) = current_subst.compose(new_subst)
-
-        arguments = list(arguments)
-        arguments.remove(mul_term)
-        if(len(arguments) == 1):
-            new_term = arguments[0]
-        else:
-            new_term = Xor_BTerm(arguments)
-        new_first_term = Constrained_boolean_term(new_term, disappeared_terms, dup_pairs)
-
-        del constrained_terms[0]
-        constrained_terms.append(new_first_term)
-        #disappeared_terms.append(mul_term)
-
-        return_state1 = Unification_state(constrained_terms, return_subst)
-        return_state1 = return_state1.apply_a_subst(new_subst)
-        return_state1.simplify()
-
-        disappeared_terms2.append(mul_term)
-        new_first_term = Constrained_boolean_term(term2, disappeared_terms2, dup_pairs2)
-        del constrained_terms2[0]
-        constrained_terms2.append(new_first_term)
-        return_state2 = Unification_state(constrained_terms2, current_subst2)
-
-        return (True, return_state1, return_state2)
-
-    return (False, state, state)
-
 def get_real_term(t):
     type = t.get_type()
     if(type != "Mul_BTerm"):
@@ -564,196 +368,287 @@ def get_coefficient(t):
         else:
             return (True, right)
 
-def constant_or_function(t1, t2):
-    #returns true or false
-    #t1: c, t2: c ==> true
-    #t1: f(c1), t2: f(c2) ==> true
-    #t1: b*c, t2: c ==> true
-    #t1: b*f(c1), t2: f(c2) ==> true
-    #t1: c, t2: b*f(c) ==> false
-
-    real_term1 = get_real_term(t1)
-    real_term2 = get_real_term(t2)
-    type1 = real_term1.get_type()
-    type2 = real_term2.get_type()
-
-    if(type1 == type2):
-        if(type1 == "Constant_BTerm"):
-            return (real_term1 == real_term2)
-        if(type1 == "BFuncTerm"):
-            return True
-        return False
+# Atoms of the algebraic normal form. Function atoms also hold their symbol,
+# arity and arguments, and the constant 1 is the atom of a bare monomial.
+_ONE = ("1",)
+
+class ANF:
+    """
+    A Boolean term in algebraic normal form over GF(2): the exclusive or
+    of summands, each of which is a monomial of Boolean variables times an
+    atom (a constant, a variable of the protocol or a function applied to
+    terms in algebraic normal form). Monomials are bitmasks over the
+    Boolean variables, so multiplying monomials is or-ing their masks, and
+    the exclusive or of two terms is the symmetric difference of their
+    summands. Summands keep the order they were added in, which decides
+    the order that Boolean unification tries them in, but two terms are
+    equal whenever they have the same summands.
+    """
+    __slots__ = ("summands", "variables", "_key")
+
+    def __init__(self, summands=()):
+        # Summands that appear twice cancel out
+        toggled = dict()
+        for s in summands:
+            if s in toggled:
+                del toggled[s]
+            else:
+                toggled[s] = None
+        self.summands = tuple(toggled)
+        self._key = frozenset(self.summands)
+        # All the Boolean variables in the term, including under functions
+        variables = 0
+        for mask, atom in self.summands:
+            variables |= mask
+            if atom[0] == "f":
+                for arg in atom[3]:
+                    variables |= arg.variables
+        self.variables = variables
 
-    return False
+    def __eq__(self, x):
+        return isinstance(x, ANF) and self._key == x._key
 
-def duplicate(state):
-    constrained_terms = state.constrained_terms
-    current_subst = state.current_subst
+    def __hash__(self):
+        return hash(self._key)
+
+    def __len__(self):
+        return len(self.summands)
 
-    first_constrained_term = constrained_terms[0]
-    term = first_constrained_term.term
-    disappeared_terms = first_constrained_term.disappeared_terms
-    dup_pairs = first_constrained_term.dup_pairs
+    def __xor__(self, other):
+        return ANF(self.summands + other.summands)
+
+    def __repr__(self):
+        if not self.summands:
+            return "0"
+        return " xor ".join(_summand_repr(s) for s in self.summands)
+
+    def assign(self, assigned, values):
+        """
+        Substitutes 0 or 1 for the Boolean variables in the assigned mask,
+        with 1 for those that are also in the values mask.
+        """
+        if not self.variables & assigned:
+            return self
+        zeros = assigned & ~values
+        summands = []
+        for mask, atom in self.summands:
+            if mask & zeros:
+                continue
+            if atom[0] == "f":
+                atom = atom[:3] + (tuple(arg.assign(assigned, values) for arg in atom[3]),)
+            summands.append((mask & ~assigned, atom))
+        return ANF(summands)
+
+def _summand_repr(summand):
+    mask, atom = summand
+    if atom[0] == "f":
+        atom_repr = atom[1] + "(" + ", ".join(map(repr, atom[3])) + ")"
+    else:
+        atom_repr = atom[-1]
+    monomial = []
+    i = 0
+    while mask >> i:
+        if mask >> i & 1:
+            monomial.append("b[" + str(i) + "]")
+        i = i + 1
+    return "*".join(monomial + ([atom_repr] if atom != _ONE or not monomial else []))
+
+def to_anf(t, variables):
+    """
+    Converts a BTerm to algebraic normal form. The variables dictionary
+    gives the bit of every Boolean variable by name, and new Boolean
+    variables are added to it.
+    """
+    type = t.get_type()
+    if type == "Zero_BTerm":
+        return ANF()
+    if type == "One_BTerm":
+        return ANF([(0, _ONE)])
+    if type == "Constant_BTerm":
+        return ANF([(0, ("c", t.name))])
+    if type == "Var_BTerm":
+        return ANF([(0, ("v", t.name))])
+    if type == "Variable_BTerm":
+        bit = variables.setdefault(t.name, len(variables))
+        return ANF([(1 << bit, _ONE)])
+    if type == "BFuncTerm":
+        args = tuple(to_anf(arg, variables) for arg in t.arguments)
+        return ANF([(0, ("f", t.function.symbol, t.function.arity, args))])
+    if type == "Xor_BTerm":
+        summands = []
+        for arg in t.arguments:
+            summands.extend(to_anf(arg, variables).summands)
+        return ANF(summands)
+    if type == "Mul_BTerm":
+        left = to_anf(t.left, variables)
+        right = to_anf(t.right, variables)
+        if any(atom != _ONE for _, atom in left.summands):
+            left, right = right, left
+        if any(atom != _ONE for _, atom in left.summands):
+            raise ValueError("Only products with a Boolean variable are supported")
+        return ANF([(m1 | m2, atom) for m1, _ in left.summands for m2, atom in right.summands])
+    raise ValueError("Unknown Boolean term " + repr(t))
+
+class Constrained_boolean_term():
+    # b1*f(c1)+b2*f(c2), [b3*c3], [b4*f(c4), f(c4)]
+    # A term that has to become 0, along with the summands that may not disappear
+    # and the pairs of summands that may not cancel each other out
+    __slots__ = ("term", "disappeared_terms", "dup_pairs")
 
-    state2 = copy.deepcopy(state)
-    constrained_terms2 = state2.constrained_terms
-    current_subst2 = state2.current_subst
+    def __init__(self, term, disappeared_terms=frozenset(), dup_pairs=frozenset()):
+        self.term = term
+        self.disappeared_terms = disappeared_terms
+        self.dup_pairs = dup_pairs
+
+    def apply_a_subst(self, assigned, values):
+        return Constrained_boolean_term(self.term.assign(assigned, values), self.disappeared_terms, self.dup_pairs)
+
+    def print(self):
+        print("{", self.term, "|", list(self.disappeared_terms), "|", [tuple(p) for p in self.dup_pairs], "}", end=" ")
+
+class Unification_state():
+    # States are never changed, so the branches of the search share them
+    __slots__ = ("constrained_terms", "assigned", "values", "order")
+
+    def __init__(self, constrained_terms, assigned=0, values=0, order=()):
+        # Terms that became 0 are solved
+        self.constrained_terms = tuple(t for t in constrained_terms if len(t.term) != 0)
+        # Masks of the Boolean variables that have a value, and of those that are 1
+        self.assigned = assigned
+        self.values = values
+        # The bits of the assigned variables in the order they were assigned
+        self.order = order
+
+    def print(self):
+        for t in self.constrained_terms:
+            t.print()
+        print(" | ", self.order)
+
+    def apply_a_subst(self, constrained_terms, assigned, values):
+        """
+        Returns the state with the given constrained terms,
+        after assigning more Boolean variables.
+        """
+        new_bits = assigned & ~self.assigned
+        order = self.order
+        bit = 0
+        while new_bits >> bit:
+            if new_bits >> bit & 1:
+                order = order + (bit,)
+            bit = bit + 1
+        return Unification_state(
+            [t.apply_a_subst(assigned, values) for t in constrained_terms],
+            self.assigned | assigned, self.values | values, order
+        )
 
-    first_constrained_term2 = constrained_terms2[0]
-    term2 = first_constrained_term2.term
-    disappeared_terms2 = first_constrained_term2.disappeared_terms
-    dup_pairs2 = first_constrained_term2.dup_pairs
+def disappear(state):
+    #Takes a unification state, applies the disappear rule, and returns the new states
+    #It focuses on the first constrained term: a summand with a Boolean coefficient
+    #either becomes 0, or is marked so that it never does.
+    first_term = state.constrained_terms[0]
+    rest = state.constrained_terms[1:]
+    disappeared_terms = first_term.disappeared_terms
 
-    term_type = term.get_type()
-    if(term_type != "Xor_BTerm"):
+    for summand in first_term.term.summands:
+        mask = summand[0]
+        if mask != 0 and summand not in disappeared_terms:
+            break
+    else:
         return (False, state, state)
 
-    found = False
-    arguments = term.arguments
-    first_summand = arguments[0]
-    for i in range(1, len(arguments)):
-        if(constant_or_function(first_summand, arguments[i])):
-            first = first_summand
-            second = arguments[i]
-
-            allowed = True
-            for dup_pair in dup_pairs:
-                (fst, snd) = dup_pair
-                if((first == fst and second == snd) or (first == snd and second == fst)):
-                    allowed = False
-                    break
-
-            if(allowed):
-                found = True
-                break
-
-    if(not found):
+    # The first Boolean variable of the coefficient is 0
+    b_var = mask & -mask
+    remaining = ANF(s for s in first_term.term.summands if s != summand)
+    new_first_term = Constrained_boolean_term(remaining, disappeared_terms, first_term.dup_pairs)
+    state1 = state.apply_a_subst(rest + (new_first_term,), b_var, 0)
+
+    new_first_term = Constrained_boolean_term(first_term.term, disappeared_terms | {summand}, first_term.dup_pairs)
+    state2 = Unification_state(rest + (new_first_term,), state.assigned, state.values, state.order)
+    return (True, state1, state2)
+
+def _duplicable(summand1, summand2):
+    #Whether two summands can cancel each other out:
+    #the same constant, or the same function symbol
+    atom1 = summand1[1]
+    atom2 = summand2[1]
+    if atom1[0] != atom2[0]:
+        return False
+    if atom1[0] == "c":
+        return atom1 == atom2
+    if atom1[0] == "f":
+        return atom1[1:3] == atom2[1:3]
+    return False
+
+def duplicate(state):
+    #Takes a unification state, applies the duplicate rule, and returns the new states
+    #The first summand of the first constrained term either cancels out with another
+    #summand, by setting their coefficients to 1, or is marked so that it never does.
+    first_term = state.constrained_terms[0]
+    rest = state.constrained_terms[1:]
+    summands = first_term.term.summands
+    dup_pairs = first_term.dup_pairs
+    if len(summands) < 2:
         return (False, state, state)
 
-    #found "first" and "second"
-    t1 = get_real_term(first)
-    (flag1, b1) = get_coefficient(first)
-    t2 = get_real_term(second)
-    (flag2, b2) = get_coefficient(second)
-    if(t1.get_type() == "Constant_BTerm" or t1.get_type() == "BFuncTerm"):
-        #construct a new first_constrained_term
-        arguments = list(term.arguments)
-        arguments.remove(first)
-        arguments.remove(second)
-        if(len(arguments) == 0):
-            new_term = Zero_BTerm
-        elif(len(arguments) == 1):
-            new_term = arguments[0]
-        else:
-            new_term = Xor_BTerm(arguments)
-
-        #construct a new boolean substitution
-        list_of_mappings = []
-        if(flag1):
-            mapping1 = BMapping(b1, One_BTerm())
-            list_of_mappings.append(mapping1)
-        if(flag2):
-            mapping2 = BMapping(b2, One_BTerm())
-            list_of_mappings.append(mapping2)
-        new_subst = BSubstitution(list_of_mappings)
-
-        new_first_constrained_term = Constrained_boolean_term(new_term, disappeared_terms, dup_pairs)
-        del constrained_terms[0]
-        if(len(arguments) != 0):
-            constrained_terms.append(new_first_constrained_term)
-
-        if(t1.get_type() == "BFuncTerm"):
-            #construct decomposed_constrained_term
-
-            #assuming that f is of arity 1
-            decomposed_term = (Xor_BTerm([t1.arguments[0], t2.arguments[0]])).simplify()
-
-            decomposed_constrained_term = Constrained_boolean_term(decomposed_term, [], [])
-            constrained_terms.append(decomposed_constrained_term)
-
-        (flag, return_subst) = current_subst.compose(new_subst)
-        return_state1 = Unification_state(constrained_terms, return_subst)
-        return_state1 = return_state1.apply_a_subst(new_subst)
-        return_state1.simplify()
-
-        dup_pairs2.append((first, second))
-        new_first_constrained_term = Constrained_boolean_term(term2, disappeared_terms2, dup_pairs2)
-        del constrained_terms2[0]
-        constrained_terms2.append(new_first_constrained_term)
-        return_state2 = Unification_state(constrained_terms2, current_subst2)
-
-        return (True, return_state1, return_state2)
+    first = summands[0]
+    for second in summands[1:]:
+        if _duplicable(first, second) and frozenset((first, second)) not in dup_pairs:
+            break
     else:
-        print("error in duplicate function")
+        return (False, state, state)
+
+    remaining = ANF(s for s in summands if s != first and s != second)
+    new_terms = rest + (Constrained_boolean_term(remaining, first_term.disappeared_terms, dup_pairs),)
+    if first[1][0] == "f":
+        #The arguments of the two functions have to be equal
+        new_terms = new_terms + tuple(
+            Constrained_boolean_term(arg1 ^ arg2)
+            for arg1, arg2 in zip(first[1][3], second[1][3])
+        )
+    ones = first[0] | second[0]
+    state1 = state.apply_a_subst(new_terms, ones, ones)
+
+    new_first_term = Constrained_boolean_term(first_term.term, first_term.disappeared_terms, dup_pairs | {frozenset((first, second))})
+    state2 = Unification_state(rest + (new_first_term,), state.assigned, state.values, state.order)
+    return (True, state1, state2)
 
 def b_unify(state):
     #This is a helper function.
-    state.simplify()
-    constrained_terms = state.constrained_terms
-    current_subst = state.current_subst
-
-    if(constrained_terms == []):
-        return (True, [current_subst])
+    #Returns whether the state has solutions, and the states they're in.
+    if(state.constrained_terms == ()):
+        return (True, [state])
 
     (flag, s1, s2) = disappear(state)
-    if(flag):
-        (flag1, result1) = b_unify(s1)
-        (flag2, result2) = b_unify(s2)
-        flag3 = flag1 or flag2
-        result3 = []
-        if(flag1):
-            result3 = result3 + result1
-        if (flag2):
-            result3 = result3 + result2
-        return (flag3, result3)
-
-    (flag, s1, s2) = duplicate(state)
-    if (flag):
-        (flag1, result1) = b_unify(s1)
-        (flag2, result2) = b_unify(s2)
-        flag3 = flag1 or flag2
-        result3 = []
-        if (flag1):
-            result3 = result3 + result1
-        if (flag2):
-            result3 = result3 + result2
-        return (flag3, result3)
-
-    return (False, [])
+    if(not flag):
+        (flag, s1, s2) = duplicate(state)
+    if(not flag):
+        return (False, [])
+
+    (flag1, result1) = b_unify(s1)
+    (flag2, result2) = b_unify(s2)
+    return (flag1 or flag2, result1 + result2)
 
 @Unification_Algorithms.register("Boolean")
 def Boolean_unify(term1, term2):
-    new_term = Xor_BTerm([term1, term2])
-    new_term = new_term.simplify()
-    c_term = Constrained_boolean_term(new_term, [], [])
-    subst = BSubstitution([])
-    s = Unification_state([c_term], subst)
+    variables = dict()
+    new_term = to_anf(term1, variables) ^ to_anf(term2, variables)
+    s = Unification_state([Constrained_boolean_term(new_term)])
     (flag, solutions) = b_unify(s)
     if(flag):
         solutions = refine_solutions(solutions)
+        names = {bit: name for name, bit in variables.items()}
+        solutions = [
+            BSubstitution([
+                BMapping(Variable_BTerm(names[bit]), One_BTerm() if sol.values >> bit & 1 else Zero_BTerm())
+                for bit in sol.order
+            ])
+            for sol in solutions
+        ]
     return (flag, solutions)
 
 def refine_solutions(solutions):
-    def same_solution(sol1, sol2):
-        (flag, sol3) = sol1.compose(sol2)
-        return (flag and len(sol1.mappings) == len(sol2.mappings) and len(sol2.mappings) == len(sol3.mappings))
-    new_solutions = []
+    #Removes the solved states that assign the same values
+    new_solutions = dict()
     for sol in solutions:
-        no_dup = True
-        for new_sol in new_solutions:
-            if(same_solution(sol, new_sol)):
-                no_dup = False
-        if(no_dup):
-            new_solutions.append(sol)
-    return new_solutions
-
-
-
-
-
-
-
-
-
-
-
+        new_solutions.setdefault((sol.assigned, sol.values), sol)
+    return list(new_solutions.values())
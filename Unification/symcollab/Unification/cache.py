@@ -0,0 +1,245 @@
+"""
+Memoization of unification algorithms.
+
+The same unification problems come up repeatedly up to a renaming
+of their variables, for example when a chaining function is unrolled
+over several sessions. A UnificationCache recognizes a problem it has
+already solved under a different naming of the variables and maps the
+stored unifiers onto the variables of the new problem.
+"""
+from collections import OrderedDict
+from functools import update_wrapper
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+from symcollab.algebra import Equation, Function, FuncTerm, SubstituteTerm, Term, Variable, fold
+
+__all__ = ['UnificationCache']
+
+class UnificationCache:
+    """
+    Wraps a unification algorithm with a least recently used
+    cache of its results.
+
+    Problems are compared up to a renaming of their variables that
+    keeps the order of the variable names, since some algorithms such
+    as p_unif decide which variable to solve first by its name. Sets of
+    equations are compared regardless of the order they are listed in.
+    The arguments can be terms, equations, constraints given as a
+    dictionary from variables to lists of terms, and any nesting of
+    lists, tuples, sets and dictionaries of those. Other arguments,
+    such as a function symbol, have to be equal for the cache to hit.
+
+    When the algorithm is a class, such as XOR_rooted_security, calling
+    the cache returns an object whose solve method is cached instead.
+
+    Some algorithms introduce variables of their own, such as the names
+    that xor_unification gives to xor terms. A result with such variables
+    is only cached when fresh_variable is given, and every time it is
+    reused those variables are replaced by new ones from fresh_variable.
+
+    Parameters
+    ----------
+    algorithm : Callable
+        The unification algorithm to cache.
+    maxsize : int
+        The number of problems to remember.
+    fresh_variable : Optional[Callable[[Variable], Variable]]
+        Returns a variable that hasn't been used yet
+        to replace the given variable introduced by the algorithm.
+
+    Attributes
+    ----------
+    hits : int
+        The number of problems that were answered from the cache.
+    misses : int
+        The number of problems that were given to the algorithm.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> from symcollab.Unification import UnificationCache
+    >>> from symcollab.Unification.unif import unif
+    >>> f = Function("f", 2)
+    >>> x, y, z = Variable("x"), Variable("y"), Variable("z")
+    >>> a = Constant("a")
+    >>> cached_unif = UnificationCache(unif)
+    >>> print(cached_unif({Equation(f(x, a), f(a, y))}))
+    {
+    x ↦ a,
+    y ↦ a
+    }
+    >>> print(cached_unif({Equation(f(y, a), f(a, z))}))
+    {
+    y ↦ a,
+    z ↦ a
+    }
+    >>> cached_unif.hits, cached_unif.misses
+    (1, 1)
+    """
+    def __init__(self, algorithm: Callable, maxsize: int = 1024,
+                 fresh_variable: Optional[Callable[[Variable], Variable]] = None):
+        if maxsize < 1:
+            raise ValueError("The cache must hold at least one problem")
+        update_wrapper(self, algorithm, updated=())
+        self.maxsize = maxsize
+        self.fresh_variable = fresh_variable
+        self.hits = 0
+        self.misses = 0
+        # Maps a canonical problem to its result, the variables of the problem in order
+        # and the variables that the algorithm introduced in the result
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, List[Variable], List[Variable]]]' = OrderedDict()
+
+    def __call__(self, *args):
+        if isinstance(self.__wrapped__, type):
+            return _CachedProblem(self, args)
+        return self._lookup(args, lambda: self.__wrapped__(*args))
+
+    def _lookup(self, args: Tuple[Any, ...], solve: Callable[[], Any]) -> Any:
+        """Returns the cached result for args, or calls solve and caches its result."""
+        try:
+            key, variables = _canonical_problem(args)
+            entry = self._entries.get(key)
+        except TypeError:
+            # The problem has an argument that the cache doesn't know how to rename
+            self.misses += 1
+            return solve()
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            result, cached_variables, introduced = entry
+            renaming = dict(zip(cached_variables, variables))
+            for v in introduced:
+                renaming[v] = self.fresh_variable(v)
+            return _rename(result, renaming)
+        self.misses += 1
+        result = solve()
+        found: Set[Variable] = set()
+        _collect_variables(result, found)
+        introduced = sorted(found.difference(variables), key=_variable_order)
+        if introduced and self.fresh_variable is None:
+            # Handing out the same variables twice would relate unrelated results
+            return result
+        # Keep a copy so that changes made by the caller don't reach the cache
+        self._entries[key] = (_rename(result, dict()), variables, introduced)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        """Forget every cached problem and reset the statistics."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"UnificationCache({self.__wrapped__.__name__}, hits={self.hits}, " \
+               f"misses={self.misses}, size={len(self)}/{self.maxsize})"
+
+
+class _CachedProblem:
+    """A problem given to a cached class whose solve method is cached."""
+    def __init__(self, cache: UnificationCache, args: Tuple[Any, ...]):
+        self.cache = cache
+        self.args = args
+
+    def solve(self):
+        return self.cache._lookup(self.args, lambda: self.cache.__wrapped__(*self.args).solve())
+
+
+def _variable_order(v: Variable) -> Tuple[str, str]:
+    return (v.symbol, str(v.sort))
+
+def _canonical_problem(args: Tuple[Any, ...]) -> Tuple[Hashable, List[Variable]]:
+    """
+    Returns a key that is the same for two problems that are equal
+    up to an order-preserving renaming of their variables,
+    along with the variables of the problem in that order.
+    """
+    found: Set[Variable] = set()
+    _collect_variables(args, found)
+    variables = sorted(found, key=_variable_order)
+    ranks = {v: i for i, v in enumerate(variables)}
+    return _encode(args, ranks), variables
+
+def _collect_variables(value: Any, found: Set[Variable]):
+    if isinstance(value, (Variable, FuncTerm)):
+        fold(value, lambda t, _: found.add(t) if isinstance(t, Variable) else None)
+    elif isinstance(value, Equation):
+        _collect_variables(value.left_side, found)
+        _collect_variables(value.right_side, found)
+    elif isinstance(value, SubstituteTerm):
+        for v, t in value.subs:
+            found.add(v)
+            _collect_variables(t, found)
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            _collect_variables(k, found)
+            _collect_variables(v, found)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for v in value:
+            _collect_variables(v, found)
+    elif hasattr(value, 'contents'):
+        # The Equations and Disequations of the xor library
+        _collect_variables(value.contents, found)
+
+def _encode_term(t: Term, ranks: Dict[Variable, int]) -> Hashable:
+    """
+    Encodes a term as a flat tuple of nodes, so that the key stays
+    linear in the size of a term that shares its subterms.
+    """
+    ids: Dict[Hashable, int] = dict()
+    nodes: List[Hashable] = []
+    def add_node(s: Term, child_ids: Tuple[int, ...]) -> int:
+        node = ('v', ranks[s], s.sort) if isinstance(s, Variable) else (s.function, child_ids)
+        node_id = ids.get(node)
+        if node_id is None:
+            node_id = len(nodes)
+            ids[node] = node_id
+            nodes.append(node)
+        return node_id
+    fold(t, add_node)
+    return ('term', tuple(nodes))
+
+def _encode(value: Any, ranks: Dict[Variable, int]) -> Hashable:
+    if isinstance(value, (Variable, FuncTerm)):
+        return _encode_term(value, ranks)
+    if isinstance(value, Equation):
+        return ('=', _encode(value.left_side, ranks), _encode(value.right_side, ranks))
+    if isinstance(value, dict):
+        return ('dict', tuple((_encode(k, ranks), _encode(v, ranks)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_encode(v, ranks) for v in value))
+    if isinstance(value, (set, frozenset)):
+        # Sort the encodings so that the order of iteration doesn't matter
+        return ('set', tuple(sorted((_encode(v, ranks) for v in value), key=repr)))
+    if hasattr(value, 'contents'):
+        return (type(value).__qualname__, _encode(value.contents, ranks))
+    if value is None or isinstance(value, (bool, int, str, Function)):
+        return ('value', value)
+    raise TypeError(f"Cannot cache an argument of type {type(value).__name__}")
+
+def _rename(value: Any, renaming: Dict[Variable, Variable]) -> Any:
+    """Copies a result with the variables renamed."""
+    if isinstance(value, SubstituteTerm):
+        sigma = SubstituteTerm()
+        for v, t in zip(value.domain(), value.range()):
+            sigma.add(_rename(v, renaming), _rename(t, renaming))
+        return sigma
+    if isinstance(value, (Variable, FuncTerm)):
+        if not renaming:
+            return value
+        return value * _renaming_substitution(renaming)
+    if isinstance(value, Equation):
+        return Equation(_rename(value.left_side, renaming), _rename(value.right_side, renaming))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return type(value)(_rename(v, renaming) for v in value)
+    return value
+
+def _renaming_substitution(renaming: Dict[Variable, Variable]) -> SubstituteTerm:
+    sigma = SubstituteTerm()
+    for v, w in renaming.items():
+        if v != w:
+            sigma.add(v, w)
+    return sigma
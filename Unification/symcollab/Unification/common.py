@@ -1,10 +1,11 @@
 """
 Common rules used in Unification algorithms
 """
-from typing import Optional, Set, Tuple
+from typing import Optional, Set, Tuple, Union
 
 from symcollab.algebra import (
-    Constant, Equation, FuncTerm, get_vars, SubstituteTerm, Term, Variable
+    Constant, Equation, FuncTerm, get_vars, SubstituteTerm, Term,
+    TriangularSubstitution, Variable
 )
 
 __all__ = [
@@ -136,8 +137,8 @@ def orient(equations: Set[Equation]) -> Set[Equation]:
 
 def eliminate(
     equations: Set[Equation],
-    sigma: SubstituteTerm
-    ) -> Tuple[Set[Equation], SubstituteTerm]:
+    sigma: Union[SubstituteTerm, TriangularSubstitution]
+    ) -> Tuple[Set[Equation], Union[SubstituteTerm, TriangularSubstitution]]:
     """
     Eliminate Rule
 
@@ -146,6 +147,9 @@ def eliminate(
 
     Returns original equations and sigma
     if the rule cannot be matched.
+
+    When sigma is a TriangularSubstitution, the composition
+    only records the new binding and S{x↦t} is not computed.
     """
     matched_equation: Optional[Equation] = None
 
@@ -348,9 +348,10 @@ def summands(t):
     #Given a term, return the list of all summands
     #Example: xor(a, b, c) ==> [a, b, c], f(a) ==> [f(a)]
     if(isinstance(t, FuncTerm) and isinstance(t.function, Xor)):
-        first = t._arguments[0]
-        second = t._arguments[1]
-        return summands(first) + summands(second)
+        result = []
+        for arg in t._arguments:
+            result = result + summands(arg)
+        return result
     else:
         return [t]
 
@@ -111,13 +111,12 @@ def simplify_a_term(t):
             new_args.append(new_arg)
         return FuncTerm(t.function, new_args)
     elif(isinstance(t, FuncTerm) and t.function.symbol == "xor"):
+        #xor flattens the simplified summands and cancels them out
         new_args = []
-        term_list = xor_to_list(t)
-        for arg in term_list:
+        for arg in t.arguments:
             new_arg = simplify_a_term(arg)
             new_args.append(new_arg)
-        simplified_args = simplify(new_args)
-        return list_to_xor(simplified_args)
+        return xor(*new_args)
 
 def get_bad_subterms(subst, v, t, p_unif_problem):
     #Take a variable, a term, a P unification problem
@@ -294,10 +293,12 @@ def fix_subst(subst, p):
     #print(p.constraints)
     #print("Here are the disequations:")
     #print(p.disequations)
+    #subst is a TriangularSubstitution, so the unifiers are composed lazily
+    #and only the p-unifiers that are found get resolved and simplified
     bad_var_term_pairs = get_all_bad_subterms(subst, p)
     if(bad_var_term_pairs == []):
         #print("I found a p-unifier.")
-        return [subst]        #found a p unifier
+        return [simplify_substitution(subst)]        #found a p unifier
     else:
         eq = make_a_decision(bad_var_term_pairs, p)
 
@@ -322,16 +323,15 @@ def fix_subst(subst, p):
 
         result = []
         for unifier in unifiers:
-            subst2 = deepcopy(subst)
             p2 = deepcopy(p)
             add_disequation_to_p(diseq, p2)
 
+            #composing doesn't change subst, so both branches can share it
             new_subst = subst * unifier
-            new_subst = simplify_substitution(new_subst)
             new_p = instantiate_a_problem(p, unifier)
 
             res1 = fix_subst(new_subst, new_p)
-            res2 = fix_subst(subst2, p2)
+            res2 = fix_subst(subst, p2)
             result = result + res1
             result = result + res2
         return result
@@ -345,7 +345,7 @@ def p_unif(eqs, constraints):
     xor_unifiers = xor_unification(eqs)
     p_unifiers = []
     for xor_unifier in xor_unifiers:
-        new_p_unifiers = fix_subst(xor_unifier, p_unif_problem)
+        new_p_unifiers = fix_subst(TriangularSubstitution() * xor_unifier, p_unif_problem)
         p_unifiers = p_unifiers + new_p_unifiers
     return p_unifiers
 
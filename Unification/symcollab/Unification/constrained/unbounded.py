@@ -109,7 +109,7 @@ class OmegaSubstituteTerm(SubstituteTerm):
     def __mul__(self, theta):
         subst = super().__mul__(theta)
         omega_substitution = OmegaSubstituteTerm(self.omega_superscript)
-        omega_substitution.subs = subst
+        omega_substitution.subs = subst.subs
         return omega_substitution
 
 class Unification_state():
@@ -229,10 +229,7 @@ def test1():
     sigma2 = SubstituteTerm()
     sigma2.add(C1, c)
     print(sigma1 * sigma2)
-    
 
 
-
-
-test1()
-
+if __name__ == "__main__":
+    test1()
@@ -0,0 +1,129 @@
+"""
+Solver for systems of linear homogeneous Diophantine equations.
+
+The non-negative integer solutions of a system A x = 0 are exactly
+the sums of the vectors in its Hilbert basis, the finite set of
+minimal non-zero solutions. This is what AC unification needs to
+describe every way of distributing the arguments of both sides.
+"""
+from typing import Iterable, Iterator, Sequence, Tuple, Union
+import numpy as np
+
+__all__ = ['hilbert_basis', 'covering_subsets']
+
+Matrix = Union[np.ndarray, Sequence[Sequence[int]], Sequence[int]]
+
+# Evelyne Contejean and Hervé Devie. An Efficient Incremental Algorithm for Solving
+# Systems of Linear Diophantine Equations. Information and Computation, 1994.
+def hilbert_basis(coefficients: Matrix) -> np.ndarray:
+    """
+    Computes the minimal non-negative solutions of A x = 0.
+
+    Parameters
+    ----------
+    coefficients : array_like
+        The integer matrix A with a row for every equation
+        and a column for every unknown. A single equation
+        can be given as a one dimensional array.
+
+    Returns
+    -------
+    np.ndarray
+        The solutions as the rows of an integer array,
+        ordered by their sum and then lexicographically.
+
+    Examples
+    --------
+    >>> from symcollab.Unification.diophantine import hilbert_basis
+    >>> hilbert_basis([1, 1, -2]).tolist()
+    [[0, 2, 1], [1, 1, 1], [2, 0, 1]]
+    >>> hilbert_basis([[1, -1, 0], [0, 1, -1]]).tolist()
+    [[1, 1, 1]]
+    """
+    a = np.array(coefficients, dtype=np.int64)
+    if a.ndim == 1:
+        a = a.reshape(1, -1)
+    if a.ndim != 2:
+        raise ValueError("The coefficients must be a vector or a matrix")
+    n = a.shape[1]
+    identity = np.eye(n, dtype=np.int64)
+    # Scalar products of the images of the unit vectors
+    gram = a.T @ a
+    basis = np.zeros((0, n), dtype=np.int64)
+    candidates = identity
+    while len(candidates) > 0:
+        images = candidates @ a.T
+        solved = ~images.any(axis=1)
+        # Candidates are never above an earlier solution, so every solution is minimal
+        basis = np.concatenate([basis, candidates[solved]])
+        candidates = candidates[~solved]
+        # Only grow a candidate in a direction that brings its image closer to zero
+        rows, columns = np.nonzero(candidates @ gram < 0)
+        candidates = candidates[rows] + identity[columns]
+        if len(candidates) == 0:
+            break
+        candidates = np.unique(candidates, axis=0)
+        if len(basis) > 0:
+            above = (candidates[:, None, :] >= basis[None, :, :]).all(axis=2).any(axis=1)
+            candidates = candidates[~above]
+    # np.lexsort sorts by its last key first
+    order = np.lexsort(tuple(basis.T[::-1]) + (basis.sum(axis=1),))
+    return basis[order]
+
+def covering_subsets(basis: np.ndarray, exclusive: Iterable[int] = ()) -> Iterator[Tuple[int, ...]]:
+    """
+    Lazily generates the subsets of the rows of a basis whose sum
+    is positive in every column, from the smallest subsets up.
+    Subsets are given as tuples of row indices.
+
+    Parameters
+    ----------
+    basis : np.ndarray
+        The basis with a solution in every row.
+    exclusive : Iterable[int]
+        Columns whose sum must be exactly one. Since a subset that breaks
+        this also breaks it with more rows, its supersets are never generated.
+
+    Examples
+    --------
+    >>> from symcollab.Unification.diophantine import covering_subsets, hilbert_basis
+    >>> list(covering_subsets(hilbert_basis([1, 1, -2])))
+    [(1,), (0, 1), (0, 2), (1, 2), (0, 1, 2)]
+    >>> list(covering_subsets(hilbert_basis([1, 1, -2]), exclusive=[0]))
+    [(1,), (0, 1)]
+    """
+    basis = np.asarray(basis)
+    if basis.size == 0:
+        return
+    num_rows, num_columns = basis.shape
+    # Sets of columns and rows are bitsets
+    columns = [sum(1 << j for j in np.flatnonzero(row)) for row in basis]
+    full = (1 << num_columns) - 1
+    exclusive = list(exclusive)
+    usable = [i for i in range(num_rows) if (basis[i, exclusive] <= 1).all()]
+    conflicts = [0] * num_rows
+    for j in exclusive:
+        rows = [i for i in usable if basis[i, j] > 0]
+        mask = sum(1 << i for i in rows)
+        for i in rows:
+            conflicts[i] |= mask & ~(1 << i)
+    # The columns covered by the usable rows from a position on
+    reachable = [0] * (len(usable) + 1)
+    for k in range(len(usable) - 1, -1, -1):
+        reachable[k] = reachable[k + 1] | columns[usable[k]]
+
+    for size in range(1, len(usable) + 1):
+        # Depth first search over the subsets of this size in lexicographic order
+        stack = [(0, (), 0, 0)]
+        while stack:
+            start, chosen, covered, excluded = stack.pop()
+            if len(chosen) == size:
+                if covered == full:
+                    yield chosen
+                continue
+            missing = size - len(chosen)
+            for k in range(len(usable) - missing, start - 1, -1):
+                i = usable[k]
+                if excluded >> i & 1 or (covered | reachable[k]) != full:
+                    continue
+                stack.append((k + 1, chosen + (i,), covered | columns[i], excluded | conflicts[i]))
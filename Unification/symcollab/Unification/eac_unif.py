@@ -10,7 +10,6 @@
 #############################################
 
 #!/usr/bin/env python3
-from copy import deepcopy
 from typing import Set
 from symcollab.algebra import (
 	Equation, get_vars, Function, FuncTerm,
@@ -22,18 +21,19 @@ from .registry import Unification_Algorithms
 
 @Unification_Algorithms.register("E_AC")
 def eac_unif(U: Set[Equation]):
-	
-	unif_problems = dict()
-	U2 = set()
+	U4 = list(eac_unifiers(U))
+	print("EAC Unification is complete")
+	return U4
+
+def eac_unifiers(U: Set[Equation]):
+	"""
+	Lazily generates the solutions of an E_AC unification problem
+	as pairs of a solved problem and its AC unifiers, trying one
+	partition of the variables below f and exp at a time.
+	"""
 	#First call flat
 	U2 = flat(U)
 	
-	#Get the set of variables from the equations
-	var_set = set()
-	for e in U2:
-		var_set = var_set.union(get_vars(e.left_side))
-		var_set = var_set.union(get_vars(e.right_side))
-	
 	#Collect the variables for the set V
 	V = list()
 	for e in U2:
@@ -42,22 +42,38 @@ def eac_unif(U: Set[Equation]):
 		if isinstance(e.right_side, FuncTerm) and str(e.right_side.function) == "f":
 			V.append(e.right_side.arguments[0])
 			V.append(e.right_side.arguments[1])
-	#Generate the codewords of the partitions
-	VL = list(V)
-	P = list()
-	P = setpartitions(set(V))
+	#Every variable once, in the order they were found
+	VL = list(dict.fromkeys(V))
+	
+	#The symbols each variable is bound to, to reject
+	#partitions that fail_rules would fail on anyway
+	bound = {v: set() for v in VL}
+	for e in U2:
+		if e.left_side in bound and isinstance(e.right_side, FuncTerm):
+			bound[e.left_side].add(str(e.right_side.function))
+	def clash(v1: Variable, v2: Variable):
+		if v1.sort != v2.sort:
+			return True
+		s1, s2 = bound[v1], bound[v2]
+		return ("f" in s1 and not s2.isdisjoint({"g", "exp"})) or \
+		       ("f" in s2 and not s1.isdisjoint({"g", "exp"}))
+	def consistent(C: list, p: int):
+		#Only the p-th variable is new to its block
+		return not any(C[q] == C[p-1] and clash(VL[q], VL[p-1]) for q in range(p-1))
 	
 	#For each codeword, create the set of new equalities and
 	#send the set of equations to the unification algorithm rules
-	for code in P:
-		UE = set()
-		for  p in range(len(code)):
-			UE.add(Equation(VL[p], VL[code[p]-1]))
-		#Add the new equalities
-		U2.update(UE)
+	for code in setpartitions(VL, consistent):
+		#Each partition starts from its own copy of the problem
+		UP = {Equation(e.left_side, e.right_side) for e in U2}
+		#Equate every variable with the first one in its block
+		first = dict()
+		for p in range(len(code)):
+			first.setdefault(code[p], VL[p])
+			if first[code[p]] != VL[p]:
+				UP.add(Equation(VL[p], first[code[p]]))
 		#Call the unification rules or R1
-		U3 = U4 = list()
-		U3 = R1(U2)
+		U3 = R1(UP)
 		#now for each solution in U3 call AC-unification
 		for sol in U3:
 			#first get just the f-terms
@@ -66,12 +82,9 @@ def eac_unif(U: Set[Equation]):
 				for e in sol:
 					if isinstance(e.right_side, FuncTerm) and str(e.right_side.function) == "f":
 						f_terms.add(e)
-				delta = SubstituteTerm()
 				#call ac-unif
-				delta=ac_unify(f_terms)
-				U4.append([sol, delta])
-	print("EAC Unification is complete")
-	return U4
+				delta = ac_unify(f_terms, Function("f", 2))
+				yield [sol, delta]
 	
 def R1(U2: Set[Equation]):
 	
@@ -468,23 +481,24 @@ def fail_rules(U2: Set[Equation]):
 					test = True
 	return(test)
 
-def setpartitions(S: Set[Equation]):
+def setpartitions(S, accept=None):
+	"""
+	Lazily generates the partitions of S as restricted growth
+	codewords, where the p-th entry is the block of the p-th element.
+	If accept is given, it's called with a codeword and the number
+	of elements assigned so far, and the partitions that extend a
+	rejected one are skipped.
+	"""
 	n = len(S)
-	C = list()
-	U = list()
-	for i in range(n):
-		C.append(1)
-	sp(0, 1, C, n, U)
-	return(U)
+	C = [1] * n
+	yield from sp(0, 1, C, n, accept)
 	
 
-def sp(m: int, p: int, C: list, N: int, U: list):
+def sp(m: int, p: int, C: list, N: int, accept=None):
 	if p > N:
-		#print(C)
-		U.append(deepcopy(C))
+		yield list(C)
 	else:
-		for i in range(1, m+1):
+		for i in range(1, m+2):
 			C[p-1] = i
-			sp(m, p+1, C, N, U)
-		C[p-1] = m+1
-		sp(m+1, p+1, C, N, U)
+			if accept is None or accept(C, p):
+				yield from sp(max(m, i), p+1, C, N, accept)
@@ -0,0 +1,57 @@
+"""
+One-way matching of a pattern against a subject term.
+"""
+from typing import Dict, List, Optional, Tuple
+from symcollab.algebra import FuncTerm, SubstituteTerm, Term, Variable
+
+__all__ = ['match']
+
+def match(pattern: Term, subject: Term) -> Optional[SubstituteTerm]:
+    """
+    Find a substitution sigma such that pattern * sigma == subject.
+
+    Only the variables of the pattern are bound. The variables
+    of the subject are treated as constants, so the two terms may
+    share variables without any renaming. Neither term is modified.
+
+    Returns None if the pattern doesn't match the subject.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> from symcollab.Unification import match
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> a = Constant("a")
+    >>> print(match(f(x, x), f(f(x, a), f(x, a))))
+    {x ↦ f(x, a)}
+    >>> match(f(x, a), f(a, x)) is None
+    True
+    """
+    bindings: Dict[Variable, Term] = dict()
+    stack: List[Tuple[Term, Term]] = [(pattern, subject)]
+    while stack:
+        p, s = stack.pop()
+        if isinstance(p, Variable):
+            bound = bindings.get(p)
+            if bound is None:
+                if p.sort != s.sort:
+                    return None
+                bindings[p] = s
+            elif bound is not s and bound != s:
+                return None
+        elif p is s and p._ground:
+            continue
+        elif not isinstance(s, FuncTerm) or p.function != s.function or \
+             len(p.arguments) != len(s.arguments):
+            return None
+        elif p._ground:
+            if p != s:
+                return None
+        else:
+            stack.extend(zip(reversed(p.arguments), reversed(s.arguments)))
+    sigma = SubstituteTerm()
+    for variable, term in bindings.items():
+        if variable != term:
+            sigma.add(variable, term)
+    return sigma
@@ -1,21 +1,19 @@
-from copy import deepcopy
+from collections import deque
+from dataclasses import dataclass
+from heapq import heappop, heappush
 from symcollab.algebra import (
 	get_vars, Equation, Variable, FuncTerm,
-	Term, depth, get_vars_or_constants,
+	Term, depth, fold, get_vars_or_constants,
 	SubstituteTerm
 )
-from typing import Set
+from typing import Optional, Set
 
 #Tree
 class MutateNode:
-	def __init__(self, data: list):
-		self.id = None
-		self.c = None
-		self.a1 = None
-		self.a2 = None
-		self.rc = None
-		self.lc = None
-		self.mc = None
+	def __init__(self, data: list, depth: int = 0, phase: int = 1):
+		self.depth = depth
+		#1 while the original variables are kept distinct, 2 after
+		self.phase = phase
 		self.data = data
 
 
@@ -36,14 +34,14 @@ def found_cycle(var: Variable, S: Set[Equation], U: list):
 	for x in S:
 		for e in U:
 			if isinstance(e.left_side, Variable) and x == e.left_side:
-				U1 = deepcopy(U)
+				U1 = list(U)
 				try:
 					U1.remove(e)
 				except:
 					print("Equation already removed")
 				return(found_cycle(var, get_vars(e.right_side), U1))
 			elif isinstance(e.right_side, Variable) and x == e.right_side:
-				U1 = deepcopy(U)
+				U1 = list(U)
 				try:
 					U1.remove(e)
 				except:
@@ -86,7 +84,7 @@ def solved_form(U: list):
 		if isinstance(e.right_side, FuncTerm):
 			S = get_vars(e.right_side)
 			var = e.left_side
-			U1 = deepcopy(U)
+			U1 = list(U)
 			U1.remove(e)
 			if found_cycle(var, S, U1):
 				return(False)
@@ -123,7 +121,7 @@ def solved_form_vd(U: list, VS1: set):
 		if isinstance(e.right_side, FuncTerm):
 			S = get_vars(e.right_side)
 			var = e.left_side
-			U1 = deepcopy(U)
+			U1 = list(U)
 			U1.remove(e)
 			if found_cycle(var, S, U1):
 				return(False)
@@ -559,7 +557,7 @@ def s_rules_vd(U:list, var_count, VS1:set):
 	for e in U:
 		if isinstance(e.left_side, Variable) and isinstance(e.right_side, FuncTerm):
 			S = set(get_vars(e.right_side))
-			Utemp = deepcopy(U)
+			Utemp = list(U)
 			Utemp.remove(e)
 			if found_cycle(e.left_side, S, Utemp) == True:
 				#print("Occurs check: ")
@@ -576,7 +574,7 @@ def s_rules_vd(U:list, var_count, VS1:set):
 	for e1 in U:
 		if isinstance(e1.left_side, Variable) and isinstance(e1.right_side, Variable):
 			if e1.left_side not in VS1:
-				U2 = deepcopy(U)
+				U2 = list(U)
 				U2.remove(e1)
 				if e1.left_side in helper_gvs(set(U2)):
 					addeq = True
@@ -777,7 +775,7 @@ def s_rules(U:list, var_count, VS1:set):
 	for e in U:
 		if isinstance(e.left_side, Variable) and isinstance(e.right_side, FuncTerm):
 			S = set(get_vars(e.right_side))
-			Utemp = deepcopy(U)
+			Utemp = list(U)
 			Utemp.remove(e)
 			if found_cycle(e.left_side, S, Utemp) == True:
 				#print("Occurs check: ")
@@ -789,7 +787,7 @@ def s_rules(U:list, var_count, VS1:set):
 	#print("U before EQE rule: ")
 	#print(U)
 	for e in U:
-		Utemp = deepcopy(U)
+		Utemp = list(U)
 		if isinstance(e.left_side, Variable) and isinstance(e.right_side, FuncTerm):
 			if e.left_side not in VS1:
 				Utemp.remove(e)
@@ -831,164 +829,243 @@ def s_rules(U:list, var_count, VS1:set):
 	return(U)
 	
 	
-def build_tree(root: MutateNode, var_count, VS1, single_sol):
-	EQS = list()
-	Sol = list()
-	Q = list()
-	Q.append(root)
-	################### Step 1 #########################
-	#the length bound will be removed when we add pruning
-	while Q != list() and len(Q) <= 200:
-		cn = Q.pop(0)
-		#Apply S rules
-		Max = 20
-		count =0
-		Utemp = list()
-		while (Utemp != cn.data):
-			#print("Starting S rules: step(" +str(count) +")")
-			Utemp = cn.data
-			cn.data = s_rules_vd(cn.data, var_count, VS1)
-			count = count + 1
-			#print("U after S rules: ")
-			#print(cn.data)
-			#Remove after testing
-			if count > Max:
-				print("Hit Max")
+@dataclass
+class SearchReport:
+	"""
+	What a search for syntactic AC unifiers explored.
+
+	Parameters
+	==========
+	strategy
+	  The order the search tree was explored in.
+	expanded
+	  The number of problems the rules were applied to.
+	generated
+	  The number of problems created by the mutation rules.
+	duplicates
+	  The number of problems skipped because an equivalent
+	  problem had already been explored.
+	max_stored
+	  The largest number of problems kept at once,
+	  counting both the visited and the pending ones.
+	solutions
+	  The number of distinct solutions found.
+	exhausted
+	  True when the whole search space was explored, so that
+	  the solutions found are all the solutions there are.
+	budget
+	  The budget that stopped the search, if any.
+	"""
+	strategy: str
+	expanded: int = 0
+	generated: int = 0
+	duplicates: int = 0
+	max_stored: int = 0
+	solutions: int = 0
+	exhausted: bool = False
+	budget: Optional[str] = None
+
+class _BudgetExceeded(Exception):
+	pass
+
+_MUTATION_RULES = [
+	mutation_rule1, mutation_rule2, mutation_rule3, mutation_rule4,
+	mutation_rule5, mutation_rule6, mutation_rule7
+]
+
+STRATEGIES = ('bfs', 'dfs', 'iddfs', 'best')
+
+#Copies the equations but shares their terms,
+#since the rules only ever replace the sides of an equation
+def _copy_equations(U: list):
+	return [Equation(e.left_side, e.right_side) for e in U]
+
+#A key that is the same for problems that are equal up to the order
+#of the equations and the names of the variables made by the rules
+def _state_key(U: list, VS1: set):
+	def shape(t: Term, names: dict):
+		def combine(s, args):
+			if isinstance(s, Variable):
+				if s in VS1:
+					return s.symbol
+				if names is None:
+					return '?'
+				if s not in names:
+					names[s] = '?' + str(len(names))
+				return names[s]
+			return s.function.symbol + '(' + ','.join(args) + ')'
+		return fold(t, combine)
+	eqs = sorted(U, key=lambda e: (shape(e.left_side, None), shape(e.right_side, None)))
+	names = dict()
+	return tuple(sorted((shape(e.left_side, names), shape(e.right_side, names)) for e in eqs))
+
+#Estimate of how far a problem is from being solved
+def _cost(U: list):
+	unsolved = sum(1 for e in U if isinstance(e.left_side, FuncTerm) and isinstance(e.right_side, FuncTerm))
+	return (unsolved, sum(e.left_side._size + e.right_side._size for e in U))
+
+#Applies the simplification rules until the problem stops changing
+def _simplify(U: list, rules, var_count, VS1: set):
+	seen = set()
+	key = _state_key(U, VS1)
+	while key not in seen:
+		seen.add(key)
+		U = rules(U, var_count, VS1)
+		if U == list():
+			return U, None
+		key = _state_key(U, VS1)
+	return U, key
+
+def _search(root: MutateNode, var_count, VS1: set, strategy: str, node_limit: int,
+            state_limit: int, max_depth: Optional[int], report: SearchReport):
+	"""
+	Yields the solved problems reachable from root by the mutation rules.
+	Problems are first solved with the variables of the original problem
+	kept distinct, and those solved forms are then solved without that
+	restriction, all in the same search so that no branch starves the others.
+	Raises _BudgetExceeded when the budgets run out.
+	"""
+	if strategy != 'iddfs':
+		cut = []
+		yield from _search_once(root, var_count, VS1, strategy, node_limit, state_limit, report, max_depth, cut)
+	else:
+		depth_limit = 0
+		while True:
+			cut = []
+			yield from _search_once(root, var_count, VS1, 'dfs', node_limit, state_limit, report, depth_limit, cut)
+			if not cut or depth_limit == max_depth:
 				break
-		if cn.data != list():
-			solved = True
-			if not solved_form_vd(cn.data, VS1):
-				solved = False
-			if solved != True:
-				#print("No solved for yet for U: ")
-				#print(cn.data)
-				dcopy = list()
-				dcopy = deepcopy(cn.data) 
-				cn.id = MutateNode(mutation_rule1(dcopy, var_count))
-				Q.append(cn.id)
-				dcopy = list()
-				dcopy = deepcopy(cn.data)
-				cn.c = MutateNode(mutation_rule2(dcopy, var_count))
-				Q.append(cn.c)
-				dcopy = list()
-				dcopy = deepcopy(cn.data)
-				cn.a1 = MutateNode(mutation_rule3(dcopy, var_count))
-				Q.append(cn.a1)
-				dcopy = list()
-				dcopy = deepcopy(cn.data)
-				cn.a2 = MutateNode(mutation_rule4(dcopy, var_count))
-				Q.append(cn.a2)
-				dcopy = list()
-				dcopy = deepcopy(cn.data)
-				cn.rc = MutateNode(mutation_rule5(dcopy, var_count))
-				Q.append(cn.rc)
-				dcopy = list()
-				dcopy = deepcopy(cn.data)
-				cn.lc = MutateNode(mutation_rule6(dcopy, var_count))
-				Q.append(cn.lc)
-				dcopy = list()
-				dcopy = deepcopy(cn.data)
-				cn.mc = MutateNode(mutation_rule7(dcopy, var_count))
-				Q.append(cn.mc)
+			depth_limit = depth_limit + 1
+	if cut:
+		report.budget = 'max_depth'
+		raise _BudgetExceeded()
+
+def _search_once(root, var_count, VS1, strategy, node_limit, state_limit, report, depth_limit, cut):
+	phases = {
+		1: (s_rules_vd, lambda U: solved_form_vd(U, VS1)),
+		2: (s_rules, solved_form)
+	}
+	# Maps the key of every explored problem to the smallest depth it was explored at
+	visited = dict()
+	counter = 0
+	root = MutateNode(_copy_equations(root.data), root.depth, root.phase)
+	frontier = [(_cost(root.data), counter, root)] if strategy == 'best' else deque([root])
+	while frontier:
+		if strategy == 'best':
+			cn = heappop(frontier)[2]
+		elif strategy == 'dfs':
+			cn = frontier.pop()
+		else:
+			cn = frontier.popleft()
+		if report.expanded >= node_limit:
+			report.budget = 'node_limit'
+			raise _BudgetExceeded()
+		report.expanded = report.expanded + 1
+		#Apply S rules
+		rules, is_solved = phases[cn.phase]
+		cn.data, key = _simplify(cn.data, rules, var_count, VS1)
+		if key is None:
+			continue
+		key = (cn.phase, key)
+		if key in visited and visited[key] <= cn.depth:
+			report.duplicates = report.duplicates + 1
+			continue
+		visited[key] = cn.depth
+		if is_solved(cn.data):
+			if cn.phase == 2:
+				yield cn.data, key
+				continue
+			children = [MutateNode(_copy_equations(cn.data), cn.depth, 2)]
+		elif depth_limit is not None and cn.depth >= depth_limit:
+			cut.append(cn)
+			continue
+		else:
+			children = [
+				MutateNode(rule(_copy_equations(cn.data), var_count), cn.depth + 1, cn.phase)
+				for rule in _MUTATION_RULES
+			]
+			report.generated = report.generated + len(children)
+		if strategy == 'dfs':
+			children.reverse()
+		for child in children:
+			if strategy == 'best':
+				counter = counter + 1
+				heappush(frontier, (_cost(child.data), counter, child))
 			else:
-				#print("Solved True")
-				#return(cn.data)
-				#print("Adding to EQS: ")
-				#print(cn.data)
-				EQS.append(cn.data)
-				#return(list())
-		#print("Len 1: " + str(len(Q)))
-	#print("The final length of EQS: ")
-	#print(len(EQS))
-	#print(EQS)
-	#return(list())
-	#return(list())
-	################### Step 2, 3, 4 ###################
-	#the length bound will be removed when we add pruning
-	#EQT = list()
-	#EQT.append(EQS[0])
-	for s in EQS:
-		Q = list()
-		root = MutateNode(s)
-		Q.append(root)
-		while Q != list() and len(Q) <= 50:
-			cn = Q.pop(0)
-			#Apply S rules - mutate
-			Max = 20
-			count =0
-			Utemp = list()
-			#print("Starting for problem: ")
-			#print(cn.data)
-			while (Utemp != cn.data):
-				Utemp = cn.data
-				#print("U before S rules: ")
-				#print(cn.data)
-				cn.data = s_rules(cn.data, var_count, VS1)
-				count = count + 1
-				#print("U after S rules: ")
-				#print(cn.data)
-				#Will remove when we add pruning rule
-				if count > Max:
-					print("Hit Max")
-					break
-			if cn.data != list():
-				#return(list())
-			#Test if solved, if so stop
-				solved = True
-				#print("Checking if solved: ")
-				#print(cn.data)
-				if not solved_form(cn.data):
-					solved = False
-				if solved != True:
-					dcopy = list()
-					dcopy = deepcopy(cn.data) 
-					cn.id = MutateNode(mutation_rule1(dcopy, var_count))
-					Q.append(cn.id)
-					dcopy = list()
-					dcopy = deepcopy(cn.data)
-					cn.c = MutateNode(mutation_rule2(dcopy, var_count))
-					Q.append(cn.c)
-					dcopy = list()
-					dcopy = deepcopy(cn.data)
-					cn.a1 = MutateNode(mutation_rule3(dcopy, var_count))
-					Q.append(cn.a1)
-					dcopy = list()
-					dcopy = deepcopy(cn.data)
-					cn.a2 = MutateNode(mutation_rule4(dcopy, var_count))
-					Q.append(cn.a2)
-					dcopy = list()
-					dcopy = deepcopy(cn.data)
-					cn.rc = MutateNode(mutation_rule5(dcopy, var_count))
-					Q.append(cn.rc)
-					dcopy = list()
-					dcopy = deepcopy(cn.data)
-					cn.lc = MutateNode(mutation_rule6(dcopy, var_count))
-					Q.append(cn.lc)
-					dcopy = list()
-					dcopy = deepcopy(cn.data)
-					cn.mc = MutateNode(mutation_rule7(dcopy, var_count))
-					Q.append(cn.mc)
-				else:
-					#print("Solved True")
-					#return(cn.data)
-					Sol.append(cn.data)
-					if single_sol == True:
-						return(Sol)
-			#print("Len 2: " + str(len(Q)))
-		#print("Return empty list")
-		#return(list())
+				frontier.append(child)
+		stored = len(visited) + len(frontier)
+		report.max_stored = max(report.max_stored, stored)
+		if stored > state_limit:
+			report.budget = 'state_limit'
+			raise _BudgetExceeded()
+
+def build_tree(root: MutateNode, var_count, VS1, single_sol, strategy: str = 'bfs',
+               node_limit: int = 2000, state_limit: int = 100000,
+               max_depth: Optional[int] = None, report: Optional[SearchReport] = None):
+	"""
+	Searches for solved forms of the problem at the root. Problems that
+	are equal up to renaming are only explored once. The search stops
+	when the budgets on the number of problems expanded or stored run
+	out, and doesn't apply the mutation rules more than max_depth times
+	in a row, which is recorded in the report.
+	"""
+	if strategy not in STRATEGIES:
+		raise ValueError(f"Unknown search strategy {strategy}, expected one of {STRATEGIES}")
+	if report is None:
+		report = SearchReport(strategy)
+	Sol = list()
+	found = set()
+	try:
+		for solution, key in _search(root, var_count, VS1, strategy, node_limit, state_limit, max_depth, report):
+			if key in found:
+				continue
+			found.add(key)
+			Sol.append(solution)
+			report.solutions = len(Sol)
+			if single_sol == True:
+				return(Sol)
+		report.exhausted = True
+	except _BudgetExceeded:
+		pass
 	return(Sol)
 
-def synt_ac_unif(U: set, single_sol: bool = True):
-	#print("Syntactic AC-Unification on the following problem: ")
-	#print(U)
-	Max = 3
-	count = 0
+def synt_ac_unif(U: set, single_sol: bool = True, strategy: str = 'bfs',
+                 node_limit: int = 2000, state_limit: int = 100000,
+                 max_depth: Optional[int] = None, report: Optional[SearchReport] = None):
+	"""
+	Syntactic AC unification of equations between terms built from
+	variables and a single AC function.
+
+	Parameters
+	==========
+	U
+	  The equations to unify.
+	single_sol
+	  Whether to stop at the first solution.
+	strategy
+	  How to explore the search tree: 'bfs' for breadth first, 'dfs'
+	  for depth first, 'iddfs' for iterative deepening or 'best' for
+	  best first, which expands the problems with the fewest unsolved
+	  equations first.
+	node_limit
+	  The largest number of problems to apply the rules to.
+	state_limit
+	  The largest number of problems to keep at once.
+	max_depth
+	  The largest number of mutation rules to apply in a row.
+	  Depth first search needs it to avoid following a
+	  branch that never ends.
+	report
+	  If given, it's filled in with what the search explored,
+	  including whether it ran out of budget before finding every solution.
+	"""
 	var_count = [0]
 	#get the intial set of vars
 	VS1 = helper_gvs(U)
-	N1 = MutateNode(list(U))
-	res = build_tree(N1, var_count, VS1, single_sol)
+	N1 = MutateNode(_copy_equations(list(U)))
+	if report is None:
+		report = SearchReport(strategy)
+	res = build_tree(N1, var_count, VS1, single_sol, strategy, node_limit, state_limit, max_depth, report)
 	final_sol = list()
 	for solve in res:
 		delta = SubstituteTerm()
@@ -998,12 +1075,4 @@ def synt_ac_unif(U: set, single_sol: bool = True):
 			except:
 				print("error adding substitution")
 		final_sol.append(delta)
-	#print("Solution: ")
-	#if res == list():
-	#	print("No solution found")
-	#else:
-	#	for s in res:
-	#		print(s)
-	#print(final_sol)
-	#return(res)
 	return(final_sol)
@@ -1,30 +1,195 @@
 #!/usr/bin/env python3
 """
-Slow Syntactic Unification
-"""
+Syntactic Unification
 
-from symcollab.algebra import Equation, SubstituteTerm
-from typing import Set
-from symcollab.Unification.common import (
-    occurs_check, function_clash, eliminate,
-    orient, decompose
-)
+The equations are solved on a graph of their subterms, where
+every distinct subterm is a node. Nodes that must be equal are
+merged with union-find, so terms are never rebuilt or substituted
+into while solving. The occurs check is done once at the end by
+looking for a cycle among the merged nodes.
+"""
+from typing import Dict, Hashable, List, Optional, Set, Tuple, Union
+from symcollab.algebra import Equation, FuncTerm, SubstituteTerm, Term, Variable, fold
 from symcollab.Unification.registry import Unification_Algorithms
 
+__all__ = ['unif']
+
 # Franz Baader and Wayne Snyder. Unification Theory. Handbook of Automated Reasoning, 2001.
+# Alberto Martelli and Ugo Montanari. An Efficient Unification Algorithm. TOPLAS, 1982.
 @Unification_Algorithms.register('')
-def unif(equations: Set[Equation]) -> Set[SubstituteTerm]:
+def unif(equations: Set[Equation]) -> Union[SubstituteTerm, bool]:
     """
     Perform syntactic unification on a set of equations
-    and return a unifier as a set of
+    and return the most general unifier as an idempotent
+    substitution, or False if there is none.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> g = Function("g", 1)
+    >>> x, y = Variable("x"), Variable("y")
+    >>> a = Constant("a")
+    >>> print(unif({Equation(f(x, g(y)), f(g(a), x))}))
+    {
+    x ↦ g(a),
+    y ↦ a
+    }
+    >>> unif({Equation(x, g(x))})
+    False
     """
-    sigma = SubstituteTerm()
-    while len(equations) > 0:
-        if occurs_check(equations):
-            return False # TODO: return set()
-        if function_clash(equations):
-            return False # TODO: return set() 
-        equations, sigma = eliminate(equations, sigma)
-        equations = orient(equations)
-        equations = decompose(equations)
-    return sigma # TODO: return {sigma}
+    graph = _UnificationGraph()
+    pairs = [
+        (graph.add(equation.left_side), graph.add(equation.right_side))
+        for equation in equations
+    ]
+    if not graph.solve(pairs):
+        return False # TODO: return set()
+    return graph.solved_form() # TODO: return {sigma}
+
+
+class _UnificationGraph:
+    """
+    The subterms of a unification problem, with union-find
+    over the nodes that were made equal.
+    """
+    def __init__(self):
+        self.terms: List[Term] = []
+        self.children: List[Tuple[int, ...]] = []
+        self._ids: Dict[Hashable, int] = dict()
+        self._parents: List[int] = []
+        self._sizes: List[int] = []
+        # The function node of every class, if it has one
+        self._schema: List[Optional[int]] = []
+        # The variable a class of only variables is bound to
+        self._representative: List[Optional[int]] = []
+
+    def add(self, term: Term) -> int:
+        """Adds a term and returns its node."""
+        return fold(term, self._add_node)
+
+    def _add_node(self, t: Term, child_ids: Tuple[int, ...]) -> int:
+        key = (t.function, child_ids) if isinstance(t, FuncTerm) else t
+        node = self._ids.get(key)
+        if node is not None:
+            return node
+        node = len(self.terms)
+        self._ids[key] = node
+        self.terms.append(t)
+        self.children.append(child_ids)
+        self._parents.append(node)
+        self._sizes.append(1)
+        is_variable = isinstance(t, Variable)
+        self._schema.append(None if is_variable else node)
+        self._representative.append(node if is_variable else None)
+        return node
+
+    def find(self, node: int) -> int:
+        root = node
+        while self._parents[root] != root:
+            root = self._parents[root]
+        # Path compression
+        while self._parents[node] != root:
+            self._parents[node], node = root, self._parents[node]
+        return root
+
+    def _union(self, root1: int, root2: int):
+        """
+        Merges the class of root1 into the class of root2.
+        A class of only variables keeps the variable of root2.
+        """
+        schema = self._schema[root2] if self._schema[root2] is not None else self._schema[root1]
+        representative = self._representative[root2]
+        if self._sizes[root1] > self._sizes[root2]:
+            root1, root2 = root2, root1
+        self._parents[root1] = root2
+        self._sizes[root2] += self._sizes[root1]
+        self._schema[root2] = schema
+        self._representative[root2] = representative
+
+    def solve(self, pairs: List[Tuple[int, int]]) -> bool:
+        """
+        Merges the nodes that must be equal for every pair to be equal.
+        Returns False on a function clash or a cycle.
+        """
+        stack = list(reversed(pairs))
+        while stack:
+            s, t = stack.pop()
+            s, t = self.find(s), self.find(t)
+            if s == t:
+                continue
+            s_schema, t_schema = self._schema[s], self._schema[t]
+            if s_schema is not None and t_schema is not None:
+                if self.terms[s_schema].function != self.terms[t_schema].function or \
+                   len(self.children[s_schema]) != len(self.children[t_schema]):
+                    return False
+                self._union(s, t)
+                stack.extend(reversed(list(zip(self.children[s_schema], self.children[t_schema]))))
+            else:
+                self._union(s, t)
+        return not self._has_cycle()
+
+    def _has_cycle(self) -> bool:
+        """Occurs check: whether a class is reachable from itself through function nodes."""
+        # 0 for unvisited, 1 for being visited, 2 for done
+        state: Dict[int, int] = dict()
+        for start in range(len(self.terms)):
+            start = self.find(start)
+            if start in state:
+                continue
+            state[start] = 1
+            stack = [(start, iter(self._class_children(start)))]
+            while stack:
+                root, children = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    state[root] = 2
+                    stack.pop()
+                    continue
+                child = self.find(child)
+                child_state = state.get(child, 0)
+                if child_state == 1:
+                    return True
+                if child_state == 0:
+                    state[child] = 1
+                    stack.append((child, iter(self._class_children(child))))
+        return False
+
+    def _class_children(self, root: int) -> Tuple[int, ...]:
+        schema = self._schema[root]
+        return () if schema is None else self.children[schema]
+
+    def solved_form(self) -> SubstituteTerm:
+        """The substitution that maps every variable to the term of its class."""
+        # Terms of every class, built bottom-up so that they share subterms
+        built: Dict[int, Term] = dict()
+        def build(root: int) -> Term:
+            stack = [root]
+            while stack:
+                current = stack[-1]
+                if current in built:
+                    stack.pop()
+                    continue
+                schema = self._schema[current]
+                if schema is None:
+                    built[current] = self.terms[self._representative[current]]
+                    stack.pop()
+                    continue
+                child_roots = [self.find(c) for c in self.children[schema]]
+                missing = [c for c in child_roots if c not in built]
+                if missing:
+                    stack.extend(missing)
+                    continue
+                stack.pop()
+                t = self.terms[schema]
+                built[current] = t if not child_roots else \
+                    t.function(*(built[c] for c in child_roots))
+            return built[root]
+
+        sigma = SubstituteTerm()
+        for node, t in enumerate(self.terms):
+            if isinstance(t, Variable):
+                term = build(self.find(node))
+                if term != t:
+                    sigma.add(t, term)
+        return sigma
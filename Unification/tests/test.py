@@ -1,3 +1,13 @@
+from symcollab.algebra import *
+from symcollab.Unification import match, UnificationCache
+from symcollab.Unification.ac_unif import ac_unifiers, ac_unify
+from symcollab.Unification.bool_unif import (
+    BFunction, BMapping, BSubstitution, Boolean_unify, Constant_BTerm,
+    Mul_BTerm, Variable_BTerm, Xor_BTerm, Zero_BTerm, One_BTerm, to_anf
+)
+from symcollab.Unification.diophantine import covering_subsets, hilbert_basis
+from symcollab.Unification.eac_unif import setpartitions
+from symcollab.Unification.syntactic_ac_unification import SearchReport, STRATEGIES, synt_ac_unif
 from symcollab.Unification.unif import unif
 import unittest
 
@@ -5,5 +15,227 @@ class TestStub(unittest.TestCase):
     def test(self):
         self.assertEqual(True, True)
 
+class TestSyntacticUnification(unittest.TestCase):
+    def test_unifiers(self):
+        f = Function("f", 2)
+        g = Function("g", 1)
+        x, y, z = Variable("x"), Variable("y"), Variable("z")
+        a, b = Constant("a"), Constant("b")
+        sigma = unif({Equation(f(x, y), f(a, b))})
+        self.assertSetEqual(sigma.subs, {(x, a), (y, b)})
+        sigma = unif({Equation(f(z, z), f(g(f(x, y)), g(f(a, b))))})
+        self.assertSetEqual(sigma.subs, {(x, a), (y, b), (z, g(f(a, b)))})
+        self.assertEqual(len(unif({Equation(f(x, a), f(x, a))})), 0)
+        self.assertFalse(unif({Equation(f(x, y), g(z))}))
+        self.assertFalse(unif({Equation(a, b)}))
+        # Occurs check through several equations
+        self.assertFalse(unif({Equation(x, g(y)), Equation(y, g(z)), Equation(z, f(x, a))}))
+
+    def test_shared_terms(self):
+        # The solved form of this problem is exponential as a tree
+        f = Function("f", 2)
+        h = Function("h", 2)
+        xs = [Variable(f"x{i}") for i in range(101)]
+        left, right = xs[1], f(xs[0], xs[0])
+        for i in range(2, 101):
+            left = h(left, xs[i])
+            right = h(right, f(xs[i - 1], xs[i - 1]))
+        sigma = unif({Equation(left, right)})
+        self.assertEqual(len(sigma), 100)
+        self.assertEqual(depth(xs[100] * sigma), 100)
+
+class TestMatch(unittest.TestCase):
+    def test_match(self):
+        f = Function("f", 2)
+        g = Function("g", 1)
+        x, y = Variable("x"), Variable("y")
+        a, b = Constant("a"), Constant("b")
+        pattern = f(x, g(y))
+        sigma = match(pattern, f(g(y), g(a)))
+        self.assertSetEqual(sigma.subs, {(x, g(y)), (y, a)})
+        self.assertEqual(pattern * sigma, f(g(y), g(a)))
+        # Only the variables of the pattern are bound
+        self.assertIsNone(match(f(a, x), f(y, b)))
+        self.assertIsNone(match(f(x, x), f(a, b)))
+        self.assertEqual(len(match(f(x, y), f(x, y))), 0)
+        self.assertIsNone(match(g(x), f(x, x)))
+        # Neither term is renamed
+        self.assertEqual(pattern, f(x, g(y)))
+
+class TestUnificationCache(unittest.TestCase):
+    def test_renaming(self):
+        f = Function("f", 2)
+        g = Function("g", 1)
+        x, y, z, w = Variable("x"), Variable("y"), Variable("z"), Variable("w")
+        a = Constant("a")
+        calls = []
+        def counting_unif(equations):
+            calls.append(equations)
+            return unif(equations)
+        cached = UnificationCache(counting_unif, maxsize=2)
+        sigma = cached({Equation(f(x, g(y)), f(g(a), x)), Equation(y, a)})
+        self.assertSetEqual(sigma.subs, {(x, g(a)), (y, a)})
+        # The same problem with other names, listed in another order
+        sigma = cached({Equation(z, a), Equation(f(w, g(z)), f(g(a), w))})
+        self.assertSetEqual(sigma.subs, {(w, g(a)), (z, a)})
+        self.assertEqual((cached.hits, cached.misses, len(calls)), (1, 1, 1))
+        # The order of the variable names is part of the problem
+        cached({Equation(f(y, g(x)), f(g(a), y)), Equation(x, a)})
+        self.assertEqual(cached.misses, 2)
+        self.assertFalse(cached({Equation(x, g(x))}))
+        self.assertFalse(cached({Equation(y, g(y))}))
+        # Only the most recently used problems are kept
+        self.assertEqual(len(cached), 2)
+        cached({Equation(f(x, g(y)), f(g(a), x)), Equation(y, a)})
+        self.assertEqual(cached.misses, 4)
+        # Changing a result doesn't change the cache
+        sigma = cached({Equation(f(x, g(y)), f(g(a), x)), Equation(y, a)})
+        sigma.add(w, a)
+        sigma = cached({Equation(f(x, g(y)), f(g(a), x)), Equation(y, a)})
+        self.assertSetEqual(sigma.subs, {(x, g(a)), (y, a)})
+
+    def test_introduced_variables(self):
+        x, y, z, w = Variable("x"), Variable("y"), Variable("z"), Variable("w")
+        counter = [0]
+        def fresh_variable(old=None):
+            counter[0] += 1
+            return Variable("N" + str(counter[0]))
+        def naming_unif(equation):
+            # Solves x = y by mapping both sides to a new variable
+            sigma = SubstituteTerm()
+            n = fresh_variable()
+            sigma.add(equation.left_side, n)
+            sigma.add(equation.right_side, n)
+            return sigma
+        cached = UnificationCache(naming_unif, fresh_variable=fresh_variable)
+        sigma = cached(Equation(x, y))
+        self.assertSetEqual(sigma.subs, {(x, Variable("N1")), (y, Variable("N1"))})
+        # The variable of the cached result is replaced by a new one
+        sigma = cached(Equation(w, z))
+        self.assertEqual(cached.hits, 1)
+        self.assertSetEqual(sigma.subs, {(w, Variable("N2")), (z, Variable("N2"))})
+        sigma = cached(Equation(x, y))
+        self.assertSetEqual(sigma.subs, {(x, Variable("N3")), (y, Variable("N3"))})
+        # Without a way of making new variables, such results aren't cached
+        cached = UnificationCache(naming_unif)
+        cached(Equation(x, y))
+        sigma = cached(Equation(w, z))
+        self.assertEqual((cached.hits, cached.misses, len(cached)), (0, 2, 0))
+        self.assertSetEqual(sigma.subs, {(w, Variable("N5")), (z, Variable("N5"))})
+
+class TestACUnification(unittest.TestCase):
+    def test_hilbert_basis(self):
+        self.assertEqual(hilbert_basis([1, 1, -2]).tolist(), [[0, 2, 1], [1, 1, 1], [2, 0, 1]])
+        self.assertEqual(hilbert_basis([1, 2, -3]).tolist(), [[1, 1, 1], [3, 0, 1], [0, 3, 2]])
+        # Equations of a system are solved together
+        self.assertEqual(hilbert_basis([[2, -1, 0, 0], [0, 0, 3, -2]]).tolist(), [[1, 2, 0, 0], [0, 0, 2, 3]])
+        self.assertEqual(hilbert_basis([1, 1]).tolist(), [])
+        self.assertEqual(list(covering_subsets(hilbert_basis([1, 1]))), [])
+        self.assertRaises(ValueError, hilbert_basis, [[[1]]])
+
+    def test_ac_unify(self):
+        f = Function("f", 2)
+        x, y, z = Variable("x"), Variable("y"), Variable("z")
+        a, b, c = Constant("a"), Constant("b"), Constant("c")
+        def ac_equal(s, t):
+            return sorted(map(str, flatten(s))) == sorted(map(str, flatten(t)))
+        def flatten(t):
+            if isinstance(t, FuncTerm) and t.function == f:
+                return [s for arg in t.arguments for s in flatten(arg)]
+            return [t]
+        problems = [
+            {Equation(f(x, y), f(z, z))},
+            {Equation(f(x, y), f(a, b)), Equation(f(x, z), f(a, c))},
+        ]
+        for problem in problems:
+            unifiers = ac_unify(problem, f)
+            self.assertEqual(len(unifiers), 1)
+            sigma = next(iter(unifiers))
+            for e in problem:
+                self.assertTrue(ac_equal(e.left_side * sigma, e.right_side * sigma))
+        self.assertEqual(ac_unify({Equation(f(x, x), f(a, b))}, f), set())
+
+    def test_ac_unifiers(self):
+        f = Function("f", 2)
+        x, y, z, u = Variable("x"), Variable("y"), Variable("z"), Variable("u")
+        a, b = Constant("a"), Constant("b")
+        problem = {Equation(f(x, y), f(a, b))}
+        self.assertSetEqual(
+            {(x * sigma, y * sigma) for sigma in ac_unifiers(problem, f)},
+            {(a, b), (b, a)}
+        )
+        problem = {Equation(f(x, f(y, z)), f(u, f(a, b)))}
+        unifiers = list(ac_unifiers(problem, f))
+        self.assertEqual(len(unifiers), 30)
+        self.assertEqual(len(ac_unify(problem, f, limit=None)), 30)
+        self.assertEqual(len(list(ac_unifiers(problem, f, limit=3))), 3)
+        self.assertEqual(len(ac_unify(problem, f)), 1)
+        self.assertEqual(list(ac_unifiers(problem, f, timeout=0)), [])
+
+class TestSyntacticACUnification(unittest.TestCase):
+    def test_strategies(self):
+        f = Function("f", 2)
+        x, y, x1, y1 = Variable("x"), Variable("y"), Variable("x1"), Variable("y1")
+        for strategy in STRATEGIES:
+            # The seven AC unifiers of f(x, y) = f(x1, y1)
+            report = SearchReport(strategy)
+            unifiers = synt_ac_unif({Equation(f(x, y), f(x1, y1))}, False, strategy, report=report)
+            self.assertEqual(len(unifiers), 7)
+            self.assertTrue(report.exhausted)
+            self.assertIsNone(report.budget)
+
+    def test_budgets(self):
+        f = Function("f", 2)
+        x, y, z = Variable("x"), Variable("y"), Variable("z")
+        problem = {Equation(f(x, f(x, x)), f(y, f(y, z)))}
+        self.assertEqual(len(synt_ac_unif(problem)), 1)
+        report = SearchReport('bfs')
+        synt_ac_unif(problem, False, node_limit=20, report=report)
+        self.assertEqual((report.expanded, report.budget, report.exhausted), (20, 'node_limit', False))
+        report = SearchReport('iddfs')
+        unifiers = synt_ac_unif(problem, False, 'iddfs', max_depth=3, report=report)
+        self.assertEqual((len(unifiers), report.budget), (report.solutions, 'max_depth'))
+        self.assertRaises(ValueError, synt_ac_unif, problem, True, 'random')
+
+class TestBooleanUnification(unittest.TestCase):
+    def test_anf(self):
+        b0, b1 = Variable_BTerm("b0"), Variable_BTerm("b1")
+        c = Constant_BTerm("c")
+        variables = dict()
+        t = to_anf(Xor_BTerm([Mul_BTerm(b0, c), Mul_BTerm(b1, c), Mul_BTerm(b0, c)]), variables)
+        self.assertEqual(t, to_anf(Mul_BTerm(b1, c), variables))
+        self.assertEqual(len(t ^ t), 0)
+        self.assertEqual(len(t.assign(0b10, 0)), 0)
+        self.assertEqual(t.assign(0b10, 0b10), to_anf(c, variables))
+
+    def test_boolean_unify(self):
+        f = BFunction("f", 2)
+        b0, b1, b2 = Variable_BTerm("b0"), Variable_BTerm("b1"), Variable_BTerm("b2")
+        c1, c2 = Constant_BTerm("c1"), Constant_BTerm("c2")
+        t = Xor_BTerm([Mul_BTerm(b0, f(c1, c2)), Mul_BTerm(b1, f(c1, Mul_BTerm(b2, c2)))])
+        flag, solutions = Boolean_unify(t, Zero_BTerm())
+        self.assertTrue(flag)
+        self.assertEqual(solutions, [
+            BSubstitution([BMapping(b0, Zero_BTerm()), BMapping(b1, Zero_BTerm())]),
+            BSubstitution([BMapping(b0, One_BTerm()), BMapping(b1, One_BTerm()), BMapping(b2, One_BTerm())])
+        ])
+        self.assertEqual(Boolean_unify(Xor_BTerm([Mul_BTerm(b0, f(c1, c2)), c1]), Zero_BTerm()), (False, []))
+
+class TestSetPartitions(unittest.TestCase):
+    def test_setpartitions(self):
+        # Bell numbers
+        self.assertEqual([sum(1 for _ in setpartitions(range(n))) for n in range(1, 7)], [1, 2, 5, 15, 52, 203])
+        self.assertEqual(list(setpartitions("abc")), [[1, 1, 1], [1, 1, 2], [1, 2, 1], [1, 2, 2], [1, 2, 3]])
+        # Keep the first two elements apart
+        apart = lambda code, p: p < 2 or code[0] != code[1]
+        self.assertEqual(list(setpartitions("abc", apart)), [[1, 2, 1], [1, 2, 2], [1, 2, 3]])
+        calls = []
+        def never_together(code, p):
+            calls.append(p)
+            return len(set(code[:p])) == p
+        self.assertEqual(list(setpartitions(range(8), never_together)), [list(range(1, 9))])
+        # A rejected partial partition is never extended
+        self.assertLess(len(calls), 50)
+
 if __name__ == "__main__":
     unittest.main()
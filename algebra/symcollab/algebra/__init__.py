@@ -7,3 +7,9 @@ from .callable_registry import *
 from .term import *
 from .substitute import *
 from .parser import *
+from .store import *
+from .traversal import *
+from .position import *
+from .codec import *
+from .egraph import *
+from .discrimination import *
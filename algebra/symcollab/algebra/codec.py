@@ -0,0 +1,510 @@
+"""
+A compact binary serialization of terms.
+
+A stream is made of records. Sorts, functions and the nodes of
+terms are defined once by their own records and referred to by
+id afterwards, so symbols are only written once and subterms that
+are equal are only written once, preserving the sharing of terms.
+A value record then refers to those definitions to describe a term,
+an equation, a substitution, a list of them or a scalar.
+
+Every stream starts with a header holding a magic string and the
+format version. A header can also appear in the middle of a stream,
+in which case it resets every definition. This means that streams
+can be concatenated, for instance when appending to a log.
+
+Examples
+--------
+>>> from symcollab.algebra import *
+>>> from symcollab.algebra import codec
+>>> f = Function("f", 2)
+>>> x = Variable("x")
+>>> a = Constant("a")
+>>> data = codec.dumps([f(x, a), Equation(x, a)])
+>>> codec.loads(data)
+[f(x, a), x = a]
+"""
+from typing import Any, BinaryIO, Dict, Hashable, Iterator, List, Optional, Tuple, Union
+import io
+import mmap
+import os
+from .term import Constant, Equation, FuncTerm, Function, Sort, Term, Variable, _class_path, _term_classes
+from .substitute import SubstituteTerm
+from .traversal import fold
+
+__all__ = ['CodecError', 'TermWriter', 'TermReader']
+
+MAGIC = b'SCTM'
+VERSION = 1
+
+# Record tags
+_HEADER = 0x00
+_CLASS = 0x01
+_SORT = 0x02
+_FUNCTION = 0x03
+_VARIABLE = 0x04
+_CONSTANT = 0x05
+_APPLY = 0x06
+_VALUE = 0x10
+
+# Value tags
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_STR = 4
+_TERM = 5
+_EQUATION = 6
+_SUBSTITUTION = 7
+_LIST = 8
+
+# Domain sort tags of functions
+_DOMAIN_SINGLE = 0
+_DOMAIN_LIST = 1
+
+class CodecError(ValueError):
+    """Raised when a value cannot be encoded or a stream cannot be decoded."""
+
+def _write_uint(out: bytearray, n: int):
+    """Writes a non-negative integer as a LEB128 varint."""
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+def _write_str(out: bytearray, s: str):
+    data = s.encode('utf-8')
+    _write_uint(out, len(data))
+    out += data
+
+def _check_no_state(obj: Any):
+    """Subclasses that carry extra attributes can't be rebuilt from the stream."""
+    if getattr(obj, '__dict__', None):
+        raise CodecError(f"Cannot encode the extra attributes of {obj} of type {type(obj)}.")
+
+
+class TermWriter:
+    """
+    Writes values to a binary stream.
+
+    The definitions written by a writer are remembered, so
+    writing many values that share symbols or subterms
+    only writes them once.
+
+    Parameters
+    ----------
+    fp : BinaryIO
+        The file to write to.
+    flush : bool
+        Whether to flush the file after every value, so that
+        a value is on disk as soon as write returns.
+
+    Examples
+    --------
+    >>> import io
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> buffer = io.BytesIO()
+    >>> writer = TermWriter(buffer)
+    >>> writer.write(f(x, x))
+    >>> writer.write(f(f(x, x), x))
+    >>> buffer.seek(0)
+    0
+    >>> list(TermReader(buffer))
+    [f(x, x), f(f(x, x), x)]
+    """
+    def __init__(self, fp: BinaryIO, flush: bool = False):
+        self.fp = fp
+        self.flush = flush
+        self._classes: Dict[type, int] = dict()
+        self._sorts: Dict[str, int] = dict()
+        self._functions: Dict[Hashable, int] = dict()
+        self._nodes: Dict[Hashable, int] = dict()
+        self._out = bytearray()
+        self._out.append(_HEADER)
+        self._out += MAGIC
+        _write_uint(self._out, VERSION)
+
+    def write(self, value: Any):
+        """
+        Writes a term, equation, substitution, list of them,
+        or None, bool, int or str value to the stream.
+        """
+        out = self._out
+        payload = bytearray()
+        self._encode_value(value, payload)
+        out.append(_VALUE)
+        out += payload
+        self.fp.write(out)
+        if self.flush:
+            self.fp.flush()
+        self._out = bytearray()
+
+    def _encode_value(self, value: Any, payload: bytearray):
+        # Definitions go to self._out while the value is encoded in payload
+        if value is None:
+            payload.append(_NONE)
+        elif isinstance(value, bool):
+            payload.append(_TRUE if value else _FALSE)
+        elif isinstance(value, int):
+            payload.append(_INT)
+            # Zigzag encoding for negative integers
+            _write_uint(payload, value << 1 if value >= 0 else ((-value) << 1) - 1)
+        elif isinstance(value, str):
+            payload.append(_STR)
+            _write_str(payload, value)
+        elif isinstance(value, (Variable, FuncTerm)):
+            payload.append(_TERM)
+            _write_uint(payload, self._term(value))
+        elif isinstance(value, Equation):
+            payload.append(_EQUATION)
+            _write_uint(payload, self._term(value.left_side))
+            _write_uint(payload, self._term(value.right_side))
+        elif isinstance(value, SubstituteTerm):
+            payload.append(_SUBSTITUTION)
+            bindings = list(value._bindings.items())
+            _write_uint(payload, len(bindings))
+            for variable, t in bindings:
+                _write_uint(payload, self._term(variable))
+                _write_uint(payload, self._term(t))
+        elif isinstance(value, (list, tuple)):
+            payload.append(_LIST)
+            _write_uint(payload, len(value))
+            for v in value:
+                self._encode_value(v, payload)
+        else:
+            raise CodecError(f"Cannot encode {value} of type {type(value)}.")
+
+    def _class(self, cls: type) -> int:
+        class_id = self._classes.get(cls)
+        if class_id is None:
+            class_id = len(self._classes)
+            self._classes[cls] = class_id
+            self._out.append(_CLASS)
+            _write_str(self._out, _class_path(cls))
+        return class_id
+
+    def _sort(self, sort: Optional[Sort]) -> int:
+        """Returns the reference to a sort, 0 being no sort."""
+        if sort is None:
+            return 0
+        sort_id = self._sorts.get(sort.name)
+        if sort_id is None:
+            parents = [self._sort(p) for p in sort.parents]
+            sort_id = len(self._sorts)
+            self._sorts[sort.name] = sort_id
+            self._out.append(_SORT)
+            _write_str(self._out, sort.name)
+            _write_uint(self._out, len(parents))
+            for p in parents:
+                _write_uint(self._out, p)
+        return sort_id + 1
+
+    def _function(self, function: Function) -> int:
+        _check_no_state(function)
+        class_id = self._class(type(function))
+        range_sort = self._sort(function.range_sort)
+        if isinstance(function.domain_sort, list):
+            domain: Tuple = (_DOMAIN_LIST,) + tuple(self._sort(s) for s in function.domain_sort)
+        else:
+            domain = (_DOMAIN_SINGLE, self._sort(function.domain_sort))
+        key = (class_id, function.symbol, function.arity, domain, range_sort)
+        function_id = self._functions.get(key)
+        if function_id is None:
+            function_id = len(self._functions)
+            self._functions[key] = function_id
+            out = self._out
+            out.append(_FUNCTION)
+            _write_uint(out, class_id)
+            _write_str(out, function.symbol)
+            _write_uint(out, function.arity)
+            _write_uint(out, range_sort)
+            out.append(domain[0])
+            if domain[0] == _DOMAIN_LIST:
+                for s in domain[1:]:
+                    _write_uint(out, s)
+            else:
+                _write_uint(out, domain[1])
+        return function_id
+
+    def _term(self, t: Term) -> int:
+        """Returns the node id of a term, defining its new subterms."""
+        return fold(t, self._term_node)
+
+    def _term_node(self, t: Term, args: Tuple[int, ...]) -> int:
+        """Returns the node id of t given the node ids of its arguments."""
+        _check_no_state(t)
+        if isinstance(t, Variable):
+            tag = _VARIABLE
+            key: Hashable = (tag, self._class(type(t)), t.symbol, self._sort(t.sort))
+        elif isinstance(t, Constant):
+            tag = _CONSTANT
+            key = (tag, self._class(type(t)), t.symbol, self._sort(t.sort))
+        elif isinstance(t, FuncTerm):
+            tag = _APPLY
+            key = (tag, self._class(type(t)), self._function(t.function), args)
+        else:
+            raise CodecError(f"Cannot encode {t} of type {type(t)}.")
+        node_id = self._nodes.get(key)
+        if node_id is None:
+            node_id = len(self._nodes)
+            self._nodes[key] = node_id
+            out = self._out
+            out.append(tag)
+            _write_uint(out, key[1])
+            if tag == _APPLY:
+                _write_uint(out, key[2])
+                _write_uint(out, len(args))
+                for arg in args:
+                    _write_uint(out, arg)
+            else:
+                _write_str(out, key[2])
+                _write_uint(out, key[3])
+        return node_id
+
+
+class TermReader:
+    """
+    Reads values from a binary stream written by a TermWriter.
+
+    The stream can either be a file opened in binary mode,
+    which is read as needed, or a buffer such as bytes or a
+    memory map. Iterating over a reader gives every value
+    remaining in the stream.
+
+    Parameters
+    ----------
+    source : Union[BinaryIO, bytes, mmap.mmap]
+        Where to read the values from.
+
+    Attributes
+    ----------
+    offset : int
+        The number of bytes of the stream that were read
+        up to the end of the last value returned.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> from symcollab.algebra import codec
+    >>> x = Variable("x")
+    >>> reader = TermReader(codec.dumps(x) + codec.dumps([1, "a"]))
+    >>> reader.read()
+    x
+    >>> reader.read()
+    [1, 'a']
+    """
+    def __init__(self, source: Union[BinaryIO, bytes, bytearray, memoryview, mmap.mmap]):
+        if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+            self._buffer: Optional[memoryview] = memoryview(source)
+            self._fp = None
+        else:
+            self._buffer = None
+            self._fp = source
+        self._mmap: Optional[mmap.mmap] = None
+        self._position = 0
+        self.offset = 0
+        self._started = False
+        self._reset()
+
+    @classmethod
+    def open(cls, path: str) -> 'TermReader':
+        """
+        Reads the file at path through a memory map, so
+        that only the parts of the file being decoded are
+        loaded. The reader should be closed when done.
+        """
+        with open(path, 'rb') as f:
+            # Empty files can't be memory mapped
+            if os.fstat(f.fileno()).st_size == 0:
+                return cls(b'')
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        reader = cls(mapped)
+        reader._mmap = mapped
+        return reader
+
+    def close(self):
+        """Releases the memory map of a reader created with open."""
+        if self._mmap is not None:
+            self._buffer.release()
+            self._buffer = None
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def _reset(self):
+        self._classes: List[type] = []
+        self._sorts: List[Sort] = []
+        self._functions: List[Function] = []
+        self._nodes: List[Term] = []
+
+    def _read(self, n: int) -> bytes:
+        if self._buffer is not None:
+            data = bytes(self._buffer[self._position:self._position + n])
+        else:
+            data = self._fp.read(n)
+        if len(data) != n:
+            raise CodecError("Unexpected end of stream.")
+        self._position += n
+        return data
+
+    def _byte(self) -> int:
+        return self._read(1)[0]
+
+    def _uint(self) -> int:
+        n = 0
+        shift = 0
+        while True:
+            byte = self._byte()
+            n |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return n
+            shift += 7
+
+    def _str(self) -> str:
+        return self._read(self._uint()).decode('utf-8')
+
+    def _next_tag(self) -> Optional[int]:
+        """Returns the tag of the next record, or None at the end of the stream."""
+        if self._buffer is not None:
+            if self._position >= len(self._buffer):
+                return None
+            return self._byte()
+        data = self._fp.read(1)
+        if not data:
+            return None
+        self._position += 1
+        return data[0]
+
+    def read(self) -> Any:
+        """Returns the next value of the stream, raising EOFError when there are none left."""
+        while True:
+            tag = self._next_tag()
+            if tag is None:
+                raise EOFError("No more values in the stream.")
+            if not self._started and tag != _HEADER:
+                raise CodecError("Stream does not start with a header.")
+            if tag == _VALUE:
+                value = self._value()
+                self.offset = self._position
+                return value
+            self._record(tag)
+
+    def __iter__(self) -> Iterator[Any]:
+        while True:
+            try:
+                yield self.read()
+            except EOFError:
+                return
+
+    def _record(self, tag: int):
+        if tag == _HEADER:
+            if self._read(len(MAGIC)) != MAGIC:
+                raise CodecError("Not a term stream.")
+            version = self._uint()
+            if version != VERSION:
+                raise CodecError(f"Unsupported version {version}.")
+            self._started = True
+            self._reset()
+        elif tag == _CLASS:
+            # Only classes that are already defined are decoded, the
+            # stream never decides which modules get imported
+            path = self._str()
+            cls = _term_classes.get(path)
+            if cls is None:
+                raise CodecError(f"{path} is not a known term or function class, "
+                                 "the module defining it may need to be imported.")
+            self._classes.append(cls)
+        elif tag == _SORT:
+            sort = Sort.__new__(Sort)
+            sort.name = self._str()
+            sort.parents = {self._sorts[self._uint() - 1] for _ in range(self._uint())}
+            self._sorts.append(sort)
+        elif tag == _FUNCTION:
+            cls = self._classes[self._uint()]
+            symbol = self._str()
+            arity = self._uint()
+            range_sort = self._sort_ref()
+            if self._byte() == _DOMAIN_LIST:
+                domain_sort: Any = [self._sort_ref() for _ in range(arity)]
+            else:
+                domain_sort = self._sort_ref()
+            function = cls.__new__(cls)
+            Function.__init__(function, symbol, arity, domain_sort, range_sort)
+            self._functions.append(function)
+        elif tag in (_VARIABLE, _CONSTANT):
+            cls = self._classes[self._uint()]
+            symbol = self._str()
+            sort = self._sort_ref()
+            t = cls.__new__(cls)
+            (Variable if tag == _VARIABLE else Constant).__init__(t, symbol, sort)
+            self._nodes.append(t)
+        elif tag == _APPLY:
+            cls = self._classes[self._uint()]
+            function = self._functions[self._uint()]
+            args = tuple(self._nodes[self._uint()] for _ in range(self._uint()))
+            t = cls.__new__(cls)
+            FuncTerm.__init__(t, function, args)
+            self._nodes.append(t)
+        else:
+            raise CodecError(f"Unknown record {tag}.")
+
+    def _sort_ref(self) -> Optional[Sort]:
+        ref = self._uint()
+        return self._sorts[ref - 1] if ref else None
+
+    def _value(self) -> Any:
+        tag = self._byte()
+        if tag == _NONE:
+            return None
+        if tag in (_FALSE, _TRUE):
+            return tag == _TRUE
+        if tag == _INT:
+            n = self._uint()
+            return n >> 1 if not n & 1 else -((n + 1) >> 1)
+        if tag == _STR:
+            return self._str()
+        if tag == _TERM:
+            return self._nodes[self._uint()]
+        if tag == _EQUATION:
+            left = self._nodes[self._uint()]
+            return Equation(left, self._nodes[self._uint()])
+        if tag == _SUBSTITUTION:
+            sigma = SubstituteTerm()
+            sigma.subs = [
+                (self._nodes[self._uint()], self._nodes[self._uint()])
+                for _ in range(self._uint())
+            ]
+            return sigma
+        if tag == _LIST:
+            return [self._value() for _ in range(self._uint())]
+        raise CodecError(f"Unknown value {tag}.")
+
+
+def dump(value: Any, fp: BinaryIO):
+    """Writes a single value along with its own definitions to a file."""
+    TermWriter(fp).write(value)
+
+def load(fp: BinaryIO) -> Any:
+    """Reads a value written by dump from a file."""
+    return TermReader(fp).read()
+
+def dumps(value: Any) -> bytes:
+    """Encodes a single value to bytes."""
+    buffer = io.BytesIO()
+    TermWriter(buffer).write(value)
+    return buffer.getvalue()
+
+def loads(data: bytes) -> Any:
+    """Decodes a value from bytes."""
+    return TermReader(data).read()
@@ -3,15 +3,16 @@ This module contains a direct acyclic graph
 representation of a term. This is mainly included
 for applications that require better performance
 characteristics than the recursive definition.
+
+Nodes are integer ids assigned so that the arguments
+of a node always come before it. networkx is only
+imported to export a TermDAG, and matplotlib to show one.
 """
-from typing import Dict, Tuple, Union
-from copy import deepcopy
-from networkx.drawing.nx_pydot import graphviz_layout
-import matplotlib.pyplot as plt # type: ignore
-import networkx as nx # type: ignore
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple, Union
 from .term import Term, FuncTerm, Function, Variable
+from .traversal import fold
 
-__all__ = ['TermDAG', 'termDAGSubstitute']
+__all__ = ['TermDAG']
 
 #
 ## Directed Acyclic Graphs
@@ -23,96 +24,201 @@ class TermDAG:
     The dag implements struture sharing so that every subterm
     in the DAG is unique.
 
+    Attributes
+    ----------
+    term : Term
+        The term the DAG was built from.
+    nodes : List[Term]
+        The subterm of every node id.
+    root : int
+        The node id of the whole term.
+    hashes : List[int]
+        The hash of the subterm of every node id.
+
     Notes
     -----
     You can think of this as a tree. At the top of the tree
     is the outermost function/variable/constant. For each argument
     that a function has, it will point an array from that function
     to the argument.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> from symcollab.algebra.dag import TermDAG
+    >>> f = Function("f", 2)
+    >>> g = Function("g", 2)
+    >>> x = Variable("x")
+    >>> a = Constant("a")
+    >>> d = TermDAG(f(g(x, a), g(x, a)))
+    >>> len(d)
+    4
+    >>> d.children_of(d.root)
+    (2, 2)
+    >>> list(d.parents(x))
+    [g(x, a)]
     """
     def __init__(self, term: Term):
-        # Our DAG is an ordered graph because the edges are directional
-        # It is considered a MultiGraph due to our structured sharing.
-        # It is a digraph since the edges are directed
-        # One of the consequences is that finding the parent of a node is ambiguous
-        self.dag = nx.OrderedMultiDiGraph()
         self.term = term
-        self.edge_labels: Dict[Tuple[Term, Term], str] = {}
-        self.node_labels: Dict[Term, Union[Variable, Function]] = {}
-        self.dag.add_node(term)
-        # If the term we're starting out from is just a variable or constant,
-        # then we just make a single node graph.
-        # Otherwise, we'll need to start recursing down the arguments and add edges to each one...
-        if isinstance(term, FuncTerm):
-            self.node_labels[term] = term.function
-            # Go through each of the arguments and add it to the graph
-            for index, t in enumerate(term.arguments):
-                self._appendTermDAG(term, t, edge_label=str(index))
-        else:
-            self.node_labels[term] = term
-
-    def _appendTermDAG(self, last_term: Term, term: Term, edge_label=""):
-        # Annotate edges with argument number
-        # If there is already a label, then append the new label
-        if (last_term, term) in self.edge_labels and \
-            self.edge_labels[(last_term, term)] != edge_label:
-
-            self.edge_labels[(last_term, term)] = \
-                self.edge_labels[(last_term, term)] + ", " + edge_label
-
-        else:
-            self.edge_labels[(last_term, term)] = edge_label
-
-        self.dag.add_edge(last_term, term)
-        if isinstance(term, FuncTerm):
-            # Go through each of the function arguments and add a directed edge to it
-            for index, t in enumerate(term.arguments):
-                self._appendTermDAG(term, t, edge_label=str(index))
-            self.node_labels[term] = term.function
-        else:
-            self.node_labels[term] = term
+        self.nodes: List[Term] = []
+        self.hashes: List[int] = []
+        self._children: List[Tuple[int, ...]] = []
+        self._parents: List[List[int]] = []
+        self._ids: Dict[Hashable, int] = dict()
+        self.root: int = fold(term, self._add_node)
+
+    @staticmethod
+    def _key(t: Term, child_ids: Tuple[int, ...]) -> Hashable:
+        """Structural key of a node given the ids of its arguments."""
+        if isinstance(t, FuncTerm):
+            return (t.function, child_ids)
+        return t
+
+    def _add_node(self, t: Term, child_ids: Tuple[int, ...]) -> int:
+        key = TermDAG._key(t, child_ids)
+        node = self._ids.get(key)
+        if node is not None:
+            return node
+        node = len(self.nodes)
+        self._ids[key] = node
+        self.nodes.append(t)
+        self.hashes.append(hash(t))
+        self._children.append(child_ids)
+        self._parents.append([])
+        # A parent is listed once even if the node appears in several of its arguments
+        for child in dict.fromkeys(child_ids):
+            self._parents[child].append(node)
+        return node
+
+    def node_id(self, term: Term) -> Optional[int]:
+        """Returns the node id of a term, or None if it isn't in the DAG."""
+        def lookup(t: Term, child_ids: Tuple[Optional[int], ...]) -> Optional[int]:
+            if None in child_ids:
+                return None
+            return self._ids.get(TermDAG._key(t, child_ids))
+        return fold(term, lookup)
+
+    def children_of(self, node: int) -> Tuple[int, ...]:
+        """The node ids of the arguments of a node, in order."""
+        return self._children[node]
+
+    def parents_of(self, node: int) -> List[int]:
+        """The node ids of the nodes that have the node as an argument."""
+        return self._parents[node]
+
+    def topological_order(self) -> List[int]:
+        """The node ids with every node before its arguments."""
+        return list(reversed(range(len(self.nodes))))
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def _dfs_edges(self) -> Iterator[Tuple[int, int]]:
+        """Edges to the nodes first reached by a depth-first search from the root."""
+        visited = {self.root}
+        stack = [(self.root, iter(dict.fromkeys(self._children[self.root])))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+            elif child not in visited:
+                visited.add(child)
+                yield node, child
+                stack.append((child, iter(dict.fromkeys(self._children[child]))))
+
+    def _bfs_edges(self) -> Iterator[Tuple[int, int]]:
+        """Edges to the nodes first reached by a breadth-first search from the root."""
+        visited = {self.root}
+        frontier = [self.root]
+        while frontier:
+            next_frontier = []
+            for node in frontier:
+                for child in self._children[node]:
+                    if child not in visited:
+                        visited.add(child)
+                        next_frontier.append(child)
+                        yield node, child
+            frontier = next_frontier
+
+    def df_edge_traversal(self) -> Iterator[Tuple[Term, Term]]:
+        """Depth-first traversal of the edges"""
+        return ((self.nodes[p], self.nodes[c]) for p, c in self._dfs_edges())
+    def df_node_traversal(self) -> Iterator[Term]:
+        """Depth-first traversal of the nodes"""
+        yield self.nodes[self.root]
+        yield from (self.nodes[c] for _, c in self._dfs_edges())
+    def bs_edge_traversal(self) -> Iterator[Tuple[Term, Term]]:
+        """Breadth-first traversal of the edges"""
+        return ((self.nodes[p], self.nodes[c]) for p, c in self._bfs_edges())
+    def bs_node_traversal(self) -> Iterator[Term]:
+        """Breadth-frist traversal of the nodes"""
+        yield self.nodes[self.root]
+        yield from (self.nodes[c] for _, c in self._bfs_edges())
+
+    def parents(self, term):
+        """Parents of a term in the TermDAG"""
+        node = self.node_id(term)
+        if node is None:
+            return []
+        return (self.nodes[p] for p in self._parents[node])
+    def leaves(self):
+        """Leaves of a TermDAG"""
+        return (t for t, children in zip(self.nodes, self._children) if not children)
+
+    @property
+    def node_labels(self) -> Dict[Term, Union[Variable, Function]]:
+        """The label of every node when drawn."""
+        return {
+            t: t.function if isinstance(t, FuncTerm) else t
+            for t in self.nodes
+        }
+
+    @property
+    def edge_labels(self) -> Dict[Tuple[Term, Term], str]:
+        """The argument indices that each edge stands for when drawn."""
+        labels: Dict[Tuple[Term, Term], List[str]] = dict()
+        for node, children in enumerate(self._children):
+            for index, child in enumerate(children):
+                labels.setdefault((self.nodes[node], self.nodes[child]), []).append(str(index))
+        return {edge: ", ".join(indices) for edge, indices in labels.items()}
+
+    def to_networkx(self):
+        """
+        Export the DAG as a networkx MultiDiGraph with
+        an edge for every argument, starting from the root.
+        """
+        import networkx as nx # type: ignore
+        graph = nx.MultiDiGraph()
+        for node in self.topological_order():
+            graph.add_node(self.nodes[node])
+        for node in self.topological_order():
+            for child in self._children[node]:
+                graph.add_edge(self.nodes[node], self.nodes[child])
+        return graph
 
     def show(self):
         """Plot the directed acyclic graph of the TermDAG"""
+        from networkx.drawing.nx_pydot import graphviz_layout
+        import matplotlib.pyplot as plt # type: ignore
+        import networkx as nx # type: ignore
+        graph = self.to_networkx()
         fig = plt.figure()
         # To see the layout rooted appropriately, you need to have
         # graphviz installed on your system
         try:
-            pos = graphviz_layout(self.dag, prog="dot")
+            pos = graphviz_layout(graph, prog="dot")
         except FileNotFoundError:
-            pos = nx.spring_layout(self.dag)
+            pos = nx.spring_layout(graph)
         # The first node will be colored differently to signify the start of the DAG
-        nx.draw(self.dag, pos,
+        nx.draw(graph, pos,
                 font_weight='bold',
                 node_size=600,
                 font_size=30,
-                node_color=['#a8c74d'] + ['#1f78b4' for i in range(len(self.dag.nodes) - 1)]
+                node_color=['#a8c74d'] + ['#1f78b4' for i in range(len(graph.nodes) - 1)]
         )
         # Add both the node labels and edge labels
-        nx.draw_networkx_labels(self.dag, pos, labels=self.node_labels)
-        nx.draw_networkx_edge_labels(self.dag, pos, edge_labels=self.edge_labels)
+        nx.draw_networkx_labels(graph, pos, labels=self.node_labels)
+        nx.draw_networkx_edge_labels(graph, pos, edge_labels=self.edge_labels)
         fig.suptitle(self.term)
         plt.show()
-
-    def df_edge_traversal(self):
-        """Depth-first traversal of the edges"""
-        return nx.dfs_edges(self.dag, source=list(self.dag.nodes)[0])
-    def df_node_traversal(self):
-        """Depth-first traversal of the nodes"""
-        return nx.dfs_tree(self.dag, source=list(self.dag.nodes)[0])
-    def bs_edge_traversal(self):
-        """Breadth-first traversal of the edges"""
-        return nx.bfs_edges(self.dag, source=list(self.dag.nodes)[0])
-    def bs_node_traversal(self):
-        """Breadth-frist traversal of the nodes"""
-        return nx.bfs_tree(self.dag, source=list(self.dag.nodes)[0])
-
-    def parents(self, term):
-        """Parents of a term in the TermDAG"""
-        if term in self.dag:
-            return self.dag.predecessors(term)
-        else:
-            return []
-    def leaves(self):
-        """Leaves of a TermDAG"""
-        return filter(lambda x: self.dag.out_degree(x) == 0, self.dag.nodes())
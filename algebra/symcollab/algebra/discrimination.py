@@ -0,0 +1,211 @@
+"""
+Discrimination trees for indexing terms.
+
+A discrimination tree stores terms by the sequence of symbols
+met in a preorder traversal, sharing common prefixes. Given a
+query term, it retrieves the stored terms that may unify with it,
+be an instance of it, or generalize it, while only looking at the
+symbols the terms share. Variables are not told apart, so the
+retrieved terms are candidates that still need to be checked by
+unification or matching, but every stored term that qualifies is
+retrieved.
+"""
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Tuple
+from .term import Function, Term, Variable
+
+__all__ = ['DiscriminationTree']
+
+# A variable in a key
+_VARIABLE = '*'
+# A subterm that was not indexed because its top symbol is a wildcard
+_ANY = '?'
+
+_UNIFIABLE = 0
+_INSTANCES = 1
+_GENERALIZATIONS = 2
+
+class _Node:
+    __slots__ = ('children', 'entries')
+    def __init__(self):
+        self.children: Dict[Hashable, '_Node'] = dict()
+        # Only leaves have entries, as (insertion number, term, value)
+        self.entries: List[Tuple[int, Term, Any]] = []
+
+def _arity(key: Hashable) -> int:
+    return key[1] if isinstance(key, tuple) else 0
+
+class DiscriminationTree:
+    """
+    An index of terms that retrieves candidates for
+    unification and matching by their symbols.
+
+    Parameters
+    ----------
+    wildcards : Iterable[Function]
+        Function symbols that are interpreted in a theory, such as xor.
+        A subterm with one of these at the top can be equal to any term,
+        so it's indexed and queried as if it were a variable.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> g = Function("g", 1)
+    >>> x, y = Variable("x"), Variable("y")
+    >>> a, b = Constant("a"), Constant("b")
+    >>> index = DiscriminationTree()
+    >>> for t in [f(a, x), f(b, g(y)), g(a), x]:
+    ...     index.insert(t)
+    >>> index.retrieve_unifiable(f(y, g(b)))
+    [f(a, x), f(b, g(y)), x]
+    >>> index.retrieve_instances(f(b, y))
+    [f(b, g(y))]
+    >>> index.retrieve_generalizations(f(a, g(a)))
+    [f(a, x), x]
+    """
+    def __init__(self, wildcards: Iterable[Function] = ()):
+        self.wildcards = list(wildcards)
+        self._root = _Node()
+        self._size = 0
+        # Retrievals list terms in the order they were inserted
+        self._inserted = 0
+
+    def _keys(self, term: Term) -> List[Hashable]:
+        """The preorder sequence of symbols of a term."""
+        keys: List[Hashable] = []
+        stack = [term]
+        while stack:
+            t = stack.pop()
+            if isinstance(t, Variable):
+                keys.append(_VARIABLE)
+            elif t.function in self.wildcards:
+                keys.append(_ANY)
+            else:
+                keys.append((t.function, len(t.arguments)))
+                stack.extend(reversed(t.arguments))
+        return keys
+
+    def insert(self, term: Term, value: Any = None):
+        """
+        Adds a term to the index. The value is what retrievals
+        return for the term, which defaults to the term itself.
+        """
+        node = self._root
+        for key in self._keys(term):
+            child = node.children.get(key)
+            if child is None:
+                child = _Node()
+                node.children[key] = child
+            node = child
+        node.entries.append((self._inserted, term, term if value is None else value))
+        self._inserted += 1
+        self._size += 1
+
+    def remove(self, term: Term, value: Any = None):
+        """
+        Removes a term that was inserted with the given value.
+        Raises a ValueError if it isn't in the index.
+        """
+        value = term if value is None else value
+        path = [self._root]
+        for key in self._keys(term):
+            child = path[-1].children.get(key)
+            if child is None:
+                raise ValueError(f"{term} is not in the index")
+            path.append(child)
+        entries = path[-1].entries
+        for i, (_, t, v) in enumerate(entries):
+            if t == term and v == value:
+                del entries[i]
+                break
+        else:
+            raise ValueError(f"{term} is not in the index")
+        self._size -= 1
+        # Remove the branches that are left empty
+        keys = self._keys(term)
+        for depth in range(len(keys), 0, -1):
+            node = path[depth]
+            if node.entries or node.children:
+                break
+            del path[depth - 1].children[keys[depth - 1]]
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self) -> Iterator[Any]:
+        """The values of every term in the index, in the order they were inserted."""
+        entries: List[Tuple[int, Any]] = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            entries.extend((n, v) for n, _, v in node.entries)
+            stack.extend(node.children.values())
+        entries.sort()
+        return iter([v for _, v in entries])
+
+    def retrieve_unifiable(self, query: Term) -> List[Any]:
+        """The values of the terms that may unify with the query."""
+        return self._retrieve(query, _UNIFIABLE)
+
+    def retrieve_instances(self, query: Term) -> List[Any]:
+        """The values of the terms that may be instances of the query."""
+        return self._retrieve(query, _INSTANCES)
+
+    def retrieve_generalizations(self, query: Term) -> List[Any]:
+        """The values of the terms that the query may be an instance of."""
+        return self._retrieve(query, _GENERALIZATIONS)
+
+    def _retrieve(self, query: Term, mode: int) -> List[Any]:
+        keys = self._keys(query)
+        ends = _subterm_ends(keys)
+        results: List[Tuple[int, Any]] = []
+        # Each state is a node of the tree and how much of the query it accounts for
+        stack: List[Tuple[_Node, int]] = [(self._root, 0)]
+        while stack:
+            node, i = stack.pop()
+            if i == len(keys):
+                results.extend((n, v) for n, _, v in node.entries)
+                continue
+            key = keys[i]
+            if key == _ANY or (key == _VARIABLE and mode != _GENERALIZATIONS):
+                # The query subterm stands for any term in the tree
+                stack.extend((n, i + 1) for n in _skip_term(node))
+                continue
+            # Stored variables and wildcard subterms stand for the whole query subterm
+            if mode != _INSTANCES:
+                child = node.children.get(_VARIABLE)
+                if child is not None:
+                    stack.append((child, ends[i]))
+            child = node.children.get(_ANY)
+            if child is not None:
+                stack.append((child, ends[i]))
+            if key != _VARIABLE:
+                child = node.children.get(key)
+                if child is not None:
+                    stack.append((child, i + 1))
+        results.sort()
+        return [v for _, v in results]
+
+
+def _subterm_ends(keys: List[Hashable]) -> List[int]:
+    """Where the subterm starting at every key of a preorder sequence ends."""
+    ends = [0] * len(keys)
+    sizes: List[int] = []
+    for i in range(len(keys) - 1, -1, -1):
+        size = 1
+        for _ in range(_arity(keys[i])):
+            size += sizes.pop()
+        sizes.append(size)
+        ends[i] = i + size
+    return ends
+
+def _skip_term(node: _Node) -> Iterator[_Node]:
+    """The nodes reached from node after going past one whole term."""
+    stack = [(node, 1)]
+    while stack:
+        n, remaining = stack.pop()
+        if remaining == 0:
+            yield n
+            continue
+        for key, child in n.children.items():
+            stack.append((child, remaining - 1 + _arity(key)))
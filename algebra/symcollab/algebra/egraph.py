@@ -0,0 +1,315 @@
+"""
+E-graphs for reasoning about equalities between terms.
+
+An e-graph represents a set of terms together with an
+equivalence relation over them that is closed under congruence:
+if s = t then f(s) = f(t). Terms are stored as e-nodes, which are
+a function applied to e-classes rather than to terms, so that every
+combination of equal subterms is represented without building it.
+Equivalence classes are kept in a union-find structure and the
+congruence invariant is restored in batches by ``rebuild``.
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from .term import Constant, Equation, FuncTerm, Function, get_vars, Term, Variable
+from .traversal import fold
+
+__all__ = ['EGraph']
+
+# An e-node is the symbol at the top of a term along with the e-classes of its arguments.
+# Variables and constants are their own symbol.
+ENode = Tuple[Union[Function, Variable, Constant], Tuple[int, ...]]
+
+def _top_symbol(t: Term) -> Union[Function, Variable, Constant]:
+    if isinstance(t, (Variable, Constant)):
+        return t
+    return t.function
+
+class EGraph:
+    """
+    An e-graph of terms.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 1)
+    >>> a = Constant("a")
+    >>> b = Constant("b")
+    >>> g = EGraph()
+    >>> _ = g.union(g.add(a), g.add(b))
+    >>> g.rebuild()
+    >>> g.equivalent(f(f(a)), f(f(b)))
+    True
+    >>> g.extract(g.add(f(b)))
+    f(a)
+    """
+    def __init__(self):
+        self._parents: List[int] = []
+        self._hashcons: Dict[ENode, int] = dict()
+        # The e-nodes of every canonical e-class
+        self._nodes: Dict[int, List[ENode]] = dict()
+        # The e-nodes that have an e-class as an argument, along with their own e-class
+        self._uses: Dict[int, List[Tuple[ENode, int]]] = dict()
+        # E-classes that were merged since the last rebuild
+        self._pending: List[int] = []
+
+    def find(self, eclass: int) -> int:
+        """Returns the canonical id of an e-class."""
+        root = eclass
+        while self._parents[root] != root:
+            root = self._parents[root]
+        # Path compression
+        while self._parents[eclass] != root:
+            self._parents[eclass], eclass = root, self._parents[eclass]
+        return root
+
+    def _canonical(self, node: ENode) -> ENode:
+        symbol, args = node
+        return (symbol, tuple(self.find(a) for a in args))
+
+    def _add_node(self, node: ENode) -> int:
+        node = self._canonical(node)
+        eclass = self._hashcons.get(node)
+        if eclass is not None:
+            return self.find(eclass)
+        eclass = len(self._parents)
+        self._parents.append(eclass)
+        self._hashcons[node] = eclass
+        self._nodes[eclass] = [node]
+        self._uses[eclass] = []
+        for arg in set(node[1]):
+            self._uses[arg].append((node, eclass))
+        return eclass
+
+    def add(self, term: Term) -> int:
+        """Adds a term and returns its e-class."""
+        return fold(term, lambda t, args: self._add_node((_top_symbol(t), args)))
+
+    def lookup(self, term: Term) -> Optional[int]:
+        """Returns the e-class of a term, or None if it isn't represented."""
+        def lookup_node(t: Term, args: Tuple[Optional[int], ...]) -> Optional[int]:
+            if None in args:
+                return None
+            eclass = self._hashcons.get(self._canonical((_top_symbol(t), args)))
+            return None if eclass is None else self.find(eclass)
+        return fold(term, lookup_node)
+
+    def union(self, eclass1: int, eclass2: int) -> int:
+        """
+        Merges two e-classes and returns the merged e-class.
+        The congruence invariant is only restored by rebuild.
+        """
+        eclass1, eclass2 = self.find(eclass1), self.find(eclass2)
+        if eclass1 == eclass2:
+            return eclass1
+        # Keep the larger e-class as the root
+        if len(self._nodes[eclass1]) < len(self._nodes[eclass2]):
+            eclass1, eclass2 = eclass2, eclass1
+        self._parents[eclass2] = eclass1
+        self._nodes[eclass1].extend(self._nodes.pop(eclass2))
+        self._uses[eclass1].extend(self._uses.pop(eclass2))
+        self._pending.append(eclass1)
+        return eclass1
+
+    def rebuild(self):
+        """Restores congruence after a batch of unions."""
+        while self._pending:
+            todo = {self.find(eclass) for eclass in self._pending}
+            self._pending = []
+            for eclass in todo:
+                self._repair(self.find(eclass))
+
+    def _repair(self, eclass: int):
+        uses = self._uses[eclass]
+        for node, _ in uses:
+            self._hashcons.pop(node, None)
+        new_uses: Dict[ENode, int] = dict()
+        merges: List[Tuple[int, int]] = []
+        for node, user in uses:
+            node = self._canonical(node)
+            user = self.find(user)
+            # Two users that became the same e-node are congruent
+            other = new_uses.get(node, self._hashcons.get(node))
+            if other is not None and self.find(other) != user:
+                merges.append((other, user))
+            new_uses[node] = user
+            self._hashcons[node] = user
+        self._uses[eclass] = list(new_uses.items())
+        for eclass1, eclass2 in merges:
+            self.union(eclass1, eclass2)
+
+    def equivalent(self, term1: Term, term2: Term) -> bool:
+        """Returns true if the two terms are in the same e-class, adding them if needed."""
+        eclass1, eclass2 = self.add(term1), self.add(term2)
+        self.rebuild()
+        return self.find(eclass1) == self.find(eclass2)
+
+    def classes(self) -> List[int]:
+        """The canonical e-classes."""
+        return list(self._nodes)
+
+    def nodes(self, eclass: int) -> List[ENode]:
+        """The e-nodes of an e-class, with canonical arguments and no duplicates."""
+        return list(dict.fromkeys(self._canonical(n) for n in self._nodes[self.find(eclass)]))
+
+    def __len__(self):
+        """The number of e-nodes in the e-graph."""
+        return len(self._hashcons)
+
+    def _costs(self, cost) -> Dict[int, Tuple[int, Optional[ENode]]]:
+        """
+        Computes the smallest cost of a term in every e-class, where
+        cost combines the costs of the arguments of an e-node.
+        """
+        best: Dict[int, Tuple[int, Optional[ENode]]] = dict()
+        changed = True
+        while changed:
+            changed = False
+            for eclass in self._nodes:
+                for node in self.nodes(eclass):
+                    args = node[1]
+                    if any(a not in best for a in args):
+                        continue
+                    c = cost([best[a][0] for a in args])
+                    if eclass not in best or c < best[eclass][0]:
+                        best[eclass] = (c, node)
+                        changed = True
+        return best
+
+    def heights(self) -> Dict[int, int]:
+        """The smallest height of a term in every e-class."""
+        best = self._costs(lambda args: 1 + max(args) if args else 0)
+        return {eclass: c for eclass, (c, _) in best.items()}
+
+    def extract(self, eclass: int) -> Term:
+        """Returns a term of the e-class with the smallest number of symbols."""
+        self.rebuild()
+        best = self._costs(lambda args: 1 + sum(args))
+        terms: Dict[int, Term] = dict()
+        stack = [self.find(eclass)]
+        while stack:
+            current = stack[-1]
+            if current in terms:
+                stack.pop()
+                continue
+            symbol, args = best[current][1]
+            missing = [a for a in args if a not in terms]
+            if missing:
+                stack.extend(missing)
+                continue
+            stack.pop()
+            terms[current] = symbol if not args else symbol(*(terms[a] for a in args))
+        return terms[self.find(eclass)]
+
+    def _match(self, pattern: Term, eclass: int, variables: Set[Variable],
+               subst: Dict[Variable, int]) -> Iterator[Dict[Variable, int]]:
+        """Finds the assignments of the pattern variables under which pattern is in eclass."""
+        if pattern in variables:
+            bound = subst.get(pattern)
+            if bound is None:
+                yield {**subst, pattern: eclass}
+            elif self.find(bound) == eclass:
+                yield subst
+            return
+        symbol = _top_symbol(pattern)
+        pattern_args = pattern.arguments if isinstance(pattern, FuncTerm) else ()
+        for node_symbol, args in self.nodes(eclass):
+            if node_symbol != symbol or len(args) != len(pattern_args):
+                continue
+            partial = [subst]
+            for p, a in zip(pattern_args, args):
+                partial = [s2 for s1 in partial for s2 in self._match(p, a, variables, s1)]
+            yield from partial
+
+    def _instantiate(self, pattern: Term, subst: Dict[Variable, int]) -> int:
+        def instantiate_node(t: Term, args: Tuple[int, ...]) -> int:
+            if t in subst:
+                return subst[t]
+            return self._add_node((_top_symbol(t), args))
+        return fold(pattern, instantiate_node)
+
+    def _pattern_height(self, pattern: Term, subst: Dict[Variable, int],
+                        heights: Dict[int, int]) -> int:
+        def height(t: Term, args: Tuple[int, ...]) -> int:
+            if t in subst:
+                return heights.get(self.find(subst[t]), 0)
+            return 1 + max(args) if args else 0
+        return fold(pattern, height)
+
+    def saturate(self, equations: Iterable[Equation], variables: Iterable[Variable] = (),
+                 node_limit: int = 10000, iteration_limit: int = 30,
+                 max_height: Optional[int] = None) -> bool:
+        """
+        Applies equations in both directions until nothing new
+        is learned or a budget is exhausted.
+
+        Parameters
+        ----------
+        equations : Iterable[Equation]
+            The equations to apply. Their sides are added to the e-graph.
+        variables : Iterable[Variable]
+            The variables of the equations that stand for any term.
+            Other variables only stand for themselves.
+        node_limit : int
+            Stop once the e-graph has more e-nodes than this.
+        iteration_limit : int
+            The maximum number of rounds of applying every equation.
+        max_height : int, optional
+            Don't add terms whose smallest height is larger than this.
+
+        Returns
+        -------
+        bool
+            True if the e-graph is saturated, meaning that
+            applying the equations doesn't change it anymore.
+
+        Examples
+        --------
+        >>> from symcollab.algebra import *
+        >>> f = Function("f", 2)
+        >>> x, y = Variable("x"), Variable("y")
+        >>> a, b = Constant("a"), Constant("b")
+        >>> g = EGraph()
+        >>> _ = g.add(f(a, f(a, b)))
+        >>> g.saturate([Equation(f(x, y), f(y, x))], variables=[x, y])
+        True
+        >>> g.equivalent(f(a, f(a, b)), f(f(b, a), a))
+        True
+        """
+        equations = list(equations)
+        variables = set(variables)
+        for eq in equations:
+            for side in (eq.left_side, eq.right_side):
+                if variables.isdisjoint(get_vars(side, unique=True)):
+                    self.add(side)
+        self.rebuild()
+        directions = [(eq.left_side, eq.right_side) for eq in equations] + \
+            [(eq.right_side, eq.left_side) for eq in equations]
+        for _ in range(iteration_limit):
+            heights = self.heights() if max_height is not None else dict()
+            # Search first so that the e-graph doesn't change while matching
+            matches = [
+                (eclass, rhs, subst)
+                for lhs, rhs in directions
+                for eclass in self.classes()
+                for subst in self._match(lhs, eclass, variables, dict())
+            ]
+            changed = False
+            for eclass, rhs, subst in matches:
+                if max_height is not None and \
+                   self._pattern_height(rhs, subst, heights) > max_height:
+                    continue
+                size = len(self)
+                new_eclass = self._instantiate(rhs, subst)
+                if self.find(new_eclass) != self.find(eclass):
+                    self.union(eclass, new_eclass)
+                    changed = True
+                elif len(self) != size:
+                    changed = True
+                if len(self) > node_limit:
+                    self.rebuild()
+                    return False
+            self.rebuild()
+            if not changed:
+                return True
+        return False
+
@@ -0,0 +1,254 @@
+"""
+A flat, array-backed encoding of terms.
+
+A batch of terms is stored as NumPy arrays holding the
+preorder sequence of symbol ids and arities of every term,
+along with where each subterm ends. Structural queries such
+as sizes, depths and symbol counts are then computed with
+vectorized operations over the whole batch at once.
+"""
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple, Union
+import numpy as np
+from .term import Constant, FuncTerm, Function, Term, Variable
+from .traversal import preorder
+
+__all__ = ['SymbolTable', 'FlatTerms']
+
+VARIABLE = 0
+CONSTANT = 1
+FUNCTION = 2
+
+Symbol = Union[Variable, Constant, Function]
+
+class SymbolTable:
+    """
+    Assigns integer ids to the variables, constants
+    and functions that appear in flat terms.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> table = SymbolTable()
+    >>> table.id_of(Variable("x"))
+    0
+    >>> table.id_of(Function("f", 2))
+    1
+    >>> table.id_of(Variable("x"))
+    0
+    >>> table[1]
+    f
+    """
+    def __init__(self):
+        self._ids: Dict[Hashable, int] = dict()
+        self._symbols: List[Symbol] = []
+        # The class to rebuild function applications with (ex: XorTerm)
+        self._term_classes: List[type] = []
+        self._kinds: List[int] = []
+
+    @staticmethod
+    def _key(symbol: Symbol, term_class: type = FuncTerm) -> Hashable:
+        if isinstance(symbol, Variable):
+            return (VARIABLE, symbol.symbol, symbol.sort)
+        if isinstance(symbol, Constant):
+            return (CONSTANT, symbol.symbol, symbol.sort)
+        if isinstance(symbol, Function):
+            return (FUNCTION, symbol, term_class)
+        raise ValueError(f"{symbol} is not a variable, constant or function.")
+
+    def id_of(self, symbol: Symbol, term_class: type = FuncTerm) -> int:
+        """Returns the id of a symbol, adding it to the table if needed."""
+        key = SymbolTable._key(symbol, term_class)
+        symbol_id = self._ids.get(key)
+        if symbol_id is None:
+            symbol_id = len(self._symbols)
+            self._ids[key] = symbol_id
+            self._symbols.append(symbol)
+            self._term_classes.append(term_class)
+            self._kinds.append(key[0])
+        return symbol_id
+
+    def find(self, symbol: Symbol) -> List[int]:
+        """Returns the ids of a symbol without adding it (a function may have several)."""
+        if isinstance(symbol, Function):
+            return [
+                i for i, (s, kind) in enumerate(zip(self._symbols, self._kinds))
+                if kind == FUNCTION and s == symbol and s.arity == symbol.arity
+            ]
+        symbol_id = self._ids.get(SymbolTable._key(symbol))
+        return [] if symbol_id is None else [symbol_id]
+
+    @property
+    def kinds(self) -> np.ndarray:
+        """Whether each symbol is a VARIABLE (0), CONSTANT (1) or FUNCTION (2)."""
+        return np.array(self._kinds, dtype=np.int8)
+
+    def __getitem__(self, symbol_id: int) -> Symbol:
+        return self._symbols[symbol_id]
+
+    def __len__(self):
+        return len(self._symbols)
+
+
+class FlatTerms:
+    """
+    A batch of terms stored as preorder arrays.
+
+    Attributes
+    ----------
+    symbols : np.ndarray
+        The symbol id of every node, in preorder, for all terms one after the other.
+    arities : np.ndarray
+        The number of arguments of every node.
+    ends : np.ndarray
+        The index right after the last node of the subterm rooted at every node.
+    offsets : np.ndarray
+        The index of the root of every term, followed by the total number of nodes.
+    table : SymbolTable
+        The table that the symbol ids refer to.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> a = Constant("a")
+    >>> batch = FlatTerms.from_terms([f(x, f(x, a)), a])
+    >>> batch.sizes()
+    array([5, 1])
+    >>> batch.depths()
+    array([2, 0])
+    >>> batch.counts(x)
+    array([2, 0])
+    >>> batch[0]
+    f(x, f(x, a))
+    """
+    def __init__(self, symbols: np.ndarray, arities: np.ndarray,
+                 ends: np.ndarray, offsets: np.ndarray, table: SymbolTable):
+        self.symbols = symbols
+        self.arities = arities
+        self.ends = ends
+        self.offsets = offsets
+        self.table = table
+
+    @classmethod
+    def from_terms(cls, terms: Iterable[Term], table: Optional[SymbolTable] = None) -> 'FlatTerms':
+        """Encode a batch of terms, optionally reusing a symbol table."""
+        table = SymbolTable() if table is None else table
+        symbols: List[int] = []
+        arities: List[int] = []
+        ends: List[int] = []
+        offsets: List[int] = []
+        for t in terms:
+            offsets.append(len(symbols))
+            for s in preorder(t):
+                if isinstance(s, (Variable, Constant)):
+                    symbols.append(table.id_of(s))
+                    arities.append(0)
+                    ends.append(len(symbols))
+                elif isinstance(s, FuncTerm):
+                    symbols.append(table.id_of(s.function, s.__class__))
+                    arities.append(len(s.arguments))
+                    ends.append(len(symbols) - 1 + s._size)
+                else:
+                    raise ValueError(f"Cannot encode {s} of type {type(s)}.")
+        offsets.append(len(symbols))
+        return cls(
+            np.array(symbols, dtype=np.int32),
+            np.array(arities, dtype=np.int32),
+            np.array(ends, dtype=np.int64),
+            np.array(offsets, dtype=np.int64),
+            table
+        )
+
+    @classmethod
+    def from_term(cls, t: Term, table: Optional[SymbolTable] = None) -> 'FlatTerms':
+        """Encode a single term."""
+        return cls.from_terms([t], table)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> Term:
+        """Decode the i-th term of the batch."""
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("Term index out of range.")
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        # Build the term bottom-up by going through the preorder backwards
+        stack: List[Term] = []
+        for node in range(end - 1, start - 1, -1):
+            symbol = self.table[self.symbols[node]]
+            if isinstance(symbol, Function):
+                args = tuple(stack.pop() for _ in range(self.arities[node]))
+                term_class = self.table._term_classes[self.symbols[node]]
+                new_term = term_class.__new__(term_class)
+                FuncTerm.__init__(new_term, symbol, args)
+                stack.append(new_term)
+            else:
+                stack.append(symbol)
+        return stack[0]
+
+    def to_terms(self) -> List[Term]:
+        """Decode every term of the batch."""
+        return [self[i] for i in range(len(self))]
+
+    def _term_of_nodes(self) -> np.ndarray:
+        """The index of the term that every node belongs to."""
+        return np.repeat(np.arange(len(self)), self.sizes())
+
+    def _max_per_term(self, values: np.ndarray) -> np.ndarray:
+        if len(self) == 0:
+            return np.zeros(0, dtype=values.dtype)
+        return np.maximum.reduceat(values, self.offsets[:-1])
+
+    def sizes(self) -> np.ndarray:
+        """The number of nodes in every term."""
+        return np.diff(self.offsets)
+
+    def node_depths(self) -> np.ndarray:
+        """The depth of every node within its term, with roots at depth 0."""
+        # The ancestors of a node are the nodes before it whose subterm hasn't ended yet
+        positions = np.arange(len(self.symbols))
+        ended = np.searchsorted(np.sort(self.ends), positions, side='right')
+        return positions - ended
+
+    def depths(self) -> np.ndarray:
+        """The depth of every term, as given by symcollab.algebra.depth."""
+        return self._max_per_term(self.node_depths())
+
+    def nesting_depths(self, function: Function) -> np.ndarray:
+        """
+        The largest number of applications of function that
+        are nested inside each other, for every term.
+        """
+        is_function = np.isin(self.symbols, self.table.find(function))
+        positions = np.arange(len(self.symbols))
+        # Count the applications of function that are ancestors of (or at) every node
+        started = np.cumsum(is_function)
+        ended = np.searchsorted(np.sort(self.ends[is_function]), positions, side='right')
+        return self._max_per_term(started - ended)
+
+    def symbol_histogram(self) -> np.ndarray:
+        """
+        Returns a matrix where the entry (i, j) is the number of
+        times the symbol with id j occurs in the i-th term.
+        """
+        num_symbols = len(self.table)
+        flat_index = self._term_of_nodes() * num_symbols + self.symbols
+        histogram = np.bincount(flat_index, minlength=len(self) * num_symbols)
+        return histogram.reshape(len(self), num_symbols)
+
+    def counts(self, symbol: Symbol) -> np.ndarray:
+        """The number of occurrences of a variable, constant or function in every term."""
+        matches = np.isin(self.symbols, self.table.find(symbol))
+        return np.bincount(self._term_of_nodes()[matches], minlength=len(self))
+
+    def variable_counts(self) -> Tuple[List[Variable], np.ndarray]:
+        """
+        Returns the variables of the symbol table along with a
+        matrix of the number of times each occurs in every term.
+        """
+        variable_ids = np.flatnonzero(self.table.kinds == VARIABLE)
+        variables = [self.table[i] for i in variable_ids]
+        return variables, self.symbol_histogram()[:, variable_ids]
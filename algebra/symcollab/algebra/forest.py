@@ -17,6 +17,9 @@
 	thereforea max_height is required in order to 
 	guarantee termination.
 
+	For large sets of equations, EGraph in symcollab.algebra.egraph
+	represents the same equalities without enumerating every term.
+
 	Examples
 	--------
 	>>> from symcollab.algebra import *
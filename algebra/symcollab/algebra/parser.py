@@ -3,10 +3,64 @@ This module is responsible for creating
 terms out of strings, given a set of
 known terms.
 """
-from typing import Optional, Union, Set, List
-from .term import Variable, Constant, Function, Term
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from .store import TermStore
+from .term import Variable, Constant, Equation, Function, Term
 
-__all__ = ['Parser']
+__all__ = ['Parser', 'ParseError']
+
+Symbol = Union[Variable, Constant, Function]
+
+class ParseError(ValueError):
+    """
+    Raised when a string cannot be parsed.
+
+    Attributes
+    ----------
+    position : int
+        The index in the string where the error was found.
+    line : int, optional
+        The line number of the error when parsing a stream.
+    """
+    def __init__(self, message: str, position: int, line: Optional[int] = None):
+        where = f"line {line}, position {position}" if line is not None else f"position {position}"
+        super().__init__(f"{message} (at {where})")
+        self.message = message
+        self.position = position
+        self.line = line
+
+    def at_line(self, line: int) -> 'ParseError':
+        """The same error located on a line of a stream."""
+        return ParseError(self.message, self.position, line)
+
+# Characters that are tokens on their own
+_PUNCTUATION = frozenset("(),")
+
+# Separators between the two sides of a statement
+_EQUATION = "="
+_RULE_ARROWS = ("→", "->")
+
+def _tokenize(text: str, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[str, int]]:
+    """
+    Splits text into symbols and punctuation.
+    Yields every token along with its position.
+    """
+    end = len(text) if end is None else end
+    i = start
+    while i < end:
+        c = text[i]
+        if c.isspace():
+            i += 1
+        elif c in _PUNCTUATION:
+            yield c, i
+            i += 1
+        else:
+            j = i + 1
+            while j < end and not text[j].isspace() and text[j] not in _PUNCTUATION:
+                j += 1
+            yield text[i:j], i
+            i = j
 
 class Parser:
     """
@@ -16,6 +70,24 @@ class Parser:
     that represents a term and create the term using the
     algebra library.
 
+    Parameters
+    ----------
+    store : TermStore, optional
+        If given, the parsed terms are interned in the store.
+    rule_factory : Callable[[Term, Term], Any], optional
+        Builds the rewrite rules of the statements written
+        as ``s → t``, for instance symcollab.rewrite.RewriteRule.
+        Without it, such statements are a ParseError.
+
+    Attributes
+    ----------
+    variables : Set[Variable]
+        The variables known to the parser.
+    constants : Set[Constant]
+        The constants known to the parser.
+    functions : Set[Function]
+        The functions known to the parser.
+
     Examples
     --------
     >>> from symcollab.algebra import *
@@ -27,124 +99,253 @@ class Parser:
     >>> p.parse("f(x,x)")
     f(x, x)
     """
-    def __init__(self):
+    def __init__(self, store: Optional[TermStore] = None,
+                 rule_factory: Optional[Callable[[Term, Term], Any]] = None):
+        self.store = store
+        self.rule_factory = rule_factory
         self.variables: Set[Variable] = set()
         self.constants: Set[Constant] = set()
         self.functions: Set[Function] = set()
 
-    def add(self, term: Union[Variable, Constant, Function]):
+    def add(self, term: Symbol):
         """Adds a term to the parser."""
-        if isinstance(term, Variable):
-            if self._find_constant(term.symbol) is not None:
-                raise ValueError("Symbol is already defined as a constant in the Parser")
-            if self._find_function(term.symbol) is not None:
-                raise ValueError("Symbol is already defined as a function in the Parser")
-            self.variables.add(term)
-        elif isinstance(term, Constant):
-            if self._find_variable(term.symbol) is not None:
-                raise ValueError("Symbol is already defined as a variable in the Parser")
-            if self._find_function(term.symbol) is not None:
-                raise ValueError("Symbol is already defined as a function in the Parser")
-            self.constants.add(term)
-        elif isinstance(term, Function):
-            if self._find_constant(term.symbol) is not None:
-                raise ValueError("Symbol is already defined as a constant in the Parser")
-            if self._find_variable(term.symbol) is not None:
-                raise ValueError("Symbol is already defined as a variable in the Parser")
-            self.functions.add(term)
-        else:
+        if not isinstance(term, (Variable, Constant, Function)):
             raise ValueError("Argument to Parser.add must be a Variable, Constant, or Function")
+        existing = self._symbol_table().get(term.symbol)
+        if existing is not None:
+            if _kind(existing) != _kind(term):
+                raise ValueError(f"Symbol is already defined as a {_kind(existing)} in the Parser")
+            # The new term replaces the one with the same symbol
+            self._symbols_of_kind(existing).discard(existing)
+        self._symbols_of_kind(term).add(term)
 
-    def remove(self, term: Union[Variable, Constant, Function]):
+    def remove(self, term: Symbol):
         """Remove a term from the parser."""
-        if isinstance(term, Variable):
-            self.variables -= {term}
-        elif isinstance(term, Constant):
-            self.constants -= {term}
-        elif isinstance(term, Function):
-            self.functions -= {term}
+        self._symbols_of_kind(term).discard(term)
+
+    def _symbols_of_kind(self, symbol: Symbol) -> Set:
+        """The set of the symbols of the same kind as symbol."""
+        if isinstance(symbol, Variable):
+            return self.variables
+        if isinstance(symbol, Constant):
+            return self.constants
+        return self.functions
+
+    def _symbol_table(self) -> Dict[str, Symbol]:
+        """
+        Maps the name of each symbol to the symbol. It is made from the
+        sets every time, since they can be changed directly.
+        """
+        return {s.symbol: s for s in chain(self.functions, self.constants, self.variables)}
 
     def parse(self, x: str) -> Union[Term, Function]:
         """Attempt to parse a string given the parser's existing signature."""
-        # First remove all whitespace since it's irrelevant
-        x = x.replace(' ', '')
-        start_i = x.find("(")
-        if start_i != -1:
-            end_i = self._find_last_char(")", x)
-            if end_i == -1:
-                raise ValueError("Parenthesis misbalance")
-
-            # We have a function!
-            function_name = x[:start_i]
-            function_handle = self._find_function(function_name)
-            if function_handle is None:
-                raise ValueError("Function " + function_name + " is not defined in the Parser")
-
-            argument_strings = self._parse_arguments(x[(start_i + 1):(end_i - 1)])
-
-            if len(argument_strings) != function_handle.arity:
-                raise ValueError("Arity Mismatch: Parsed String: " + str(len(argument_strings)) +
-                    ", Function " + function_handle.symbol + ": " + str(function_handle.arity))
-
-            args = [self.parse(arg_string) for arg_string in argument_strings]
-            return function_handle(*args)
-        else:
-            x_var = self._find_variable(x)
-            if x_var is not None:
-                return x_var
-            x_constant = self._find_constant(x)
-            if x_constant is not None:
-                return x_constant
-            x_function = self._find_function(x)
-            if x_function is not None:
-                return x_function
-            # If none of the above matched return an error
-            raise ValueError("Symbol " + x + " is undefined in the Parser")
-
-    def _find(self, x: str, container: List[Union[Function, Constant, Variable]]):
-        for c in container:
-            if x == c.symbol:
-                return c
-        return None
-
-    def _find_function(self, x: str) -> Optional[Function]:
-        return self._find(x, self.functions)
-
-    def _find_constant(self, x: str) -> Optional[Constant]:
-        return self._find(x, self.constants)
-
-    def _find_variable(self, x: str) -> Optional[Variable]:
-        return self._find(x, self.variables)
-
-    def _find_last_char(self, needle: str, haystack: str) -> int:
-        for i, c in enumerate(reversed(haystack)):
-            if c == needle:
-                return len(haystack) - i
-        return -1
-
-    # Splits the arguments up to a list of arguments
-    def _parse_arguments(self, arguments_string: str) -> List[str]:
-        args: List[str] = []
-        start_i = 0
-        num_parentheses = 0
-        for i, c in enumerate(arguments_string):
-            # If we saw an opening parenthesis,
-            # we need to ignore input until the end parenthesis is matched.
-            if num_parentheses > 0:
-                if c == ")":
-                    num_parentheses -= 1
-                elif c == "(":
-                    num_parentheses += 1
+        return self._parse(x, 0, len(x))
+
+    def parse_statement(self, x: str) -> Any:
+        """
+        Parse a term, an equation written as ``s = t``,
+        or a rewrite rule written as ``s → t`` or ``s -> t``.
+
+        Examples
+        --------
+        >>> from symcollab.algebra import *
+        >>> f = Function("f", 1)
+        >>> x = Variable("x")
+        >>> p = Parser()
+        >>> p.add(f)
+        >>> p.add(x)
+        >>> p.parse_statement("f(x) = x")
+        f(x) = x
+        >>> from symcollab.rewrite import RewriteRule
+        >>> p.rule_factory = RewriteRule
+        >>> p.parse_statement("f(f(x)) -> x")
+        f(f(x)) → x
+        """
+        separator, position = _find_separator(x)
+        if separator is None:
+            return self._parse(x, 0, len(x))
+        if separator != _EQUATION and self.rule_factory is None:
+            raise ParseError("Rewrite rules need the Parser to have a rule_factory", position)
+        left = self._parse(x, 0, position)
+        right = self._parse(x, position + len(separator), len(x))
+        if separator == _EQUATION:
+            return Equation(left, right)
+        return self.rule_factory(left, right)
+
+    def parse_many(self, strings: Iterable[str]) -> Iterator[Any]:
+        """
+        Lazily parse every string as a statement.
+        A string that cannot be parsed gives a ParseError in
+        its place, with the index of the string (from 1) as its line.
+        """
+        for line, x in enumerate(strings, 1):
+            try:
+                yield self.parse_statement(x)
+            except ParseError as e:
+                yield e.at_line(line)
+
+    def parse_stream(self, lines: Iterable[str]) -> Iterator[Any]:
+        """
+        Lazily parse the statements of a text file, or of
+        any iterable of lines, keeping one statement in memory.
+
+        Every non-empty line that doesn't start with ``#`` is a
+        statement. A statement with unclosed parentheses continues
+        on the next lines. A statement that cannot be parsed gives a
+        ParseError in its place, located on the line it starts on.
+
+        Examples
+        --------
+        >>> import io
+        >>> from symcollab.algebra import *
+        >>> f = Function("f", 2)
+        >>> x = Variable("x")
+        >>> p = Parser()
+        >>> p.add(f)
+        >>> p.add(x)
+        >>> text = "# Example\\nf(x,\\n  x) = x\\ng(x)\\nx\\n"
+        >>> for result in p.parse_stream(io.StringIO(text)):
+        ...     print(repr(result))
+        f(x, x) = x
+        ParseError('Symbol g is undefined in the Parser (at line 4, position 0)')
+        x
+        """
+        record: List[str] = []
+        record_line = 0
+        open_parentheses = 0
+        for line, text in enumerate(lines, 1):
+            if not record:
+                stripped = text.strip()
+                if not stripped or stripped.startswith('#'):
+                    continue
+                record_line = line
+            record.append(text.rstrip('\r\n'))
+            open_parentheses += text.count('(') - text.count(')')
+            if open_parentheses > 0:
+                continue
+            statement = " ".join(record)
+            record = []
+            open_parentheses = 0
+            try:
+                yield self.parse_statement(statement)
+            except ParseError as e:
+                yield e.at_line(record_line)
+        if record:
+            try:
+                yield self.parse_statement(" ".join(record))
+            except ParseError as e:
+                yield e.at_line(record_line)
+
+    def _parse(self, text: str, start: int, end: int) -> Union[Term, Function]:
+        """Parse text[start:end] as a single term."""
+        tokens = _tokenize(text, start, end)
+        symbols = self._symbol_table()
+        # Each frame is a function being applied, where it started, and the arguments parsed so far
+        stack: List[Tuple[Function, int, List[Term]]] = []
+        result: Optional[Union[Term, Function]] = None
+        # What the next token can be
+        expect_term = True
+        for token, position in tokens:
+            if expect_term:
+                if token in _PUNCTUATION:
+                    if token == ')' and stack and not stack[-1][2]:
+                        # Function applied to no arguments
+                        result = self._reduce(stack.pop())
+                        expect_term = False
+                        if stack:
+                            stack[-1][2].append(result)
+                        continue
+                    raise ParseError(f"Expected a symbol, got '{token}'", position)
+                symbol = symbols.get(token)
+                if symbol is None:
+                    raise ParseError(f"Symbol {token} is undefined in the Parser", position)
+                if isinstance(symbol, Function):
+                    following = next(tokens, None)
+                    if following is None and not stack:
+                        # A lone function symbol
+                        result = symbol
+                        break
+                    if following is None or following[0] != '(':
+                        raise ParseError(
+                            f"Expected '(' after function {token}",
+                            following[1] if following is not None else end
+                        )
+                    stack.append((symbol, position, []))
+                    continue
+                result = symbol if self.store is None else self.store.intern(symbol)
+                expect_term = False
+                if stack:
+                    stack[-1][2].append(result)
             else:
-                if c == ",":
-                    args.append(arguments_string[start_i:i])
-                    start_i = i + 1
-                elif c == "(":
-                    num_parentheses += 1
-
-        if num_parentheses > 0:
-            raise ValueError("Parenthesis Mismatch")
-
-        # Add last argument
-        args.append(arguments_string[start_i:])
-        return args
+                if not stack:
+                    raise ParseError(f"Unexpected '{token}' after the end of the term", position)
+                if token == ',':
+                    expect_term = True
+                elif token == ')':
+                    result = self._reduce(stack.pop())
+                    if stack:
+                        stack[-1][2].append(result)
+                else:
+                    raise ParseError(f"Expected ',' or ')', got '{token}'", position)
+        if stack:
+            raise ParseError("Parenthesis misbalance", end)
+        if result is None:
+            raise ParseError("Expected a term", end)
+        return result
+
+    def _reduce(self, frame: Tuple[Function, int, List[Term]]) -> Term:
+        """Apply a function to its parsed arguments."""
+        function, position, args = frame
+        if len(args) != function.arity and not function.variadic:
+            raise ParseError(
+                "Arity Mismatch: Parsed String: " + str(len(args)) +
+                ", Function " + function.symbol + ": " + str(function.arity),
+                position
+            )
+        try:
+            t = function(*args)
+        except ValueError as e:
+            # Such as arguments outside of the domain of the function
+            raise ParseError(str(e), position) from e
+        if self.store is not None:
+            # The arguments are interned already, so only t needs to be looked up
+            t = self.store._intern_node(t, t.arguments)
+        return t
+
+
+def _find_separator(text: str) -> Tuple[Optional[str], int]:
+    """
+    Finds the separator between the two sides of a statement,
+    outside of any parentheses.
+    """
+    found: Tuple[Optional[str], int] = (None, -1)
+    depth = 0
+    i = 0
+    while i < len(text):
+        c = text[i]
+        separator = None
+        if c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+        elif depth == 0:
+            if c == _EQUATION:
+                separator = _EQUATION
+            else:
+                separator = next((a for a in _RULE_ARROWS if text.startswith(a, i)), None)
+        if separator is not None:
+            if found[0] is not None:
+                raise ParseError(f"Unexpected '{separator}' in a statement", i)
+            found = (separator, i)
+            i += len(separator)
+        else:
+            i += 1
+    return found
+
+def _kind(symbol: Symbol) -> str:
+    if isinstance(symbol, Variable):
+        return "variable"
+    if isinstance(symbol, Constant):
+        return "constant"
+    return "function"
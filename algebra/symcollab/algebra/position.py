@@ -0,0 +1,205 @@
+"""
+Positions describe where a subterm is located inside a term.
+
+A position is the sequence of argument indices, starting from 1,
+to follow from the root of the term to reach the subterm.
+For example, in f(f(a, f(b, c)), d) the position 121
+points to b and the empty position points to the whole term.
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from .term import FuncTerm, Function, Term, Variable, _with_arguments
+
+__all__ = ['Position', 'subterm_at', 'replace_at', 'positions', 'PositionIndex']
+
+class Position(str):
+    """
+    A position inside a term.
+
+    Positions are strings so that they can be written and
+    compared as such. Each index is written as a single digit,
+    or between brackets when it is larger than 9.
+
+    Parameters
+    ----------
+    path : Union[str, Iterable[int]]
+        Either the textual form of the position or its indices.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import Position
+    >>> Position('121').indices
+    (1, 2, 1)
+    >>> Position([1, 12, 1])
+    '1[12]1'
+    >>> Position('12').child(3) == '123'
+    True
+    """
+    def __new__(cls, path: Union[str, Iterable[int]] = ''):
+        if isinstance(path, Position):
+            return path
+        indices = _parse(path) if isinstance(path, str) else tuple(path)
+        for i in indices:
+            if not isinstance(i, int) or i < 1:
+                raise ValueError(f"Invalid index {i} in position {path}.")
+        position = super().__new__(cls, ''.join(
+            str(i) if i < 10 else f"[{i}]" for i in indices
+        ))
+        position.indices = indices
+        return position
+
+    def child(self, i: int) -> 'Position':
+        """The position of the i-th argument of the subterm at this position."""
+        return Position(self.indices + (i,))
+
+    @property
+    def parent(self) -> Optional['Position']:
+        """The position right above this one, None for the root."""
+        return Position(self.indices[:-1]) if self.indices else None
+
+    def is_prefix_of(self, position: 'Position') -> bool:
+        """Returns true if position is at or below this one."""
+        position = Position(position)
+        return position.indices[:len(self.indices)] == self.indices
+
+    def __repr__(self):
+        return str.__repr__(self)
+
+
+def _parse(text: str) -> Tuple[int, ...]:
+    """Parse the textual form of a position."""
+    indices: List[int] = []
+    i = 0
+    while i < len(text):
+        if text[i] == '[':
+            end = text.find(']', i)
+            if end == -1 or not text[i + 1:end].isdigit():
+                raise ValueError(f"Invalid position {text}.")
+            indices.append(int(text[i + 1:end]))
+            i = end + 1
+        elif text[i].isdigit():
+            indices.append(int(text[i]))
+            i += 1
+        else:
+            raise ValueError(f"Invalid position {text}.")
+    return tuple(indices)
+
+def _invalid(position, term: Term) -> ValueError:
+    return ValueError("Position " + position + " is not valid for term " + str(term))
+
+def subterm_at(term: Term, position: Union[Position, str]) -> Term:
+    """
+    Returns the subterm at a position.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> a, b, c, d = Constant("a"), Constant("b"), Constant("c"), Constant("d")
+    >>> subterm_at(f(f(a, f(b, c)), d), '121')
+    b
+    """
+    position = Position(position)
+    t = term
+    for i in position.indices:
+        if not isinstance(t, FuncTerm) or i > len(t.arguments):
+            raise _invalid(position, term)
+        t = t.arguments[i - 1]
+    return t
+
+def replace_at(term: Term, position: Union[Position, str], subterm: Term) -> Term:
+    """
+    Returns a term where the subterm at a position is replaced.
+
+    Only the terms along the path to the position are
+    copied, everything else is shared with the original term.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> a, b, c, d = Constant("a"), Constant("b"), Constant("c"), Constant("d")
+    >>> replace_at(f(f(a, f(b, c)), d), '12', a)
+    f(f(a, a), d)
+    """
+    position = Position(position)
+    path: List[FuncTerm] = []
+    t = term
+    for i in position.indices:
+        if not isinstance(t, FuncTerm) or i > len(t.arguments):
+            raise _invalid(position, term)
+        path.append(t)
+        t = t.arguments[i - 1]
+    # Rebuild the path bottom-up
+    new_term = subterm
+    for parent, i in zip(reversed(path), reversed(position.indices)):
+        arguments = list(parent.arguments)
+        arguments[i - 1] = new_term
+        new_term = _with_arguments(parent, arguments)
+    return new_term
+
+def positions(term: Term) -> Iterator[Tuple[Position, Term]]:
+    """
+    Iterate through all the positions of a term with
+    their subterms, parents before their arguments.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> x, a = Variable("x"), Constant("a")
+    >>> list(positions(f(x, a)))
+    [('', f(x, a)), ('1', x), ('2', a)]
+    """
+    stack: List[Tuple[Position, Term]] = [(Position(), term)]
+    while stack:
+        position, t = stack.pop()
+        yield position, t
+        if isinstance(t, FuncTerm):
+            stack.extend(
+                (position.child(i), arg)
+                for i, arg in reversed(list(enumerate(t.arguments, 1)))
+            )
+
+
+class PositionIndex:
+    """
+    An index of the positions of a term, built on first use.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> g = Function("g", 1)
+    >>> x, a = Variable("x"), Constant("a")
+    >>> index = PositionIndex(f(g(x), g(a)))
+    >>> index.non_variable()
+    ['', '1', '2', '21']
+    >>> index.with_symbol(g)
+    ['1', '2']
+    """
+    def __init__(self, term: Term):
+        self.term = term
+        self._positions: Optional[List[Tuple[Position, Term]]] = None
+        self._by_symbol: Optional[Dict[Function, List[Position]]] = None
+
+    def all(self) -> List[Tuple[Position, Term]]:
+        """All the positions of the term along with their subterms."""
+        if self._positions is None:
+            self._positions = list(positions(self.term))
+        return self._positions
+
+    def non_variable(self) -> List[Position]:
+        """The positions of the term that aren't variables."""
+        return [p for p, t in self.all() if not isinstance(t, Variable)]
+
+    def with_symbol(self, function: Function) -> List[Position]:
+        """The positions of the subterms with function at the top."""
+        if self._by_symbol is None:
+            self._by_symbol = dict()
+            for p, t in self.all():
+                if isinstance(t, FuncTerm):
+                    self._by_symbol.setdefault(t.function, []).append(p)
+        return self._by_symbol.get(function, [])
+
+    def __getitem__(self, position: Union[Position, str]) -> Term:
+        return subterm_at(self.term, position)
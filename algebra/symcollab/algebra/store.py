@@ -0,0 +1,119 @@
+"""
+Hash-consing for terms.
+
+A TermStore interns terms so that structurally equal
+terms are represented by the same object. Comparing two
+interned terms then only needs an identity check and
+their hashes are computed once at construction.
+"""
+from typing import Any, Dict, Hashable, Optional
+from . import term as _term
+from .term import Constant, FuncTerm, Function, Sort, Term, Variable, _with_arguments
+from .traversal import fold
+
+__all__ = ['TermStore']
+
+class TermStore:
+    """
+    A hash-consing factory for terms.
+
+    While a store is active (used as a context manager), every
+    application of a Function produces an interned FuncTerm whose
+    variables, constants, and subterms are interned as well.
+    Terms made outside of the store can be brought in with ``intern``.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> a = Constant("a")
+    >>> store = TermStore()
+    >>> with store:
+    ...     t1 = f(x, f(x, a))
+    ...     t2 = f(x, f(x, a))
+    >>> t1 is t2
+    True
+    >>> store.intern(f(x, f(x, a))) is t1
+    True
+    """
+    def __init__(self):
+        self._table: Dict[Hashable, Term] = dict()
+        self._previous_stores = []
+
+    def variable(self, symbol: str, sort: Optional[Sort] = None) -> Variable:
+        """Returns the interned variable with the given symbol and sort."""
+        return self._lookup((Variable, symbol, sort), lambda: Variable(symbol, sort))
+
+    def constant(self, symbol: str, sort: Optional[Sort] = None) -> Constant:
+        """Returns the interned constant with the given symbol and sort."""
+        return self._lookup((Constant, symbol, sort), lambda: Constant(symbol, sort))
+
+    def function_term(self, function: Function, args) -> FuncTerm:
+        """
+        Returns the interned FuncTerm of function applied to args.
+        The arguments are interned first.
+        """
+        args = tuple(self.intern(arg) for arg in args)
+        return self._lookup(
+            (FuncTerm, function, args),
+            lambda: function._new_term(args)
+        )
+
+    def intern(self, t: Term) -> Term:
+        """
+        Returns the representative of t in this store,
+        adding t (or a copy of it) if it isn't present yet.
+        """
+        return fold(t, self._intern_node)
+
+    def _intern_node(self, t: Term, args) -> Term:
+        """Intern t given the representatives of its arguments."""
+        if isinstance(t, (Variable, Constant)):
+            return self._lookup((type(t), t.symbol, t.sort), lambda: t)
+        if isinstance(t, FuncTerm):
+            # The function decides the class of the term, as in function_term
+            return self._lookup(
+                (FuncTerm, t.function, args),
+                lambda: t if _same_objects(args, t.arguments) else _with_arguments(t, args)
+            )
+        raise ValueError(f"Cannot intern {t} of type {type(t)}.")
+
+    def clear(self):
+        """Forgets every term interned so far."""
+        self._table.clear()
+
+    def _lookup(self, key: Hashable, make: Any) -> Term:
+        t = self._table.get(key)
+        if t is None:
+            t = make()
+            self._table[key] = t
+        return t
+
+    def __contains__(self, t: Term) -> bool:
+        """Returns true if t itself is a representative in this store."""
+        if isinstance(t, (Variable, Constant)):
+            key = (type(t), t.symbol, t.sort)
+        elif isinstance(t, FuncTerm):
+            key = (FuncTerm, t.function, t.arguments)
+        else:
+            return False
+        return self._table.get(key) is t
+
+    def __len__(self):
+        return len(self._table)
+
+    def __enter__(self):
+        self._previous_stores.append(_term._active_store)
+        _term._active_store = self
+        return self
+
+    def __exit__(self, *_):
+        _term._active_store = self._previous_stores.pop()
+
+    def __repr__(self):
+        return f"TermStore({len(self)} terms)"
+
+
+def _same_objects(xs, ys) -> bool:
+    return all(x is y for x, y in zip(xs, ys))
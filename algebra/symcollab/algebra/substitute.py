@@ -3,11 +3,12 @@ This module is responsible for describing substitutions
 which are mappings between variables and terms, as well
 as the application of them.
 """
-from typing import List, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from copy import deepcopy
-from .term import Variable, Constant, FuncTerm, Term
+from .term import Variable, Constant, FuncTerm, Term, _with_arguments
+from .traversal import fold
 
-__all__ = ['SortMismatch', 'SubstituteTerm']
+__all__ = ['SortMismatch', 'SubstituteTerm', 'TriangularSubstitution']
 
 class SortMismatch(Exception):
     """Raise when there is a sort mismatch."""
@@ -43,7 +44,16 @@ class SubstituteTerm:
     a
     """
     def __init__(self):
-        self.subs: Set[Tuple[Variable, Term]] = set()
+        self._bindings: Dict[Variable, Term] = dict()
+
+    @property
+    def subs(self) -> Set[Tuple[Variable, Term]]:
+        """The mappings of the substitution as a set of (variable, term) pairs."""
+        return set(self._bindings.items())
+
+    @subs.setter
+    def subs(self, mappings: Iterable[Tuple[Variable, Term]]):
+        self._bindings = dict(mappings)
 
     def add(self, variable: Variable, term: Term):
         """
@@ -76,22 +86,15 @@ class SubstituteTerm:
 
         # Check to see if what we're adding already exists
         # in the substitution set
-        for sub_var, sub_term in self.subs:
-            if sub_var == variable and term != sub_term:
-                raise ValueError(f"{variable} already exists in the substitution set")
+        sub_term = self._bindings.get(variable)
+        if sub_term is not None and term != sub_term:
+            raise ValueError(f"{variable} already exists in the substitution set")
 
-        self.subs.add((variable, term))
+        self._bindings[variable] = term
 
     def remove(self, variable: Variable):
         """Removes a mapping from a variable"""
-        # The removal technique consists of creating a set
-        # that contains what you want to remove
-        # and then do set subtraction
-        to_remove = {}
-        for sub_var, sub_term in self.subs:
-            if sub_var == variable:
-                to_remove = {(sub_var, sub_term)}
-        self.subs = self.subs - to_remove
+        self._bindings.pop(variable, None)
 
     def replace(self, variable: Variable, term: Term):
         """Replaces a mapping from a variable with another term"""
@@ -99,55 +102,53 @@ class SubstituteTerm:
         assert isinstance(term, Constant) or \
             isinstance(term, FuncTerm) or \
             isinstance(term, Variable)
-        self.remove(variable)
-        # We don't have to call self.add as we already
-        # ensured that the item is removed
-        self.subs.add((variable, term))
+        self._bindings[variable] = term
 
     def domain(self) -> List[Variable]:
         """
         Grabs the domain (the left side) of the substitutions.
 
-        Warning: Do not pair this call with range as ordering is not guarenteed.
+        The order matches the one given by range.
         """
-        return [m[0] for m in self.subs]
+        return list(self._bindings.keys())
 
     def range(self) -> List[Term]:
         """
         Grabs the range (the right side) of the substitutions.
 
-        Warning: Do not pair this call with domain as ordering is not guarenteed.
+        The order matches the one given by domain.
         """
-        return [m[1] for m in self.subs]
+        return list(self._bindings.values())
 
     def __len__(self):
-        return len(self.subs)
+        return len(self._bindings)
 
     def __deepcopy__(self, memo):
         subterm = SubstituteTerm()
-        for variable, term in self.subs:
-            subterm.add(
-                deepcopy(variable),
-                deepcopy(term)
-            )
+        for variable, term in self._bindings.items():
+            subterm._bindings[deepcopy(variable)] = deepcopy(term)
 
         return subterm
 
     def __str__(self):
-        sorted_subs = sorted(self.subs, key=lambda k: _variable_key(k[0]))
-        str_repr = "{\n" if len(self.subs) > 1 else "{"
+        sorted_subs = sorted(self._bindings.items(), key=lambda k: _variable_key(k[0]))
+        str_repr = "{\n" if len(self._bindings) > 1 else "{"
         str_repr += ",\n".join(
             [f"{variable} ↦ {term}" for variable, term in sorted_subs]
         )
-        str_repr += "\n}" if len(self.subs) > 1 else "}"
+        str_repr += "\n}" if len(self._bindings) > 1 else "}"
         return str_repr
 
     def _applysub(self, term: Term) -> Term:
-        """Apply a substitution to a term"""
+        """
+        Apply a substitution to a term.
+
+        Terms are never modified in place. Subterms without any
+        substituted variables are shared with the original term
+        and the term itself is returned if nothing changes.
+        """
         assert isinstance(term, (Constant, Variable, FuncTerm))
-        new_term = deepcopy(term)
-        new_term = self._termSubstituteHelper(new_term)
-        return new_term
+        return self._termSubstituteHelper(term)
 
     def __rmul__(self, term: Term) -> Term:
         return self._applysub(term)
@@ -159,6 +160,8 @@ class SubstituteTerm:
         Source: Franz Baader and Wayne Snyder.
         Unification Theory. Handbook of Automated Reasoning, 2001
         """
+        if isinstance(theta, TriangularSubstitution):
+            theta = theta.to_idempotent()
         if not isinstance(theta, SubstituteTerm):
             raise ValueError(
                 "Expected a substitution to the right of *, \
@@ -166,31 +169,19 @@ class SubstituteTerm:
                 If so, swap the arguments."
             )
 
-        # If our substitution is empty, then return theta
-        if len(self.subs) == 0:
-            return deepcopy(theta)
-
-        v, t = zip(*self.subs)
-        # Apply theta to every term in its range
-        t = tuple(map(theta, t))
-        sigma1 = SubstituteTerm()
-        sigma1.subs = set(zip(v, t))
-
-        # Remove any binding x->t where x in Dom(sigma)
-        theta1 = deepcopy(theta)
-        theta_dom = theta1.domain()
-        for vt in v:
-            if vt in theta_dom:
-                theta1.remove(vt)
-
-        # Remove trival bindings
-        for vt, tt in zip(v, t):
-            if vt == tt:
-                sigma1.remove(vt)
-
-        # Union the two substitution sets
         result = SubstituteTerm()
-        result.subs = sigma1.subs | theta1.subs
+        # Apply theta to every term in our range
+        # and remove the trivial bindings
+        for vt, tt in self._bindings.items():
+            tt = theta(tt)
+            if vt != tt:
+                result._bindings[vt] = tt
+
+        # Union with the bindings x->t of theta where x not in Dom(sigma)
+        for vt, tt in theta._bindings.items():
+            if vt not in self._bindings:
+                result._bindings[vt] = tt
+
         return result
 
     def __call__(self, term: Term) -> Term:
@@ -199,27 +190,150 @@ class SubstituteTerm:
 
     def _termSubstituteHelper(self, term: Term) -> Term:
         # If there is nothing in the substitution set, return the same term
-        if len(self.subs) == 0:
+        if len(self._bindings) == 0:
             return term
+        # Fold bottom-up so deep terms don't hit the recursion limit,
+        # skipping the ground subterms that have nothing to substitute
+        return fold(term, self._substitute_node, descend=_has_variables)
 
-        # Recurse down if term is a FuncTerm
-        if isinstance(term, FuncTerm):
-            new_arguments = [
-                self._termSubstituteHelper(t)
-                for t in term.arguments
-            ]
-            term.arguments = new_arguments
-            return term
-
-            # Note: Can't do the below because it simplifies with xor
-            # which breaks some of the crypto procedures.
-            # return term.function(*new_arguments)
-
+    def _substitute_node(self, term: Term, new_arguments: Tuple[Term, ...]) -> Term:
+        """Substitute in a subterm given its substituted arguments."""
         # If term is a variable in the substitution
         # then return its substitute
         if isinstance(term, Variable):
-            for sub_var, sub_term in self.subs:
-                if term == sub_var:
-                    return deepcopy(sub_term)
+            return self._bindings.get(term, term)
+        if len(new_arguments) == 0 or \
+                all(new is old for new, old in zip(new_arguments, term.arguments)):
+            return term
+        # Note: Can't use term.function(*new_arguments) because it
+        # simplifies with xor which breaks some of the crypto procedures.
+        return _with_arguments(term, new_arguments)
+
+def _has_variables(term: Term) -> bool:
+    """Whether a substitution can change the arguments of a term."""
+    return isinstance(term, FuncTerm) and not term._ground
+
+
+class TriangularSubstitution:
+    """
+    Represents a composition of substitutions in triangular form.
 
-        return term
+    The bindings x1 ↦ t1, ..., xn ↦ tn are recorded in order and stand
+    for the composition {x1 ↦ t1}{x2 ↦ t2}...{xn ↦ tn}. Composing with
+    another substitution appends its bindings, so it takes amortized
+    constant time per binding. The bindings are only resolved against
+    each other when the substitution is applied or when calling
+    to_idempotent, and resolved terms share their common subterms.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> x0, x1, x2 = Variable("x0"), Variable("x1"), Variable("x2")
+    >>> sigma = TriangularSubstitution()
+    >>> sigma.add(x2, f(x1, x1))
+    >>> sigma.add(x1, f(x0, x0))
+    >>> x2 * sigma
+    f(f(x0, x0), f(x0, x0))
+    >>> print(sigma.to_idempotent())
+    {
+    x1 ↦ f(x0, x0),
+    x2 ↦ f(f(x0, x0), f(x0, x0))
+    }
+    """
+    def __init__(self):
+        # The list of bindings may be shared with compositions
+        # of this substitution, which only ever append to it.
+        self._bindings: List[Tuple[Variable, Term]] = []
+        self._length = 0
+        self._resolved: Optional[SubstituteTerm] = None
+
+    def add(self, variable: Variable, term: Term):
+        """
+        Composes this substitution with the mapping from variable to term.
+
+        Parameters
+        ----------
+        variable : Variable
+            The variable to replace
+        term : Term
+            The term to replace the variable with.
+        """
+        assert isinstance(variable, Variable)
+        assert isinstance(term, (Constant, FuncTerm, Variable))
+        if variable.sort != term.sort:
+            raise SortMismatch("Substitution must preserve sorts.")
+        self._own_bindings()
+        self._bindings.append((variable, term))
+        self._length += 1
+        self._resolved = None
+
+    def _own_bindings(self):
+        """Make sure that appending to the list of bindings doesn't affect other substitutions."""
+        if self._length != len(self._bindings):
+            self._bindings = self._bindings[:self._length]
+
+    def __mul__(self, theta) -> 'TriangularSubstitution':
+        """Compose this substitution with theta."""
+        if isinstance(theta, SubstituteTerm):
+            new_bindings = list(theta._bindings.items())
+        elif isinstance(theta, TriangularSubstitution):
+            new_bindings = theta._bindings[:theta._length]
+        else:
+            raise ValueError(
+                "Expected a substitution to the right of *, \
+                perhaps you meant to apply substitution on a term? \
+                If so, swap the arguments."
+            )
+        self._own_bindings()
+        result = TriangularSubstitution()
+        result._bindings = self._bindings
+        result._bindings.extend(new_bindings)
+        result._length = len(result._bindings)
+        return result
+
+    def to_idempotent(self) -> SubstituteTerm:
+        """
+        Resolves the bindings against each other and
+        returns the composition as a SubstituteTerm.
+        """
+        if self._resolved is None:
+            # Fold the bindings from the right, where
+            # {x ↦ t}θ = {x ↦ tθ} ∪ {y ↦ s ∈ θ | y ≠ x}
+            resolved = SubstituteTerm()
+            for variable, term in reversed(self._bindings[:self._length]):
+                term = resolved._termSubstituteHelper(term)
+                resolved._bindings.pop(variable, None)
+                if variable != term:
+                    resolved._bindings[variable] = term
+            # List the bindings in the order they were first recorded
+            first_index = dict()
+            for i, (variable, _) in enumerate(self._bindings[:self._length]):
+                first_index.setdefault(variable, i)
+            resolved._bindings = dict(sorted(
+                resolved._bindings.items(),
+                key=lambda binding: first_index[binding[0]]
+            ))
+            self._resolved = resolved
+        return self._resolved
+
+    def domain(self) -> List[Variable]:
+        """Grabs the domain (the left side) of the resolved substitution."""
+        return self.to_idempotent().domain()
+
+    def range(self) -> List[Term]:
+        """Grabs the range (the right side) of the resolved substitution."""
+        return self.to_idempotent().range()
+
+    def __len__(self):
+        return len(self.to_idempotent())
+
+    def __rmul__(self, term: Term) -> Term:
+        return self.to_idempotent()(term)
+
+    def __call__(self, term: Term) -> Term:
+        """Apply substitution to term."""
+        return self.to_idempotent()(term)
+
+    def __str__(self):
+        return str(self.to_idempotent())
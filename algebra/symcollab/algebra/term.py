@@ -6,10 +6,12 @@ constants, and functions and their combinations to make terms.
 This library also contains helper functions that can be useful
 in algorithms that operate on terms.
 """
-from copy import deepcopy
+from copy import copy, deepcopy
 from functools import partial, reduce
-from typing import Union, List, Set, Optional, Any
+from itertools import islice
+from typing import Union, Dict, List, Set, Optional, Tuple, Any
 from typing_extensions import Literal
+from .traversal import fold, preorder
 
 __all__ = [
     'Sort', 'Function', 'Variable',
@@ -17,6 +19,19 @@ __all__ = [
     'get_constants', 'get_vars_or_constants', 'depth',
     'count_occurence', 'Equation', 'Term']
 
+# The TermStore (see store.py) currently used to intern new terms, if any.
+_active_store = None
+
+# The term and function classes by module and name. The codec only
+# decodes these classes, so a stream can't import arbitrary modules.
+_term_classes: Dict[str, type] = dict()
+
+def _class_path(cls: type) -> str:
+    return cls.__module__ + ':' + cls.__qualname__
+
+def _register_term_class(cls: type):
+    _term_classes[_class_path(cls)] = cls
+
 #
 ## Basic Types
 #
@@ -48,6 +63,7 @@ class Sort:
     >>> integers < fractions
     True
     """
+    __slots__ = ('name', 'parents')
     def __init__(self, name: str, parent_sort: Optional['Sort'] = None):
         super().__init__()
         self.name = name
@@ -104,6 +120,12 @@ class Function:
     >>> f(x)
     f(x)
     """
+    __slots__ = ('symbol', 'domain_sort', 'range_sort', 'arity')
+    # Variadic functions, such as xor, can be applied to any number of arguments
+    variadic = False
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _register_term_class(cls)
     def __init__(self, symbol: str, arity: int,
                  domain_sort: Union[Optional[Sort], List[Optional[Sort]]] = None,
                  range_sort: Optional[Sort] = None):
@@ -119,6 +141,13 @@ class Function:
 
     def __call__(self, *args):
         """Ensure domain of arguments are valid and produce a FuncTerm."""
+        self._check_domain(args)
+        if _active_store is not None:
+            return _active_store.function_term(self, args)
+        return self._new_term(args)
+
+    def _check_domain(self, args):
+        """Raises a ValueError when an argument is not of the domain sort."""
         for i, arg in enumerate(args):
             # Grab the specific argument from the domain_sort list if applicable
             domain_sort = self.domain_sort \
@@ -131,6 +160,8 @@ class Function:
                 if arg.sort != domain_sort and not arg.sort.subset_of(domain_sort):
                     raise ValueError(error_message)
 
+    def _new_term(self, args) -> 'FuncTerm':
+        """Makes the term of this function applied to the checked arguments."""
         return FuncTerm(self, args)
 
     def __repr__(self):
@@ -160,6 +191,14 @@ class Variable:
     >>> Variable("x")
     x
     """
+    __slots__ = ('symbol', 'sort')
+    # A variable is a leaf that is never ground
+    _size = 1
+    _depth = 0
+    _ground = False
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _register_term_class(cls)
     def __init__(self, symbol: str, sort: Optional[Sort] = None):
         self.symbol = symbol
         self.sort = sort
@@ -191,47 +230,89 @@ class FuncTerm:
     >>> f(a)
     f(a)
     """
+    __slots__ = ('function', '_arguments', '_hash', '_size', '_depth', '_ground')
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _register_term_class(cls)
     def __init__(self, function: Function, args):
-        assert len(args) == function.arity
+        assert function.variadic or len(args) == function.arity
         self.function = function
-        self._arguments = tuple(args)
+        self._set_arguments(tuple(args))
+    def _set_arguments(self, args: tuple):
+        """Store the arguments along with the cached hash, size, depth and ground flag."""
+        self._arguments = args
+        # Arguments have their own values cached already, so this is O(arity)
+        self._hash = hash((self.function, args))
+        try:
+            self._size = 1 + sum(arg._size for arg in args)
+            self._depth = 1 + max(arg._depth for arg in args) if args else 0
+            self._ground = all(arg._ground for arg in args)
+        except AttributeError:
+            # Some procedures put other objects in terms, such as the XORTerms of p_unif.
+            # They count as leaves that may have variables.
+            self._size = 1 + sum(getattr(arg, '_size', 1) for arg in args)
+            self._depth = 1 + max(getattr(arg, '_depth', 0) for arg in args)
+            self._ground = all(getattr(arg, '_ground', False) for arg in args)
     @property
     def sort(self):
         return self.function.range_sort
     @sort.setter
     def sort(self, s):
-        self.function.range_sort = s
+        # Functions can be shared between terms, so don't modify it in place.
+        # A copy keeps the class of the function, such as Xor, and its flags.
+        f = copy(self.function)
+        f.range_sort = s
+        self.function = f
+        self._hash = hash((self.function, self._arguments))
     @property
     def arguments(self):
         return self._arguments
     @arguments.setter
     def arguments(self, args):
-        self._arguments = tuple(args)
-    def __repr__(self):
+        self._set_arguments(tuple(args))
+    def _delimiters(self) -> Tuple[str, str, str]:
+        """The text before, between and after the arguments when printing the term."""
         if self.function.arity == 0:
-            return self.function.symbol
-        return self.function.symbol + "(" + ", ".join(map(repr, self.arguments)) + ")"
+            return self.function.symbol, "", ""
+        return self.function.symbol + "(", ", ", ")"
+    # Printing, comparing and copying terms is iterative, so it works at any depth
+    def __repr__(self):
+        return _write(self, repr)
     def __str__(self):
-        if self.function.arity == 0:
-            return self.function.symbol
-        return self.function.symbol + "(" + ", ".join(map(str, self.arguments)) + ")"
+        return _write(self, str)
     # Hash needed for network library
     def __hash__(self):
-        return hash((self.function, tuple(self.arguments)))
+        return self._hash
     def __eq__(self, x):
-        return isinstance(x, FuncTerm) and \
-            self.function == x.function and \
-                self.arguments == x.arguments
+        if self is x:
+            return True
+        if not isinstance(x, FuncTerm):
+            return False
+        pairs = [(self, x)]
+        while pairs:
+            s, t = pairs.pop()
+            if s is t:
+                continue
+            if not (isinstance(s, FuncTerm) and isinstance(t, FuncTerm)):
+                if s != t:
+                    return False
+                continue
+            if s._hash != t._hash or s.function != t.function \
+                    or len(s._arguments) != len(t._arguments):
+                return False
+            pairs.extend(zip(s._arguments, t._arguments))
+        return True
     def __contains__(self, term):
-        inside = False
-        for arg in self.arguments:
-            inside = inside or (term == arg)
-            if isinstance(arg, FuncTerm) and arg.function.arity > 0:
-                inside = inside or (term in arg)
-        return inside
+        # Only subterms larger than term can contain it
+        size = getattr(term, '_size', 1)
+        subterms = preorder(self, descend=lambda t: getattr(t, '_size', 0) > size)
+        return any(term == t for t in islice(subterms, 1, None))
     def __deepcopy__(self, memo):
-        arguments = map(deepcopy, self.arguments)
-        return self.function(*arguments)
+        return fold(self, _copy_node)
+    def __reduce__(self):
+        # The cached hash depends on the interpreter's string hashing,
+        # so rebuild it when unpickling rather than restoring it.
+        return (self.__class__, (self.function, self._arguments))
 
 
 class Constant(FuncTerm):
@@ -256,30 +337,87 @@ class Constant(FuncTerm):
     >>> a
     a
     """
+    __slots__ = ()
     def __init__(self, symbol: str, sort: Optional[Sort] = None):
-        super().__init__(Function(symbol, 0, range_sort=sort), ())
+        super().__init__(_constant_function(symbol, sort), ())
     @property
     def symbol(self):
         return self.function.symbol
     @symbol.setter
     def symbol(self, s):
-        self.function.symbol = s
+        self.function = _constant_function(s, self.sort)
+        self._hash = hash((self.function, self._arguments))
     def __deepcopy__(self, memo):
         return Constant(self.symbol, deepcopy(self.sort))
+    def __reduce__(self):
+        return (self.__class__, (self.symbol, self.sort))
 
+def _write(t: "Term", write_leaf) -> str:
+    """
+    The text of a term, written from left to right with an explicit stack.
+    The text of a leaf is given by write_leaf, which is either str or repr.
+    Only str uses the delimiters of subclasses such as XorTerm.
+    """
+    pieces: List[str] = []
+    stack: List[Any] = [t]
+    while stack:
+        s = stack.pop()
+        if isinstance(s, str):
+            pieces.append(s)
+        elif isinstance(s, FuncTerm):
+            opening, separator, closing = \
+                s._delimiters() if write_leaf is str else FuncTerm._delimiters(s)
+            pieces.append(opening)
+            stack.append(closing)
+            for i in range(len(s._arguments) - 1, -1, -1):
+                stack.append(s._arguments[i])
+                if i > 0:
+                    stack.append(separator)
+        else:
+            pieces.append(write_leaf(s))
+    return "".join(pieces)
+
+for _cls in (Function, Variable, FuncTerm):
+    _register_term_class(_cls)
+
+def _copy_node(t: "Term", arguments: Tuple["Term", ...]) -> "Term":
+    """Copy a subterm given the copies of its arguments."""
+    if isinstance(t, FuncTerm) and len(t.arguments) > 0:
+        return t.function(*arguments)
+    return deepcopy(t)
+
+def _with_arguments(t: FuncTerm, args) -> FuncTerm:
+    """
+    Returns a copy of t with new arguments. This bypasses
+    sort checks and any simplification done in Function.__call__.
+    """
+    new_term = t.__class__.__new__(t.__class__)
+    FuncTerm.__init__(new_term, t.function, args)
+    return new_term
 
-Term = Union[Variable, Constant, FuncTerm]
+# Constants with the same symbol and sort share their zero-arity function
+_constant_functions: Dict[Tuple[str, Optional[Sort]], Function] = dict()
 
-def _get_type(t: Term, unique: Literal[False], classinfo):
-    """Recursively go through a term and pick out terms of type classinfo."""
-    if isinstance(t, classinfo):
-        return {t} if unique else [t]
+def _constant_function(symbol: str, sort: Optional[Sort]) -> Function:
+    """Returns the shared zero-arity function for a constant."""
+    f = _constant_functions.get((symbol, sort))
+    # Sorts compare by name, so make sure it is the same sort object
+    if f is None or f.range_sort is not sort:
+        f = Function(symbol, 0, range_sort=sort)
+        _constant_functions[(symbol, sort)] = f
+    return f
 
-    l : List[Any] = []
-    if isinstance(t, FuncTerm):
-        for i in t.arguments:
-            l = l + _get_type(i, False, classinfo)
 
+Term = Union[Variable, Constant, FuncTerm]
+
+def _get_type(t: Term, unique: Literal[False], classinfo):
+    """Go through a term and pick out terms of type classinfo."""
+    # Ground subterms have no variables to look for
+    skip_ground = classinfo is Variable
+    def descend(s):
+        return isinstance(s, FuncTerm) and not isinstance(s, classinfo) \
+            and not (skip_ground and s._ground)
+    l : List[Any] = [s for s in preorder(t, descend) if isinstance(s, classinfo)]
     return set(l) if unique else l
 
 
@@ -378,11 +516,12 @@ def depth(t: Term, depth_level: int = 0):
     """
     if isinstance(t, (Variable, Constant, Function)):
         return depth_level
-    # Assume FuncTerm
-    max_depth = 0
-    for ti in t.arguments:
-        max_depth = max(max_depth, depth(ti, depth_level + 1))
-    return max_depth
+    if isinstance(t, FuncTerm):
+        return depth_level + t._depth
+    # Assume a term-like structure with arguments
+    if len(t.arguments) == 0:
+        return 0
+    return depth_level + fold(t, lambda _, depths: 1 + max(depths) if depths else 0)
 
 def count_occurence(subterm: Term, term: Term):
     """
@@ -398,14 +537,14 @@ def count_occurence(subterm: Term, term: Term):
     >>> count_occurence(h(x), f(h(x), f(x, h(x))))
     2
     """
-    if subterm == term:
-        return 1
-    if isinstance(term, (Variable, Constant)):
-        return 0
-    count = 0
-    for t in term.arguments:
-        count += count_occurence(subterm, t)
-    return count
+    def descend(t):
+        if subterm == t or isinstance(t, (Variable, Constant)):
+            return False
+        if isinstance(t, FuncTerm) and isinstance(subterm, (Variable, FuncTerm)):
+            # A larger term, or one with variables inside a ground term, can't occur
+            return subterm._size < t._size and not (t._ground and not subterm._ground)
+        return True
+    return sum(1 for t in preorder(term, descend) if subterm == t)
 
 #
 ## Equation
@@ -0,0 +1,125 @@
+"""
+Iterative traversals over terms.
+
+The functions in this module walk through the subterms
+of a term with an explicit stack instead of recursion,
+so they work on terms of any depth. They only rely on
+a term having an arguments attribute, so they also apply
+to the other term-like structures in the library.
+"""
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+__all__ = ['preorder', 'postorder', 'fold']
+
+def _children(t) -> Tuple[Any, ...]:
+    """Returns the arguments of a term, or nothing if it's a leaf."""
+    return getattr(t, 'arguments', ())
+
+def preorder(t, descend: Optional[Callable[[Any], bool]] = None) -> Iterator[Any]:
+    """
+    Iterate through the subterms of a term, with each subterm
+    before its arguments and the arguments from left to right.
+
+    Parameters
+    ----------
+    t : Term
+        The term to traverse.
+    descend : Callable[[Term], bool], optional
+        If given, the arguments of a subterm are only
+        visited when descend returns True on the subterm.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> g = Function("g", 1)
+    >>> x = Variable("x")
+    >>> a = Constant("a")
+    >>> list(preorder(f(g(x), a)))
+    [f(g(x), a), g(x), x, a]
+    >>> list(preorder(f(g(x), a), descend=lambda s: s != g(x)))
+    [f(g(x), a), g(x), a]
+    """
+    stack = [t]
+    while stack:
+        s = stack.pop()
+        yield s
+        if descend is None or descend(s):
+            stack.extend(reversed(_children(s)))
+
+def postorder(t) -> Iterator[Any]:
+    """
+    Iterate through the subterms of a term, with the arguments
+    from left to right before the subterm they belong to.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> g = Function("g", 1)
+    >>> x = Variable("x")
+    >>> a = Constant("a")
+    >>> list(postorder(f(g(x), a)))
+    [x, g(x), a, f(g(x), a)]
+    """
+    stack: List[Tuple[Any, bool]] = [(t, False)]
+    while stack:
+        s, expanded = stack.pop()
+        if expanded:
+            yield s
+            continue
+        stack.append((s, True))
+        stack.extend((arg, False) for arg in reversed(_children(s)))
+
+def fold(t, combine: Callable[[Any, Tuple[Any, ...]], Any], memo: bool = True,
+         descend: Optional[Callable[[Any], bool]] = None) -> Any:
+    """
+    Computes a value for a term bottom-up.
+
+    Parameters
+    ----------
+    t : Term
+        The term to fold.
+    combine : Callable[[Term, Tuple], Any]
+        Given a subterm and the values computed for its
+        arguments (empty for leaves), returns the value of the subterm.
+    memo : bool
+        If true, then a subterm that is shared (the same object)
+        in several places is only computed once.
+    descend : Callable[[Term], bool], optional
+        If given, the arguments of a subterm are only folded
+        when descend returns True on the subterm. Otherwise
+        combine is given no values for its arguments.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> a = Constant("a")
+    >>> size = lambda _, sizes: 1 + sum(sizes)
+    >>> fold(f(x, f(x, a)), size)
+    5
+    """
+    # Maps the id of a subterm to the subterm (to keep it alive) and its value
+    cache: Dict[int, Tuple[Any, Any]] = dict()
+    values: List[Any] = []
+    stack: List[Tuple[Any, bool]] = [(t, False)]
+    while stack:
+        s, expanded = stack.pop()
+        if expanded:
+            arity = len(_children(s)) if descend is None or descend(s) else 0
+            arg_values = tuple(values[len(values) - arity:])
+            del values[len(values) - arity:]
+            value = combine(s, arg_values)
+            if memo:
+                cache[id(s)] = (s, value)
+            values.append(value)
+            continue
+        if memo and id(s) in cache:
+            values.append(cache[id(s)][1])
+            continue
+        stack.append((s, True))
+        if descend is None or descend(s):
+            stack.extend((arg, False) for arg in reversed(_children(s)))
+    return values[0]
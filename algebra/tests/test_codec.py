@@ -0,0 +1,89 @@
+from symcollab.algebra import *
+from symcollab.algebra import codec
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+class TestCodec(unittest.TestCase):
+    def test_round_trip(self):
+        s = Sort("S")
+        u = Sort("U", parent_sort=s)
+        f = Function("f", 2, [s, None], u)
+        g = Function("g", 1)
+        x = Variable("x", s)
+        y = Variable("y")
+        a = Constant("a", u)
+        sigma = SubstituteTerm()
+        sigma.add(y, g(a))
+        values = [
+            f(x, g(y)), a, x, Equation(g(y), a),
+            [None, True, False, 0, -3, 2 ** 70, "text", [g(a)]]
+        ]
+        for value in values:
+            self.assertEqual(codec.loads(codec.dumps(value)), value)
+        self.assertEqual(codec.loads(codec.dumps(sigma)).subs, sigma.subs)
+        decoded = codec.loads(codec.dumps(f(x, g(y))))
+        self.assertEqual(decoded.function.domain_sort, [s, None])
+        self.assertTrue(decoded.sort < s)
+        self.assertEqual(decoded.arguments[0].sort, s)
+
+    def test_sharing(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        t = x
+        for _ in range(40):
+            t = f(t, t)
+        data = codec.dumps(t)
+        self.assertLess(len(data), 1000)
+        decoded = codec.loads(data)
+        self.assertIs(decoded.arguments[0], decoded.arguments[1])
+        # Symbols are only written once for the whole stream
+        buffer = io.BytesIO()
+        writer = TermWriter(buffer)
+        writer.write(f(x, x))
+        size = buffer.tell()
+        writer.write(f(x, x))
+        self.assertLess(buffer.tell() - size, 4)
+
+    def test_streams(self):
+        f = Function("f", 1)
+        a = Constant("a")
+        path = os.path.join(tempfile.mkdtemp(), "terms.bin")
+        with open(path, "wb") as fp:
+            writer = TermWriter(fp)
+            writer.write(f(a))
+            writer.write([f(f(a))])
+        # Appending starts a new header
+        with open(path, "ab") as fp:
+            TermWriter(fp).write(a)
+        with open(path, "rb") as fp:
+            self.assertEqual(codec.load(fp), f(a))
+        with TermReader.open(path) as reader:
+            self.assertListEqual(list(reader), [f(a), [f(f(a))], a])
+            self.assertEqual(reader.offset, os.path.getsize(path))
+        # A value cut short is reported
+        with open(path, "rb") as fp:
+            data = fp.read()
+        reader = TermReader(data[:-1])
+        self.assertEqual(reader.read(), f(a))
+        self.assertEqual(reader.read(), [f(f(a))])
+        with self.assertRaises(CodecError):
+            reader.read()
+        with self.assertRaises(CodecError):
+            codec.loads(b"nope")
+        with self.assertRaises(CodecError):
+            codec.dumps(object())
+
+    def test_unknown_classes(self):
+        x = Variable("x")
+        data = codec.dumps(x)
+        path = b"symcollab.algebra.term:Variable"
+        self.assertIn(path, data)
+        # A stream naming a module doesn't import it
+        for forged in (b"antigravity:Variable", b"symcollab.algebra.term:Sort"):
+            forged_data = data.replace(bytes([len(path)]) + path, bytes([len(forged)]) + forged)
+            with self.assertRaises(CodecError):
+                codec.loads(forged_data)
+        self.assertNotIn("antigravity", sys.modules)
@@ -0,0 +1,49 @@
+from symcollab.algebra import *
+from symcollab.algebra.dag import TermDAG
+import unittest
+
+class TestTermDAG(unittest.TestCase):
+    def test_sharing(self):
+        f = Function("f", 2)
+        g = Function("g", 2)
+        x = Variable("x")
+        a = Constant("a")
+        t = f(g(x, a), g(x, a))
+        d = TermDAG(t)
+        self.assertEqual(len(d), 4)
+        self.assertEqual(d.nodes[d.root], t)
+        self.assertEqual(d.node_id(g(x, a)), d.children_of(d.root)[0])
+        self.assertIsNone(d.node_id(g(a, x)))
+        self.assertListEqual(list(d.parents(x)), [g(x, a)])
+        self.assertListEqual(list(d.parents(g(a, a))), [])
+        self.assertCountEqual(d.leaves(), [x, a])
+        self.assertEqual(d.hashes[d.root], hash(t))
+        self.assertDictEqual(d.edge_labels, {(t, g(x, a)): "0, 1", (g(x, a), x): "0", (g(x, a), a): "1"})
+
+    def test_order(self):
+        f = Function("f", 2)
+        h = Function("h", 1)
+        x = Variable("x")
+        a = Constant("a")
+        t = f(h(x), f(x, a))
+        d = TermDAG(t)
+        order = d.topological_order()
+        self.assertEqual(order[0], d.root)
+        position = {node: i for i, node in enumerate(order)}
+        for node in order:
+            for child in d.children_of(node):
+                self.assertLess(position[node], position[child])
+                self.assertIn(node, d.parents_of(child))
+        self.assertListEqual(list(d.df_node_traversal()), [t, h(x), x, f(x, a), a])
+        self.assertListEqual(list(d.bs_node_traversal()), [t, h(x), f(x, a), x, a])
+        self.assertListEqual(list(d.df_edge_traversal())[:2], [(t, h(x)), (h(x), x)])
+
+    def test_deep_shared_terms(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        t = x
+        for _ in range(3000):
+            t = f(t, t)
+        d = TermDAG(t)
+        self.assertEqual(len(d), 3001)
+        self.assertEqual(len(list(d.df_node_traversal())), 3001)
@@ -0,0 +1,53 @@
+from symcollab.algebra import *
+import unittest
+
+class TestDiscriminationTree(unittest.TestCase):
+    def setUp(self):
+        self.f = Function("f", 2)
+        self.g = Function("g", 1)
+        self.x, self.y = Variable("x"), Variable("y")
+        self.a, self.b = Constant("a"), Constant("b")
+
+    def test_retrieve(self):
+        f, g, x, y, a, b = self.f, self.g, self.x, self.y, self.a, self.b
+        terms = [f(x, x), f(a, g(b)), f(g(x), y), g(a), a, x]
+        index = DiscriminationTree()
+        for i, t in enumerate(terms):
+            index.insert(t, i)
+        self.assertEqual(len(index), 6)
+        self.assertListEqual(index.retrieve_unifiable(f(a, y)), [0, 1, 5])
+        self.assertListEqual(index.retrieve_unifiable(y), [0, 1, 2, 3, 4, 5])
+        self.assertListEqual(index.retrieve_unifiable(b), [5])
+        self.assertListEqual(index.retrieve_instances(f(y, g(y))), [1])
+        self.assertListEqual(index.retrieve_instances(g(y)), [3])
+        self.assertListEqual(index.retrieve_generalizations(f(g(a), g(b))), [0, 2, 5])
+        self.assertListEqual(index.retrieve_generalizations(y), [5])
+
+    def test_remove(self):
+        f, g, x, a = self.f, self.g, self.x, self.a
+        index = DiscriminationTree()
+        index.insert(f(x, a))
+        index.insert(f(x, g(a)))
+        index.insert(f(x, a), "again")
+        index.remove(f(x, a))
+        self.assertListEqual(list(index), [f(x, g(a)), "again"])
+        index.remove(f(x, g(a)))
+        index.remove(f(x, a), "again")
+        self.assertEqual(len(index), 0)
+        self.assertListEqual(index.retrieve_unifiable(x), [])
+        with self.assertRaises(ValueError):
+            index.remove(f(x, a))
+
+    def test_wildcards(self):
+        # Terms under a theory symbol can be equal to terms with another top symbol
+        f, g, x, a, b = self.f, self.g, self.x, self.a, self.b
+        plus = Function("+", 2)
+        index = DiscriminationTree(wildcards=[plus])
+        index.insert(g(plus(a, a)))
+        index.insert(g(f(a, b)))
+        self.assertListEqual(index.retrieve_unifiable(g(b)), [g(plus(a, a))])
+        self.assertListEqual(index.retrieve_unifiable(plus(x, b)), [g(plus(a, a)), g(f(a, b))])
+        self.assertListEqual(index.retrieve_generalizations(g(f(b, b))), [g(plus(a, a))])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+from symcollab.algebra import *
+import unittest
+
+class TestEGraph(unittest.TestCase):
+    def test_congruence(self):
+        f = Function("f", 1)
+        g = Function("g", 2)
+        a, b, c = Constant("a"), Constant("b"), Constant("c")
+        eg = EGraph()
+        ea, eb = eg.add(a), eg.add(b)
+        self.assertIsNone(eg.lookup(f(c)))
+        eg.union(ea, eb)
+        eg.rebuild()
+        self.assertTrue(eg.equivalent(g(f(a), b), g(f(b), a)))
+        self.assertFalse(eg.equivalent(f(a), f(c)))
+        eff = eg.find(eg.add(f(f(a))))
+        self.assertEqual(eg.lookup(f(f(b))), eff)
+        # Congruent e-nodes are merged rather than duplicated
+        self.assertEqual(len(eg.nodes(eg.lookup(f(a)))), 1)
+
+    def test_extract(self):
+        f = Function("f", 1)
+        a = Constant("a")
+        eg = EGraph()
+        t = f(f(f(f(a))))
+        eg.union(eg.add(t), eg.add(f(a)))
+        eg.rebuild()
+        self.assertEqual(eg.extract(eg.lookup(t)), f(a))
+        self.assertEqual(eg.heights()[eg.lookup(t)], 1)
+
+    def test_saturate(self):
+        f = Function("f", 2)
+        x, y, z = Variable("x"), Variable("y"), Variable("z")
+        a, b, c = Constant("a"), Constant("b"), Constant("c")
+        comm = Equation(f(x, y), f(y, x))
+        assoc = Equation(f(f(x, y), z), f(x, f(y, z)))
+        eg = EGraph()
+        t1, t2 = f(a, f(b, c)), f(f(c, a), b)
+        eg.add(t1)
+        eg.add(t2)
+        self.assertTrue(eg.saturate([comm, assoc], variables=[x, y, z]))
+        self.assertEqual(eg.find(eg.add(t1)), eg.find(eg.add(t2)))
+        self.assertNotEqual(eg.find(eg.add(t1)), eg.find(eg.add(f(a, a))))
+
+    def test_ground_seeds(self):
+        # Without pattern variables, equations only relate the terms as written
+        f = Function("f", 1)
+        g = Function("g", 1)
+        x, y, z = Variable("x"), Variable("y"), Variable("z")
+        c = Constant("c")
+        eg = EGraph()
+        self.assertTrue(eg.saturate([Equation(f(x), y), Equation(y, g(z)), Equation(z, c)]))
+        self.assertTrue(eg.equivalent(f(x), g(c)))
+        self.assertFalse(eg.equivalent(f(y), g(c)))
+        self.assertEqual(eg.extract(eg.lookup(g(c))), y)
+
+    def test_budgets(self):
+        f = Function("f", 1)
+        g = Function("g", 1)
+        x = Variable("x")
+        a = Constant("a")
+        # Every round adds a new g under f
+        grow = [Equation(f(x), f(g(x)))]
+        eg = EGraph()
+        eg.add(f(a))
+        self.assertFalse(eg.saturate(grow, variables=[x], node_limit=20))
+        self.assertLessEqual(len(eg), 22)
+        eg = EGraph()
+        eg.add(f(a))
+        self.assertFalse(eg.saturate(grow, variables=[x], iteration_limit=3))
+        eg = EGraph()
+        eg.add(f(a))
+        self.assertTrue(eg.saturate(grow, variables=[x], max_height=4))
+        self.assertTrue(eg.equivalent(f(a), f(g(g(g(a))))))
+        self.assertIsNone(eg.lookup(g(g(g(g(a))))))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+from symcollab.algebra import *
+from symcollab.algebra.flatterm import FlatTerms, SymbolTable
+import unittest
+
+class TestFlatTerm(unittest.TestCase):
+    def setUp(self):
+        self.f = Function("f", 1)
+        self.g = Function("g", 2)
+        self.x = Variable("x")
+        self.y = Variable("y")
+        self.a = Constant("a")
+        f, g, x, y, a = self.f, self.g, self.x, self.y, self.a
+        self.terms = [g(f(f(x)), f(g(f(a), y))), x, g(x, x), f(a)]
+
+    def test_round_trip(self):
+        batch = FlatTerms.from_terms(self.terms)
+        self.assertEqual(len(batch), 4)
+        self.assertListEqual(batch.to_terms(), self.terms)
+        self.assertEqual(batch[-1], self.terms[-1])
+
+    def test_queries(self):
+        batch = FlatTerms.from_terms(self.terms)
+        self.assertListEqual(batch.sizes().tolist(), [9, 1, 3, 2])
+        self.assertListEqual(batch.depths().tolist(), [depth(t) for t in self.terms])
+        self.assertListEqual(batch.nesting_depths(self.f).tolist(), [2, 0, 0, 1])
+        self.assertListEqual(batch.counts(self.x).tolist(), [1, 1, 2, 0])
+        self.assertListEqual(batch.counts(self.g).tolist(), [2, 0, 1, 0])
+        variables, counts = batch.variable_counts()
+        self.assertListEqual(variables, [self.x, self.y])
+        self.assertListEqual(counts.tolist(), [[1, 1], [1, 0], [2, 0], [0, 0]])
+        histogram = batch.symbol_histogram()
+        self.assertListEqual(histogram.sum(axis=1).tolist(), batch.sizes().tolist())
+
+    def test_shared_table(self):
+        table = SymbolTable()
+        batch1 = FlatTerms.from_terms(self.terms[:2], table)
+        batch2 = FlatTerms.from_terms(self.terms[2:], table)
+        self.assertIs(batch1.table, batch2.table)
+        self.assertEqual(batch2.symbols[0], table.id_of(self.g))
+        self.assertListEqual(batch2.to_terms(), self.terms[2:])
+
+if __name__ == "__main__":
+    unittest.main()
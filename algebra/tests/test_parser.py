@@ -1,4 +1,5 @@
 from symcollab.algebra import *
+import io
 import unittest
 
 class TestParser(unittest.TestCase):
@@ -18,6 +19,104 @@ class TestParser(unittest.TestCase):
         self.assertEqual(p.parse("x"), x)
         with self.assertRaises(ValueError):
             p.add(Variable("a"))
+        # The sets of symbols can be changed directly
+        y = Variable("y")
+        p.variables.add(y)
+        self.assertEqual(p.parse("f(y,a)"), f(y, a))
+        p.constants.discard(a)
+        self.assertSetEqual(p.constants, set())
+        with self.assertRaises(ParseError):
+            p.parse("a")
+        p.functions = set()
+        with self.assertRaises(ParseError):
+            p.parse("f(x,x)")
+        p.add(x)
+        p.variables.discard(x)
+        z = Variable("z")
+        p.variables.add(z)
+        self.assertEqual(p.parse("z"), z)
+        with self.assertRaises(ParseError):
+            p.parse("x")
+
+    def test_errors(self):
+        f = Function("f", 2)
+        g = Function("g", 1)
+        x = Variable("x")
+        p = Parser()
+        p.add(f)
+        p.add(g)
+        p.add(x)
+        self.assertEqual(p.parse(" f( g(x) , x ) "), f(g(x), x))
+        self.assertEqual(p.parse("g"), g)
+        for string, position in [("f(x)", 0), ("f(x,h(x))", 4), ("f(x,x", 5), ("f(x,x))", 6), ("g x", 2)]:
+            with self.assertRaises(ParseError) as context:
+                p.parse(string)
+            self.assertEqual(context.exception.position, position)
+
+    def test_deep_terms(self):
+        g = Function("g", 1)
+        x = Variable("x")
+        p = Parser()
+        p.add(g)
+        p.add(x)
+        t = p.parse("g(" * 5000 + "x" + ")" * 5000)
+        self.assertEqual(depth(t), 5000)
+
+    def test_store(self):
+        f = Function("f", 2)
+        g = Function("g", 1)
+        x = Variable("x")
+        store = TermStore()
+        p = Parser(store)
+        p.add(f)
+        p.add(g)
+        p.add(x)
+        t = p.parse("f(g(x),g(x))")
+        self.assertIs(t.arguments[0], t.arguments[1])
+        self.assertIs(p.parse("f(g(x), g(x))"), t)
+        self.assertIn(t, store)
+
+    def test_stream(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        a = Constant("a")
+        p = Parser()
+        p.add(f)
+        p.add(x)
+        p.add(a)
+        text = "f(x, a) = a\n\n# comment\nf(x,\n  f(a, a)) = x\nf(x) = a\nf(a, x) = x = a\nx\n"
+        results = list(p.parse_stream(io.StringIO(text)))
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[0], Equation(f(x, a), a))
+        self.assertEqual(results[1], Equation(f(x, f(a, a)), x))
+        self.assertIsInstance(results[2], ParseError)
+        self.assertEqual(results[2].line, 6)
+        self.assertIsInstance(results[3], ParseError)
+        self.assertEqual(results[3].line, 7)
+        self.assertEqual(results[4], x)
+        # Arguments of the wrong sort don't stop the stream
+        s = Sort("S")
+        g = Function("g", 1, domain_sort=s)
+        b = Constant("b", s)
+        p.add(g)
+        p.add(b)
+        results = list(p.parse_stream(io.StringIO("g(b) = b\ng(a) = b\nb = g(b)\n")))
+        self.assertEqual(results[0], Equation(g(b), b))
+        self.assertIsInstance(results[1], ParseError)
+        self.assertEqual((results[1].line, results[1].position), (2, 0))
+        self.assertEqual(results[2], Equation(b, g(b)))
+        self.assertEqual(len(results), 3)
+        # Rewrite rules are built by the rule factory
+        with self.assertRaises(ParseError):
+            p.parse_statement("f(x, a) -> a")
+        p.rule_factory = lambda left, right: (left, right)
+        self.assertEqual(p.parse_statement("f(x, a) → a"), (f(x, a), a))
+        # Parsing is lazy
+        lines = iter(["x", "f(x, y)", "a"])
+        stream = p.parse_many(lines)
+        self.assertEqual(next(stream), x)
+        self.assertEqual(next(lines), "f(x, y)")
+        self.assertEqual(next(stream), a)
 
 if __name__ == "__main__":
     unittest.main()
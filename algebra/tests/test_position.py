@@ -0,0 +1,69 @@
+from symcollab.algebra import *
+import unittest
+
+class TestPosition(unittest.TestCase):
+    def test_format(self):
+        self.assertEqual(Position('121').indices, (1, 2, 1))
+        self.assertEqual(Position([1, 2, 1]), '121')
+        self.assertEqual(Position([1, 12, 1]), '1[12]1')
+        self.assertEqual(Position('1[12]1').indices, (1, 12, 1))
+        self.assertEqual(Position().indices, ())
+        self.assertEqual(Position('12').child(3), '123')
+        self.assertEqual(Position('12').parent, '1')
+        self.assertIsNone(Position('').parent)
+        self.assertTrue(Position('1').is_prefix_of('12'))
+        self.assertFalse(Position('2').is_prefix_of('12'))
+        self.assertEqual({Position('12'): 1}['12'], 1)
+        for invalid in ['10', 'a', '1[2', [0]]:
+            with self.assertRaises(ValueError):
+                Position(invalid)
+
+    def test_subterm_at(self):
+        f = Function("f", 2)
+        a, b, c, d = Constant("a"), Constant("b"), Constant("c"), Constant("d")
+        t = f(f(a, f(b, c)), d)
+        self.assertEqual(subterm_at(t, '121'), b)
+        self.assertEqual(subterm_at(t, ''), t)
+        with self.assertRaises(ValueError):
+            subterm_at(t, '21')
+        with self.assertRaises(ValueError):
+            subterm_at(t, '3')
+
+    def test_replace_at(self):
+        f = Function("f", 2)
+        g = Function("g", 12)
+        a, b, c, d = Constant("a"), Constant("b"), Constant("c"), Constant("d")
+        t = f(f(a, f(b, c)), d)
+        new_t = replace_at(t, '122', d)
+        self.assertEqual(new_t, f(f(a, f(b, d)), d))
+        self.assertEqual(t, f(f(a, f(b, c)), d))
+        # Everything off the path is shared
+        self.assertIs(new_t.arguments[1], t.arguments[1])
+        self.assertIs(new_t.arguments[0].arguments[0], t.arguments[0].arguments[0])
+        self.assertIs(replace_at(t, '', a), a)
+        wide = g(*([a] * 12))
+        self.assertEqual(subterm_at(replace_at(wide, [12], b), [12]), b)
+
+    def test_index(self):
+        f = Function("f", 2)
+        g = Function("g", 1)
+        x, a = Variable("x"), Constant("a")
+        t = f(g(x), f(a, g(a)))
+        index = PositionIndex(t)
+        self.assertListEqual([p for p, _ in index.all()], ['', '1', '11', '2', '21', '22', '221'])
+        self.assertListEqual(index.non_variable(), ['', '1', '2', '21', '22', '221'])
+        self.assertListEqual(index.with_symbol(g), ['1', '22'])
+        self.assertListEqual(index.with_symbol(Function("h", 1)), [])
+        for p, s in index.all():
+            self.assertEqual(index[p], s)
+
+    def test_deep_terms(self):
+        g = Function("g", 1)
+        a, b = Constant("a"), Constant("b")
+        t = a
+        for _ in range(5000):
+            t = g(t)
+        position = Position([1] * 5000)
+        self.assertEqual(subterm_at(t, position), a)
+        self.assertEqual(subterm_at(replace_at(t, position, b), position), b)
+        self.assertEqual(len(PositionIndex(t).with_symbol(g)), 5000)
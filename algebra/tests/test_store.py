@@ -0,0 +1,53 @@
+from symcollab.algebra import *
+import pickle
+import unittest
+
+class TestStore(unittest.TestCase):
+    def test_interning(self):
+        f = Function("f", 2)
+        g = Function("g", 1)
+        x = Variable("x")
+        a = Constant("a")
+        store = TermStore()
+        with store:
+            t1 = f(x, g(a))
+            t2 = f(Variable("x"), g(Constant("a")))
+        self.assertIs(t1, t2)
+        self.assertIs(t1.arguments[0], store.variable("x"))
+        self.assertIs(t1.arguments[1].arguments[0], store.constant("a"))
+        self.assertIn(t1, store)
+        # Terms made outside of the store are not interned
+        t3 = f(x, g(a))
+        self.assertEqual(t1, t3)
+        self.assertIsNot(t1, t3)
+        self.assertNotIn(t3, store)
+        self.assertIs(store.intern(t3), t1)
+
+    def test_nested_stores(self):
+        f = Function("f", 1)
+        a = Constant("a")
+        outer = TermStore()
+        inner = TermStore()
+        with outer:
+            t1 = f(a)
+            with inner:
+                t2 = f(a)
+            t3 = f(a)
+        self.assertIsNot(t1, t2)
+        self.assertIs(t1, t3)
+        self.assertEqual(len(inner), 2)
+
+    def test_cached_hash(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        a = Constant("a")
+        t = f(x, f(x, a))
+        self.assertEqual(hash(t), hash(f(x, f(x, a))))
+        self.assertNotEqual(t, f(a, f(x, a)))
+        t.arguments = (a, f(x, a))
+        self.assertEqual(t, f(a, f(x, a)))
+        self.assertEqual(hash(t), hash(f(a, f(x, a))))
+        self.assertEqual(pickle.loads(pickle.dumps(t)), t)
+
+if __name__ == "__main__":
+    unittest.main()
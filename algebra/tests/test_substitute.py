@@ -24,6 +24,95 @@ class TestSubstitute(unittest.TestCase):
         # Need to surround the sigma multiplication in parenthesis
         # otherwise it won't compose and just both apply to f(x, b)
         self.assertEqual(f(x, b) * (sigma * sigma2), f(g(a, c), b))
+
+    def test_bindings(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        y = Variable("y")
+        a = Constant("a")
+        b = Constant("b")
+        sigma = SubstituteTerm()
+        sigma.add(x, a)
+        sigma.add(x, a)
+        with self.assertRaises(ValueError):
+            sigma.add(x, b)
+        sigma.replace(x, b)
+        sigma.add(y, f(a, b))
+        self.assertSetEqual(sigma.subs, {(x, b), (y, f(a, b))})
+        self.assertListEqual(list(zip(sigma.domain(), sigma.range())), [(x, b), (y, f(a, b))])
+        # Trivial bindings are dropped when composing
+        theta = SubstituteTerm()
+        theta.add(y, x)
+        omega = SubstituteTerm()
+        omega.add(x, y)
+        self.assertSetEqual((theta * omega).subs, {(x, y)})
+
+    def test_sharing(self):
+        f = Function("f", 2)
+        g = Function("g", 2)
+        x = Variable("x")
+        y = Variable("y")
+        a = Constant("a")
+        b = Constant("b")
+        sigma = SubstituteTerm()
+        sigma.add(x, g(a, b))
+        t = f(g(y, a), f(x, b))
+        result = t * sigma
+        self.assertEqual(result, f(g(y, a), f(g(a, b), b)))
+        # The original term is untouched and unchanged subterms are shared
+        self.assertEqual(t, f(g(y, a), f(x, b)))
+        self.assertIs(result.arguments[0], t.arguments[0])
+        self.assertIs(result.arguments[1].arguments[1], b)
+        # Nothing to substitute gives back the same term
+        u = f(y, g(a, y))
+        self.assertIs(u * sigma, u)
         
+    def test_deep_terms(self):
+        f = Function("f", 2)
+        h = Function("h", 1)
+        x = Variable("x")
+        a = Constant("a")
+        t = x
+        expected = h(a)
+        for _ in range(5000):
+            t = f(t, h(a))
+            expected = f(expected, h(a))
+        sigma = SubstituteTerm()
+        sigma.add(x, h(a))
+        self.assertEqual(t * sigma, expected)
+
+    def test_triangular(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        y = Variable("y")
+        a = Constant("a")
+        xs = [Variable("x" + str(i)) for i in range(100)]
+        sigma = TriangularSubstitution()
+        for i in reversed(range(1, 100)):
+            theta = SubstituteTerm()
+            theta.add(xs[i], f(xs[i - 1], xs[i - 1]))
+            sigma = sigma * theta
+        self.assertEqual(len(sigma), 99)
+        # The resolved terms share their subterms instead of blowing up
+        resolved = xs[99] * sigma
+        self.assertEqual(resolved._size, 2 ** 100 - 1)
+        self.assertIs(resolved.arguments[0], resolved.arguments[1])
+        # Agrees with eager composition, including trivial bindings
+        bindings = [(x, y), (y, x), (x, a)]
+        eager = SubstituteTerm()
+        lazy = TriangularSubstitution()
+        for v, t in bindings:
+            theta = SubstituteTerm()
+            theta.add(v, t)
+            eager = eager * theta
+            lazy.add(v, t)
+        self.assertSetEqual(lazy.to_idempotent().subs, eager.subs)
+        # Compositions from the same substitution don't interfere
+        sigma = lazy * eager
+        branch1 = sigma * eager
+        sigma.add(y, a)
+        self.assertSetEqual(branch1.to_idempotent().subs, {(x, a), (y, a)})
+        self.assertSetEqual(sigma.to_idempotent().subs, {(x, a), (y, a)})
+
 if __name__ == "__main__":
     unittest.main()
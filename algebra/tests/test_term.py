@@ -25,6 +25,24 @@ class TestTerm(unittest.TestCase):
         self.assertListEqual(get_vars(f(x, y)), [x, y])
         self.assertListEqual(get_vars_or_constants(f(x, f(a, b))), [x, a, b])
         self.assertEqual(depth(f(f(x,a), f(x,a))), 2)
+        self.assertEqual(count_occurence(f(x, a), f(f(x, a), f(x, a))), 2)
+        self.assertEqual(count_occurence(x, f(a, f(b, c))), 0)
+        self.assertListEqual(get_vars(f(f(a, b), f(c, x))), [x])
+
+    def test_cached_metadata(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        a = Constant("a")
+        t = f(f(x, a), a)
+        self.assertEqual(t._size, 5)
+        self.assertEqual(t._depth, 2)
+        self.assertFalse(t._ground)
+        self.assertTrue(f(a, a)._ground)
+        # Constants share their function but not their sorts
+        self.assertIs(Constant("a").function, a.function)
+        self.assertIsNot(Constant("a", Sort("s")).function, a.function)
+        with self.assertRaises(AttributeError):
+            x.label = "x"
 
 if __name__ == "__main__":
     unittest.main()
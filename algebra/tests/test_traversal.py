@@ -0,0 +1,55 @@
+from copy import deepcopy
+from symcollab.algebra import *
+import unittest
+
+class TestTraversal(unittest.TestCase):
+    def test_orders(self):
+        f = Function("f", 2)
+        g = Function("g", 1)
+        x = Variable("x")
+        a = Constant("a")
+        t = f(g(x), f(x, a))
+        self.assertListEqual(list(preorder(t)), [t, g(x), x, f(x, a), x, a])
+        self.assertListEqual(list(postorder(t)), [x, g(x), x, a, f(x, a), t])
+        self.assertEqual(fold(t, lambda _, sizes: 1 + sum(sizes)), 6)
+
+    def test_memoization(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        calls = []
+        def count(s, args):
+            calls.append(s)
+            return 1 + sum(args)
+        t = x
+        for _ in range(30):
+            t = f(t, t)
+        self.assertEqual(fold(t, count), 2 ** 31 - 1)
+        self.assertEqual(len(calls), 31)
+
+    def test_deep_terms(self):
+        f = Function("f", 2)
+        h = Function("h", 1)
+        x = Variable("x")
+        a = Constant("a")
+        t = x
+        for _ in range(20000):
+            t = f(t, h(a))
+        self.assertEqual(depth(t), 20001)
+        self.assertListEqual(get_vars(t), [x])
+        self.assertEqual(len(get_constants(t)), 20000)
+        self.assertEqual(count_occurence(h(a), t), 20000)
+        self.assertIn(f(x, h(a)), t)
+        self.assertNotIn(f(a, h(a)), t)
+        # Rebuilding the term gives an equal term that isn't the same object
+        u = x
+        for _ in range(20000):
+            u = f(u, h(a))
+        self.assertIsNot(t, u)
+        self.assertEqual(t, u)
+        self.assertNotEqual(t, f(u, h(a)))
+        self.assertTrue(str(t).startswith("f(f(f("))
+        self.assertEqual(repr(t), str(u))
+        self.assertEqual(deepcopy(t), t)
+
+if __name__ == "__main__":
+    unittest.main()
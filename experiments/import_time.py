@@ -0,0 +1,40 @@
+"""
+Measures how long it takes to import the packages
+in a fresh interpreter, as checker processes do.
+Also lists the heavy optional libraries that got loaded.
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+RUNS = 10
+MODULES = [
+    "symcollab.algebra",
+    "symcollab.xor",
+    "symcollab.Unification",
+    "symcollab.rewrite",
+    "symcollab.moe",
+]
+HEAVY = ["matplotlib", "networkx", "sympy", "numpy", "pydot", "scipy", "z3"]
+
+CODE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(m for m in {heavy} if m in sys.modules))
+"""
+
+env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+for module in MODULES:
+    times = []
+    loaded = ""
+    for _ in range(RUNS):
+        result = subprocess.run(
+            [sys.executable, "-c", CODE.format(module=module, heavy=HEAVY)],
+            env=env, capture_output=True, text=True, check=True
+        )
+        elapsed, _, loaded = result.stdout.strip().partition(" ")
+        times.append(float(elapsed))
+    print(f"{module:25} median {statistics.median(times) * 1000:7.1f} ms  heavy: {loaded or '-'}")
@@ -3,22 +3,37 @@ Reads the experiment state and provide some summary statistics
 """
 from collections import defaultdict, Counter
 from enum import Enum
-from typing import Dict, Optional
-from symcollab.algebra import depth, Term
+from typing import Any, Dict, List, Optional, Union
+from symcollab.algebra import CodecError, Term, TermReader
+from symcollab.algebra.flatterm import FlatTerms
 from symcollab.moe.check import MOOCheckResult
+import builtins
 import os.path
-import pickle
 
-MOO_FILE = "1.pickle"
+MOO_FILE = "saved_moo_experiments_v4.terms"
 
-moo_tested: Optional[Dict[Term, Optional[MOOCheckResult]]] = None
+moo_tested: Optional[Dict[Term, Union[MOOCheckResult, Exception]]] = None
+
+def read_result(record: List[Any]) -> Union[MOOCheckResult, Exception]:
+    """Decodes a result written by moo_experiment."""
+    if record[0] == "error":
+        exception_class = getattr(builtins, record[1], Exception)
+        if not isinstance(exception_class, type) or not issubclass(exception_class, Exception):
+            exception_class = Exception
+        return exception_class(record[2])
+    return MOOCheckResult(*record[1:])
 
 # Read current state from file if it exists
 if os.path.isfile(MOO_FILE):
     print("Reading file:", MOO_FILE)
-    with open(MOO_FILE, "rb") as reader:
-        picked_state = reader.read()
-        _, moo_tested = pickle.loads(picked_state)
+    moo_tested = dict()
+    with TermReader.open(MOO_FILE) as reader:
+        try:
+            for moo, record in reader:
+                moo_tested[moo] = read_result(record)
+        except CodecError:
+            # The experiment was stopped in the middle of a write
+            pass
 else:
     print(f"No save file '{MOO_FILE}' exists.")
 
@@ -35,9 +50,9 @@ class SecurityResult(Enum):
 # Gather statistics on whether MOOs are
 # secure based on depth level
 depth_statistics = defaultdict(Counter)
+moo_depths = FlatTerms.from_terms(moo_tested.keys()).depths().tolist()
 
-for moo, result in moo_tested.items():
-    moo_depth = depth(moo)
+for (moo, result), moo_depth in zip(moo_tested.items(), moo_depths):
     moo_result = SecurityResult.UNKNOWN
     if isinstance(result, MOOCheckResult):
         moo_result = SecurityResult.PASS if result.secure else SecurityResult.FAIL
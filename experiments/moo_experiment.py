@@ -1,98 +1,106 @@
 """
 Code for running experiments.
 Able to pick up where it left off.
+
+Every MOO checked is appended to a log along with its result,
+so saving takes the same time no matter how far along the
+experiment is. The generator is brought back to where it left
+off by skipping the MOOs that are already in the log.
 """
-from copy import deepcopy
-from typing import Dict, Optional, Union
-from symcollab.algebra import Term
+from typing import Any, List, Union
+from symcollab.algebra import CodecError, TermReader, TermWriter
 from symcollab.moe import CustomMOO, MOOGenerator, moo_check
 from symcollab.moe.check import MOOCheckResult
+from symcollab.Unification import UnificationCache
 from symcollab.Unification.constrained.p_unif import p_unif
 from symcollab.Unification.constrained.xor_rooted_unif import XOR_rooted_security
 from symcollab.xor.xor import XorTerm
+from symcollab.xor.xorhelper import fresh_variable
 import os.path
-import pickle
 import signal
 import sys
 import traceback
 
 
-# Save after checking x MOOs
-SAVE_EVERY: int = 1
-MOO_FILE = "saved_moo_experiments_v3.pickle"
-
-last_mgen: Optional[MOOGenerator] = None
-mgen: Optional[MOOGenerator] = None
-moo_tested: Optional[Dict[Term, Union[MOOCheckResult, Exception]]] = None
+MOO_FILE = "saved_moo_experiments_v4.terms"
 
 print("MOO Save File:", MOO_FILE)
 
-# Read current state from file if it exists
-if os.path.isfile(MOO_FILE):
-    print("Reading current state")
-    with open(MOO_FILE, "rb") as reader:
-        picked_state = reader.read()
-        last_mgen, moo_tested = pickle.loads(picked_state)
-
-
-if moo_tested is None:
-    moo_tested = dict()
-
-if last_mgen is None:
-    last_mgen = MOOGenerator()
-
-def save_current_state():
+def result_record(result: Union[MOOCheckResult, Exception]) -> List[Any]:
     """
-    Saves current MOO Generator iterator and
-    the dictionary of results
+    Encodes the result of checking a MOO as a list of
+    values that can be written to the log.
     """
-    global last_mgen
-    global moo_tested
-    picked_state = pickle.dumps((last_mgen, moo_tested))
-    with open(MOO_FILE, "wb") as writer:
-        writer.write(picked_state)
-    print("Saved:", MOO_FILE)
-
-
-
+    if isinstance(result, Exception):
+        return ["error", type(result).__name__, str(result)]
+    return [
+        "result", result.syntactic_result, result.collisions,
+        result.invert_result, result.iterations_needed
+    ]
+
+# Count how many MOOs were already checked
+num_tested = 0
+if os.path.isfile(MOO_FILE):
+    print("Reading current state")
+    with TermReader.open(MOO_FILE) as reader:
+        try:
+            for _ in reader:
+                num_tested += 1
+        except CodecError:
+            pass
+        last_offset = reader.offset
+    # Drop a record that was cut short
+    if last_offset != os.path.getsize(MOO_FILE):
+        with open(MOO_FILE, "r+b") as f:
+            f.truncate(last_offset)
+
+mgen = MOOGenerator()
+for _ in range(num_tested):
+    next(mgen)
+
+log = open(MOO_FILE, "ab")
+writer = TermWriter(log, flush=True)
 
 def sigint_handler(a, b):
     """
     Code that runs when an interrupt (CTRL-C) is
-    received. It saves the current state of the
-    MOO generator and MOOs tested.
+    received. Every result is already saved,
+    so only the log needs to be closed.
     """
-    print("Interrupt signal received. Saving current state...")
-    save_current_state()
+    print("Interrupt signal received. Closing", MOO_FILE)
+    print(cached_p_unif)
+    print(cached_xor_rooted)
+    log.close()
     sys.exit(0)
 
 
 signal.signal(signal.SIGINT, sigint_handler)
 
-i = 0
+# MOOs share many collision problems up to the names of their variables
+cached_p_unif = UnificationCache(p_unif, maxsize=4096, fresh_variable=fresh_variable)
+cached_xor_rooted = UnificationCache(XOR_rooted_security, maxsize=4096, fresh_variable=fresh_variable)
+
 while True:
-    mgen = deepcopy(last_mgen)
     t = next(mgen)
     print("Testing MOO", t, "... ",end="")
     tm = CustomMOO(t)
 
     try:
         if isinstance(t, XorTerm):
-            check_result = moo_check(tm.name, 'every', XOR_rooted_security, 3, True, True)
+            check_result = moo_check(tm.name, 'every', cached_xor_rooted, 3, True, True)
         else:
-            check_result = moo_check(tm.name, 'every', p_unif, 3, True, True)
+            check_result = moo_check(tm.name, 'every', cached_p_unif, 3, True, True)
 
         print(f"Secure: {check_result.secure}, Invertible: {check_result.invert_result}")
-        moo_tested[t] = check_result
+        record = result_record(check_result)
 
     except Exception as e:
         print("FAIL")
         print(traceback.format_exc())
-        moo_tested[t] = e
+        record = result_record(e)
 
-    i += 1
-    if i == SAVE_EVERY:
-        save_current_state()
-        i = 0
-
-    last_mgen = mgen
+    try:
+        writer.write([t, record])
+    except CodecError as e:
+        # Still record the MOO so that it isn't checked again
+        writer.write([t, result_record(e)])
@@ -1,7 +1,12 @@
 """
 Symbolic analysis module for
 cryptographic modes of operations.
+
+Submodules that depend on heavy libraries are only
+imported once one of their names is accessed, so that
+processes that only check MOOs start quickly.
 """
+from importlib import import_module as _import_module
 from .moo import *
 from .check import *
 from .custom import *
@@ -10,4 +15,21 @@ from .schedule import *
 from .syntactic_check import *
 from .collisions import *
 from .generator import *
-from .filtered_generator import *
+
+# Maps the names that are loaded on first access to their submodule
+_LAZY_NAMES = {
+    'FilteredMOOGenerator': '.filtered_generator',
+}
+
+# The lazy names are left out, so that star imports don't load them
+__all__ = [name for name in globals() if not name.startswith('_')]
+
+def __getattr__(name: str):
+    if name not in _LAZY_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(_import_module(_LAZY_NAMES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES))
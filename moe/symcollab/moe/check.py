@@ -3,11 +3,13 @@ Module to check security of modes of operations.
 """
 from copy import deepcopy
 from dataclasses import dataclass
+from inspect import unwrap
 from typing import Callable, Dict, List, Optional, Union
-from symcollab.algebra import Constant, Function, SubstituteTerm, Term, Variable
+from symcollab.algebra import Constant, DiscriminationTree, Function, SubstituteTerm, Term, Variable
 from symcollab.Unification.constrained.p_unif import p_unif
 from symcollab.Unification.constrained.xor_rooted_unif import XOR_rooted_security
 from symcollab.xor.structure import Zero
+from symcollab.xor.xor import xor
 from .program import MOOProgram
 from .collisions import find_collision
 from .syntactic_check import moo_depth_random_check
@@ -30,7 +32,8 @@ def moo_check(moo_name: str = 'cipher_block_chaining', schedule_name: str = 'eve
     schedule_name: str
       Name of the schedule to consider.
     unif_algo: Callable
-      Unification algorithm to use when checking for collisions
+      Unification algorithm to use when checking for collisions.
+      It can be wrapped in a UnificationCache.
     length_bound: int
       The maximum interactions to check for collisions. Default is 10.
     knows_iv: bool
@@ -51,6 +54,9 @@ def moo_check(moo_name: str = 'cipher_block_chaining', schedule_name: str = 'eve
     constraints: Dict[Variable, List[Term]] = dict()
     known_terms: List[Term] = [xor_zero, program.nonces[0]] if knows_iv else [xor_zero]
     ciphertexts_received: List[Term] = list()
+    # Only ciphertexts whose symbols fit with a new one can collide with it.
+    # Terms under xor can cancel out, so they can be equal to anything.
+    ciphertext_index = DiscriminationTree(wildcards=[xor])
     result = None
     invertible = False
     # Start interactions
@@ -63,9 +69,11 @@ def moo_check(moo_name: str = 'cipher_block_chaining', schedule_name: str = 'eve
         p = Constant(session_label)
         i = Constant(block_label)
         a = Constant("1")
-        pList = [Variable(f"x{session_label}{block_label}"),Variable(f"x{session_label}{block_label}"),Variable(f"x{session_label}{block_label}")]
+        # Plaintext blocks i-2, i-1 and i need distinct variables, or xor cancels them out
+        pList = [Variable(f"x{session_label}{block_label}2"),Variable(f"x{session_label}{block_label}1"),Variable(f"x{session_label}{block_label}")]
         cList = [c(p, i, a),c(p, i, a),c(p, i, a)]
-        return program.chaining_function(3, [0], pList, cList)
+        # The initialization vector is 0, as a term so that xor can order it
+        return program.chaining_function(3, [xor_zero], pList, cList)
 
     symbolic_check_secure = symbolic_check(symbolic_moo_gen)
     #print("Result :", symbolic_check_secure)
@@ -73,7 +81,7 @@ def moo_check(moo_name: str = 'cipher_block_chaining', schedule_name: str = 'eve
     for i in range(1, length_bound + 1):
         plaintext = Variable(f"x_{i}")
         constraints[plaintext] = deepcopy(known_terms)
-        if unif_algo != XOR_rooted_security:
+        if unwrap(unif_algo) != XOR_rooted_security:
             known_terms.append(plaintext)
 
         result = program.rcv_block(plaintext)
@@ -90,7 +98,7 @@ def moo_check(moo_name: str = 'cipher_block_chaining', schedule_name: str = 'eve
             #    if moo_depth_random_check(last_ciphertext, ciphertext, constraints):
             #        return MOOCheckResult(True, None, invertible, i)
             if symbolic_check_secure:
-                return MOOCheckResult(True, None, invertible)
+                return MOOCheckResult(True, None, invertible, i)
 
             # Check for collisions
             new_constraints = deepcopy(constraints)
@@ -98,12 +106,14 @@ def moo_check(moo_name: str = 'cipher_block_chaining', schedule_name: str = 'eve
                 ciphertext,
                 ciphertexts_received,
                 new_constraints,
-                unif_algo
+                unif_algo,
+                ciphertext_index
             )
             if any_unifiers(collisions):
                 return MOOCheckResult(False, collisions, invertible, i)
 
             known_terms.append(ciphertext)
+            ciphertext_index.insert(ciphertext, len(ciphertexts_received))
             ciphertexts_received.append(ciphertext)
 
 
@@ -113,7 +123,7 @@ def moo_check(moo_name: str = 'cipher_block_chaining', schedule_name: str = 'eve
     # If the last block wasn't returned, we'll use the stop frame to check
     if result is None:
         ciphertext = unravel(last_result.message, last_result.substitutions)
-        collisions = search_for_collision(ciphertext, ciphertexts_received, constraints, unif_algo)
+        collisions = search_for_collision(ciphertext, ciphertexts_received, constraints, unif_algo, ciphertext_index)
         if any_unifiers(collisions):
             return MOOCheckResult(False, collisions, invertible, length_bound + 1)
 
@@ -124,20 +134,27 @@ def moo_check(moo_name: str = 'cipher_block_chaining', schedule_name: str = 'eve
 
 def search_for_collision(ciphertext: Term, previous_ciphertexts: List[Term],
                          constraints: Dict[Variable, List[Term]],
-                         unif_algo: Callable) -> Optional[Union[SubstituteTerm, List[SubstituteTerm]]]:
+                         unif_algo: Callable, index: Optional[DiscriminationTree] = None) \
+        -> Optional[Union[SubstituteTerm, List[SubstituteTerm]]]:
     """
     Search through the known ciphertext history and see if there are any collisions
     between the current ciphertext and a past one.
+    The index holds each previous ciphertext under its position in the history,
+    and is built here when it isn't given.
     """
-    if unif_algo == XOR_rooted_security:
+    if unwrap(unif_algo) == XOR_rooted_security:
         terms = deepcopy(previous_ciphertexts)
         terms.append(ciphertext)
-        unifiers = XOR_rooted_security(terms, constraints).solve()
+        unifiers = unif_algo(terms, constraints).solve()
         return unifiers
 
+    if index is None:
+        index = DiscriminationTree(wildcards=[xor])
+        for i, known_ciphertext in enumerate(previous_ciphertexts):
+            index.insert(known_ciphertext, i)
     collisions = None
-    for known_ciphertext in previous_ciphertexts:
-        collisions = find_collision(known_ciphertext, ciphertext, constraints, unif_algo)
+    for i in index.retrieve_unifiable(ciphertext):
+        collisions = find_collision(previous_ciphertexts[i], ciphertext, constraints, unif_algo)
         if any_unifiers(collisions):
             return collisions
     return collisions
@@ -2,6 +2,7 @@
 Module to support the MOO_Tool in
 finding collisions.
 """
+from inspect import unwrap
 from typing import Callable, Dict, List, Optional
 from symcollab.algebra import Equation, SubstituteTerm, Term, Variable
 from symcollab.Unification.constrained.p_unif import p_unif
@@ -18,17 +19,19 @@ def find_collision(cipher_text1: Term, cipher_text2: Term,
     Sets up a unification problem between two ciphertexts in order to see
     if there is a possible collision given some constraints.
     """
-    if unif_algo == p_unif:
+    # A cached algorithm is called the same way as the algorithm it wraps
+    algorithm = unwrap(unif_algo)
+    if algorithm == p_unif:
         unifiers = unif_algo(
             Equations([Equation(cipher_text1, cipher_text2)]),
             constraints
         )
-    elif unif_algo == XOR_rooted_security:
+    elif algorithm == XOR_rooted_security:
         unifiers = unif_algo(
             [cipher_text1, cipher_text2],
             constraints
         ).solve()
-    elif unif_algo == p_syntactic:
+    elif algorithm == p_syntactic:
         unifiers = unif_algo(
             cipher_text1,
             cipher_text2,
@@ -1,7 +1,11 @@
 """
 Creates filtered modes of operations that can be later used in a MOOProgram.
 """
-from symcollab.algebra import Constant, Function, FuncTerm, Variable, Term
+from collections import deque
+from typing import Deque, List
+import numpy as np
+from symcollab.algebra import Constant, Function, Variable, Term
+from symcollab.algebra.flatterm import FlatTerms
 from .generator import MOOGenerator
 
 __all__ = ['FilteredMOOGenerator']
@@ -31,39 +35,32 @@ class FilteredMOOGenerator(MOOGenerator):
         self.max_f_depth = max_f_depth #maximum number of nested f's
         self.requires_iv = requires_iv
         self.requires_chaining = requires_chaining
+        # Terms of the current branch that met the conditions
+        self._accepted: Deque[Term] = deque()
 
 
     def __next__(self):
-        term = MOOGenerator.__next__(self)
-        while not self._conditions_met(term):
-            term = MOOGenerator.__next__(self)
-        return term
+        # Check the rest of the current branch all at once
+        while len(self._accepted) == 0:
+            terms = [MOOGenerator.__next__(self)]
+            terms.extend(self.branch_iter)
+            conditions_met = self._conditions_met_batch(terms)
+            self._accepted.extend(t for t, met in zip(terms, conditions_met) if met)
+        return self._accepted.popleft()
 
-    def _conditions_met(self, term: Term) -> bool:
-        """Given a term, state whether the conditions are met."""
-        if _f_depth(term) > self.max_f_depth:
-            return False
+    def _conditions_met_batch(self, terms: List[Term]) -> np.ndarray:
+        """Given a list of terms, state whether the conditions are met for each of them."""
+        batch = FlatTerms.from_terms(terms)
+        met = batch.nesting_depths(Function("f", 1)) <= self.max_f_depth
 
-        if self.requires_chaining and not _satisfies_chaining(term, self.max_history):
-            return False
+        if self.requires_chaining:
+            previous_ciphertexts = [Variable("C[i-" + str(i + 1) + "]") for i in range(self.max_history)]
+            chained = np.zeros(len(batch), dtype=bool)
+            for ci in previous_ciphertexts:
+                chained |= batch.counts(ci) > 0
+            met &= chained
 
-        if self.requires_iv and Constant("r") not in term:
-            return False
+        if self.requires_iv:
+            met &= batch.counts(Constant("r")) > 0
 
-        # Passes all conditions
-        return True
-
-
-def _f_depth(term: Term) -> int:
-    """Returns the maximum depth of nested f terms."""
-    if isinstance(term, FuncTerm) and term.function.arity > 0:
-        if term.function == Function("f", 1):
-            return 1 + _f_depth(term.arguments[0])
-        return max((_f_depth(t) for t in term.arguments))
-    return 0
-
-def _satisfies_chaining(term: Term, max_history: int):
-    """Checks to see if a preivous ciphertext is in the term."""
-    previous_ciphertexts = [Variable("C[i-" + str(i + 1) + "]") for i in range(max_history)]
-    previous_ciphertexts_in_term = [(ci in term) for ci in previous_ciphertexts]
-    return any(previous_ciphertexts_in_term)
+        return met
@@ -2,7 +2,7 @@
 Generates modes of operations that can be later used in a MOOProgram, but only generates those that satisfy parameters.
 """
 
-from typing import Iterator, List
+from typing import Iterator, List, Set
 from symcollab.algebra import Constant, Function, Term, Variable, FuncTerm
 from symcollab.xor.xor import xor
 
@@ -45,6 +45,8 @@ class MOOGenerator():
 		self.r = Constant("r") # Only one nonce currently
 		self.tree: List[List[Term]] = [[self.f(MOOGenerator._P(0)), xor(self.r, MOOGenerator._P(0))]]
 		self.branch_iter: Iterator[Term] = iter(self.tree[0]) # Where we are at the branch
+		# xor-terms are in normal form, so terms equal modulo xor are found by their hash
+		self._generated: Set[Term] = set(self.tree[0])
 
 	def __iter__(self):
 		return self
@@ -60,10 +62,7 @@ class MOOGenerator():
 	# This function will only show for what is currently computedbut it is helpful
 	# for preventing repeats of the same calculations
 	def __contains__(self, x):
-		for branch in self.tree:
-			if x in branch:
-				return True
-		return False
+		return x in self._generated
 
 	def _create_next_branch(self):
 		branch: List[Term] = []
@@ -80,12 +79,12 @@ class MOOGenerator():
 				temp.append(xor(m, MOOGenerator._C(i + 1)))
 			# Filter out terms that are already generated or
 			# have a depth of less than one
-			temp = filter(lambda x:
-						  x not in self and \
-						  not isinstance(x, Variable) and \
-						  not isinstance(x, Constant),
-						  temp)
-			branch.extend(temp)
+			for x in temp:
+				if x not in self and \
+				   not isinstance(x, Variable) and \
+				   not isinstance(x, Constant):
+					self._generated.add(x)
+					branch.append(x)
 		return branch
 
 	def __next__(self):
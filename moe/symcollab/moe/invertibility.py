@@ -6,10 +6,8 @@ from collections import Counter
 from copy import deepcopy
 from typing import Set
 from symcollab.algebra import Constant, depth, Function, FuncTerm, Term, Variable, get_constants, get_vars, get_vars_or_constants, count_occurence
-from symcollab.algebra.dag import TermDAG
 from symcollab.xor import xor
 from symcollab.moe.program import MOOProgram
-import numpy as np
 
 __all__ = ['invert_simple', 'moo_invert', 'deducible']
 
@@ -36,33 +34,33 @@ def invert_simple(term):
 
     # Create a TermDAG and check to see
     # that the plaintext is only in one position.
+    from symcollab.algebra.dag import TermDAG
     d = TermDAG(term)
     assert Counter(d.leaves())[_P] == 1
 
     # Move up the DAG starting from the plaintext
     # leaf and add inverse operations to the
     # transforms list.
-    current_term = deepcopy(_P)
-    parent_term = list(d.parents(current_term))
-    while parent_term != []:
-        parent_term = parent_term[0]
+    current_node = d.node_id(_P)
+    parent_nodes = d.parents_of(current_node)
+    while parent_nodes != []:
+        parent_term = d.nodes[parent_nodes[0]]
 
         if parent_term.function == _f:
             transforms.append((_finv,))
 
         elif parent_term.function == xor:
             # Cancel out the xor by xoring with
-            # the other argument again.
-            if parent_term.arguments[0] == current_term:
-                transforms.append((xor, parent_term.arguments[1]))
-            else:
-                transforms.append((xor, parent_term.arguments[0]))
+            # the other arguments again.
+            children = d.children_of(parent_nodes[0])
+            others = [t for t, child in zip(parent_term.arguments, children) if child != current_node]
+            transforms.append((xor, xor(*others)))
 
         else:
             raise ValueError("A function other than f or xor detected")
 
-        current_term = deepcopy(parent_term)
-        parent_term = list(d.parents(parent_term))
+        current_node = parent_nodes[0]
+        parent_nodes = d.parents_of(current_node)
 
     # Construct inverse term
     for transform in reversed(transforms):
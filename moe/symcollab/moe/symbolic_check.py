@@ -6,7 +6,7 @@ Based on Hai Lin's work.
 """
 
 from typing import Set
-from symcollab.algebra import Term, Function, Variable, Constant, FuncTerm, Equation
+from symcollab.algebra import Term, Function, Variable, Constant, FuncTerm, Equation, fold
 from symcollab.xor import xor
 from symcollab.xor.xorhelper import is_xor_term, xor_to_list
 from symcollab.xor.structure import Zero, is_zero
@@ -26,6 +26,9 @@ def start(moo_generator):
 	return lambda block_label, session_label: moo_mapper(pattern, block_label, session_label)
 
 def moo_mapper(generated_moo_term, block_label, session_label):
+	return fold(generated_moo_term, lambda t, args: _moo_map_node(t, args, block_label, session_label))
+
+def _moo_map_node(generated_moo_term, mapped_arguments, block_label, session_label):
 	if isinstance(generated_moo_term, Variable): # base cases
 		var_name = generated_moo_term.symbol[0] # Assuming 'C' or 'P'
 		subscripts = generated_moo_term.symbol.split('[')[1].split(']')[0].split('-')
@@ -42,15 +45,12 @@ def moo_mapper(generated_moo_term, block_label, session_label):
 		else:
 			raise Exception("Unknown variable symbol found.")
 
-	else: # Function symbol
+	else: # Function symbol, arguments are already mapped
 		fun_name = generated_moo_term.function.symbol
 		if fun_name == 'f':
-			return f(moo_mapper(generated_moo_term.arguments[0], block_label, session_label)) # Recurse
+			return f(mapped_arguments[0])
 		elif fun_name == 'xor':
-			return xor(
-				moo_mapper(generated_moo_term.arguments[0],block_label, session_label),
-				moo_mapper(generated_moo_term.arguments[1],block_label, session_label)
-			)
+			return xor(*mapped_arguments)
 		elif fun_name == 'r':
 			return c(p,zero,zero)
 		else:
@@ -242,13 +242,9 @@ def pick_f(sigma: Set[Equation]) -> Set[Equation]:
 	return backup
 
 def check_xor_structure(t: FuncTerm):
+	"""Checks that t is an xor of f-rooted terms"""
 	if is_xor_term(t):
-		if not isinstance(t.arguments[0], Variable) and t.arguments[0].function == f and not isinstance(t.arguments[1], Variable) and t.arguments[1].function == f:
-			return True
-		elif is_xor_term(t.arguments[0]) and not isinstance(t.arguments[1], Variable) and t.arguments[1].function == f:
-			return check_xor_structure(t.arguments[0])
-		else:
-			return False
+		return all(not isinstance(ti, Variable) and ti.function == f for ti in t.arguments)
 	else:
 		return False
 
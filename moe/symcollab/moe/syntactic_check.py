@@ -63,11 +63,15 @@ def moo_f_depth(t: Term, possible_subs: Optional[Dict[Term, List[Term]]] = None)
             return low + 1, high + 1
 
         if t.function == xor:
+            # Combine the summands from left to right
             low1, high1 = moo_f_depth(t.arguments[0], possible_subs)
-            low2, high2 = moo_f_depth(t.arguments[1], possible_subs)
-            if overlaps(low1, high1, low2, high2):
-                return 0, max(high1, high2)
-            return max(low1, low2), max(high1, high2)
+            for ti in t.arguments[1:]:
+                low2, high2 = moo_f_depth(ti, possible_subs)
+                if overlaps(low1, high1, low2, high2):
+                    low1, high1 = 0, max(high1, high2)
+                else:
+                    low1, high1 = max(low1, low2), max(high1, high2)
+            return low1, high1
 
     raise ValueError("Function outside valid signature for moo_f_depth.")
 
@@ -95,14 +99,19 @@ def moo_has_random(t: Term, possible_subs: Optional[Dict[Term, List[Term]]] = No
             return moo_has_random(t.arguments[0], possible_subs)
 
         if t.function == xor:
-            # Make sure at least one of the arguments
-            # has randomness
-            if not moo_has_random(t.arguments[0], possible_subs) and \
-                not moo_has_random(t.arguments[1], possible_subs):
-                return False
-
+            # Combine the summands from left to right, making sure
+            # that at least one of them has randomness and that
+            # the next summand can't cancel it out
+            has_random = moo_has_random(t.arguments[0], possible_subs)
             low1, high1 = moo_f_depth(t.arguments[0], possible_subs)
-            low2, high2 = moo_f_depth(t.arguments[1], possible_subs)
-            return not overlaps(low1, high1, low2, high2)
+            for ti in t.arguments[1:]:
+                has_random = has_random or moo_has_random(ti, possible_subs)
+                low2, high2 = moo_f_depth(ti, possible_subs)
+                if overlaps(low1, high1, low2, high2):
+                    has_random = False
+                    low1, high1 = 0, max(high1, high2)
+                else:
+                    low1, high1 = max(low1, low2), max(high1, high2)
+            return has_random
 
     raise ValueError("Function outside valid signature for moo_f_depth.")
@@ -1,9 +1,74 @@
+from symcollab.algebra import Function, Variable
 from symcollab.moe import *
+from symcollab.Unification.constrained.p_unif import p_unif
+from symcollab.Unification.constrained.xor_rooted_unif import XOR_rooted_security
+from symcollab.xor import xor
+import contextlib
+import io
+import os
+import subprocess
+import sys
 import unittest
 
 class TestStub(unittest.TestCase):
     def test(self):
         self.assertEqual(True, True)
 
+class TestImports(unittest.TestCase):
+    def test_no_heavy_imports(self):
+        """Importing the packages shouldn't load the optional heavy libraries."""
+        code = (
+            "import sys\n"
+            "import symcollab.algebra, symcollab.Unification, symcollab.moe\n"
+            "import symcollab.algebra.dag, symcollab.Unification.ac_unif\n"
+            "import symcollab.Unification.constrained.unbounded\n"
+            "from symcollab.moe import moo_check\n"
+            "from symcollab.moe import *\n"
+            "heavy = ['matplotlib', 'networkx', 'sympy', 'numpy', 'pydot']\n"
+            "print(','.join(m for m in heavy if m in sys.modules))\n"
+        )
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env, capture_output=True, text=True, check=True
+        )
+        self.assertEqual(result.stdout.strip(), "")
+
+    def test_lazy_names(self):
+        import symcollab.moe
+        self.assertNotIn('FilteredMOOGenerator', symcollab.moe.__all__)
+        self.assertIn('FilteredMOOGenerator', dir(symcollab.moe))
+        self.assertTrue(callable(symcollab.moe.FilteredMOOGenerator))
+        with self.assertRaises(AttributeError):
+            symcollab.moe.not_a_name
+
+class TestMOOCheck(unittest.TestCase):
+    def check(self, *args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return moo_check(*args)
+
+    def test_symbolic_check(self):
+        # Only the feedback modes pass the symbolic check, which happens on the first block
+        f = Function("f", 1)
+        cbc = CustomMOO(f(xor(Variable("P[i]"), Variable("C[i-1]")))).name
+        verdicts = [
+            ('cipher_block_chaining', False), ('propogating_cbc', False), ('hash_cbc', False),
+            ('cipher_feedback', True), ('output_feedback', True), ('abc_h_identity', False), (cbc, False)
+        ]
+        for name, secure in verdicts:
+            result = self.check(name, 'every', p_unif, 1)
+            self.assertEqual(result.syntactic_result, secure, name)
+            if secure:
+                self.assertEqual(result.iterations_needed, 1)
+
+    def test_collisions(self):
+        # The adversary sees the first ciphertext block before choosing the second
+        result = self.check('cipher_block_chaining', 'every', XOR_rooted_security, 3)
+        self.assertFalse(result.secure)
+        self.assertEqual(result.iterations_needed, 2)
+        # p_unif puts XORTerms inside of terms
+        result = self.check('abc_h_identity', 'every', p_unif, 2)
+        self.assertTrue(result.secure)
+
 if __name__ == "__main__":
     unittest.main()
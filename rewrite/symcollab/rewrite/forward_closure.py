@@ -6,54 +6,26 @@ the RewriteSystem module.
 """
 from copy import deepcopy
 from typing import List, Optional
-from symcollab.algebra import Constant, Variable, Term, Equation
+from symcollab.algebra import DiscriminationTree, Equation, Position, PositionIndex, \
+    replace_at, subterm_at, Term
 from symcollab.Unification.unif import unif
 from .rule import RewriteRule
 from .system import RewriteSystem, normal
 
 
-def fpos(term: Term):
+def fpos(term: Term) -> List[Position]:
     """
     Return a list of sub non-variable positions of a given term
     """
-    return fpos_aux(term, None, None)
+    return PositionIndex(term).non_variable()
 
-def fpos_aux(term, parent, index):
-    """
-    Main code of fpos, passes along position and index parameters
-    """
-    if parent is None:
-        position = []
-    else:
-        position = parent + [index]
-    if isinstance(term, Variable):
-        return []
-    child_positions = []
-    index = 0
-    for child in term.arguments:
-        child_positions += fpos_aux(child, position, index)
-        index += 1
-    return [position] + child_positions
-
-def get_sub_term(term, input_position):
+def get_sub_term(term: Term, input_position: Position) -> Term:
     """ Get the term at a position, uses the format that fpos returns """
-    if input_position == [] or isinstance(term, (Variable, Constant)):
-        return term
-    return get_sub_term(
-        term.arguments[input_position[0]],
-        input_position[1:]
-    )
-
-def replace(term, position, subterm):
+    return subterm_at(term, input_position)
+
+def replace(term: Term, position: Position, subterm: Term) -> Term:
     """Replace the term at a given position."""
-    new_term = deepcopy(term)
-    new_subterm = new_term
-    for pos in position[:-1]:
-        new_subterm = new_subterm.arguments[pos]
-    new_subterm_args = list(new_subterm.arguments)
-    new_subterm_args[position[-1]] = subterm
-    new_subterm.arguments = tuple(new_subterm_args)
-    return new_term
+    return replace_at(term, position, subterm)
 
 
 def overlap(rule1, rule2, rs, position):
@@ -90,7 +62,17 @@ def check_redundancy(rule: RewriteRule, redundancy_rules: List[RewriteRule]):
     UNFINISHED
     Checks redundancy of a rule against a set of redundancy rules.
     """
-    for redundancy_rule in redundancy_rules:
+    # Only rules whose hypothesis may unify with a
+    # subterm of the rule's hypothesis are checked
+    index = DiscriminationTree()
+    for i, redundancy_rule in enumerate(redundancy_rules):
+        index.insert(redundancy_rule.hypothesis, i)
+    candidates = set(index.retrieve_unifiable(rule.hypothesis))
+    for position in fpos(rule.hypothesis)[1:]:
+        candidates.update(index.retrieve_unifiable(get_sub_term(rule.hypothesis, position)))
+    for i, redundancy_rule in enumerate(redundancy_rules):
+        if i not in candidates:
+            continue
         hypothesis_unifiers = unif({Equation(redundancy_rule.hypothesis, rule.hypothesis)})
         conclusion_unifiers = unif({Equation(redundancy_rule.conclusion, rule.conclusion)})
 
@@ -3,11 +3,11 @@ The rewrite module is responsible for maintaining
 definitions of rewrite rules, as well as performing
 some useful operations with them.
 """
-from typing import overload, List, Optional, Union, Dict
+from typing import overload, Optional, Union, Dict
 from copy import deepcopy
-from symcollab.algebra import Constant, Equation, Function, \
-    FuncTerm, get_vars, SortMismatch, SubstituteTerm, Term, Variable
-from symcollab.Unification import unify
+from symcollab.algebra import Constant, fold, Function, FuncTerm, \
+    Position, PositionIndex, replace_at, SortMismatch, subterm_at, Term, Variable
+from symcollab.Unification import match
 
 __all__ = ['freeze', 'converse', 'RewriteRule', 'Position']
 
@@ -42,52 +42,24 @@ def freeze(term):
     >>> freeze(f(x))
     f(x)
     """
+    if not isinstance(term, (Variable, FuncTerm)):
+        return term
+    return fold(term, _freeze_node)
+
+def _freeze_node(term, arguments):
+    """Freezes a term given its frozen arguments."""
     if isinstance(term, Variable):
         return Constant(term.symbol, term.sort)
-    elif isinstance(term, FuncTerm):
-        arguments = list(term.arguments)
-        for i, t in enumerate(arguments):
-            arguments[i] = freeze(t)
-        term.arguments = arguments
-    return term
-
-def _getOverlapVars(term: Term, hypothesis: Term, conclusion: Term) -> List[Variable]:
-    """Return a list of variables that are overlapping with two terms hypothesis and conclusion"""
-    rewrite_vars = get_vars(hypothesis, unique=True) | get_vars(conclusion, unique=True)
-    term_vars = get_vars(term, unique=True)
-    return list(rewrite_vars & term_vars)
-
-def _changeVars(overlaping_vars: List[Variable], term: Term, hypothesis: Term, conclusion: Term):
-    """Change variable names in hypothesis & conclusion to not overlap with overlapping_vars"""
-    hypothesis = deepcopy(hypothesis)
-    conclusion = deepcopy(conclusion)
-    all_vars = get_vars(term, unique=True) | \
-        get_vars(hypothesis, unique=True) | \
-        get_vars(conclusion, unique=True)
-    new_vars: List[Variable] = []
-    # Go through all the variables that share the same symbol between the term and rewrite rule
-    # and change the variables in the rewrite rule
-    for v in overlaping_vars:
-        new_var = v
-        # Keep renaming variable in rewrite rule until it is not an already existing variable
-        while new_var in all_vars:
-            new_var = Variable(new_var.symbol + "_1", new_var.sort)
-        new_vars.append(new_var)
-    # Create substitution between the old and new variable names and apply them
-    s = SubstituteTerm()
-    for old_v, new_v in zip(overlaping_vars, new_vars):
-        s.add(old_v, new_v)
-    return hypothesis * s, conclusion * s
-
+    if term._ground:
+        return term
+    return term.function(*arguments)
 
 ## How does positions work?
 # Ex: '121' means From the root term, look at the first argument, then
 # the second argument of that term, and then the first argument of that term
 # f(f(a, f(b, c)),d) | '121' = b
 # f(a, b) | '' = f(a, b)
-
-# New Type for better annotations
-Position = str
+# Positions are handled by symcollab.algebra.Position
 
 class RewriteRule:
     """
@@ -123,6 +95,8 @@ class RewriteRule:
         root term. Then, the second argument from that term, and lastly
         the third argument of that term.
         f(f(a, f(b, c)),d) | '121' = b
+        See symcollab.algebra.Position for arguments past the ninth.
+        Only the subterms along the path to the position are copied.
 
         Examples
         --------
@@ -136,61 +110,39 @@ class RewriteRule:
         {'1': f(f(b))}
         """
         if pos is None:
-            result = self._apply_all(term, '', term, dict())
+            result = self._apply_all(term)
             return result if len(result) != 0 else None
         return self._apply_pos(term, pos)
 
 
-    def _match(self, term: Term) -> Term:
-        """Attempts to rewrite the root term with the rewrite rule. Returns the same term if rewriting is not possible"""
-        # Change common variables in RewriteRule if they exist
-        overlaping_vars = _getOverlapVars(term, self.hypothesis, self.conclusion)
-        while overlaping_vars:
-            self.hypothesis, self.conclusion = _changeVars(
-                overlaping_vars, term, self.hypothesis, self.conclusion)
-            overlaping_vars = _getOverlapVars(term, self.hypothesis, self.conclusion)
-        # Perform matching and substitution
-        frozen_term = freeze(term)
-        sigma = unify({Equation(self.hypothesis, frozen_term)})
-        return self.conclusion * sigma if sigma is not False else None
+    def _match(self, term: Term) -> Optional[Term]:
+        """Attempts to rewrite the root term with the rewrite rule. Returns None if rewriting is not possible"""
+        sigma = match(self.hypothesis, term)
+        return self.conclusion * sigma if sigma is not None else None
 
     def _apply_pos(self, term: Term, pos: Position) -> Optional[Term]:
-        if pos == '':
-            return self._match(term)
-
-        # Recurse down to appropriate position
-        term = deepcopy(term)
-        if isinstance(term, Constant) or isinstance(term, Variable):
-            raise ValueError("Position " + pos + " is not valid for term " + str(term))
-        index = int(pos[0])
-        if index > len(term.arguments):
-            raise ValueError("Position " + pos + " is not valid for term " + str(term))
-
-        term_arguments = list(term.arguments)
-        new_argument = self._apply_pos(term_arguments[index - 1], pos[1:])
-        if new_argument is None:
+        new_subterm = self._match(subterm_at(term, pos))
+        if new_subterm is None:
             return None
-        term_arguments[index - 1] = new_argument
-        term.arguments = tuple(term_arguments)
-        return term
+        return replace_at(term, pos, new_subterm)
 
-    def _apply_all(self, term: Term, pos: Position,
-                   subterm: Term, result: Dict[Position, Term]) -> Dict[Position, Term]:
+    def _apply_all(self, term: Term) -> Dict[Position, Term]:
         """Applies the rewrite rule to every subterm"""
-        # If the current position is rewritable, add it to result dictionary
-        r: Optional[Term] = None
-        try:
-            r = self._apply_pos(term, pos)
-        except SortMismatch:
-            pass
-        if r is not None:
-            result[pos] = r
-
-        # Recurse down arguments
-        if isinstance(subterm, FuncTerm):
-            for i, t in enumerate(subterm.arguments):
-                self._apply_all(term, pos + str(i + 1), t, result)
-
+        index = PositionIndex(term)
+        # Only subterms with the same root symbol can match a non-variable hypothesis
+        if isinstance(self.hypothesis, FuncTerm):
+            positions = index.with_symbol(self.hypothesis.function)
+        else:
+            positions = [p for p, _ in index.all()]
+        result: Dict[Position, Term] = dict()
+        for pos in positions:
+            r: Optional[Term] = None
+            try:
+                r = self._apply_pos(term, pos)
+            except SortMismatch:
+                pass
+            if r is not None:
+                result[pos] = r
         return result
 
     def __repr__(self):
@@ -2,8 +2,8 @@
 The variants module is responsible for computing variants
 and identifying some properties about them.
 """
-from typing import List, Dict, Tuple, Optional
-from symcollab.algebra import Term, SortMismatch
+from typing import List, Dict, Set, Tuple, Optional
+from symcollab.algebra import DiscriminationTree, preorder, Term, SortMismatch
 from .rule import RewriteRule, Position
 from .system import RewriteSystem
 
@@ -47,6 +47,10 @@ class Variants:
         self.tree: List[Dict[Term, List[Tuple[RewriteRule, Position]]]] = [{term : []}]
         self.branch_iter = iter(self.tree[0]) # Where we are at the branch
         self.rules: RewriteSystem = rules
+        # Finds which rules have a hypothesis that may match a subterm of a term
+        self._rule_index = DiscriminationTree()
+        for rule in self.rules:
+            self._rule_index.insert(rule.hypothesis, rule)
 
     def __iter__(self):
         return self
@@ -63,9 +67,17 @@ class Variants:
         """Compute the new branch of terms in the variant tree"""
         branch: Dict[Term, List[RewriteRule]] = {}
         last_branch_index = len(self.tree) - 1
+        candidates: Dict[Term, Set[RewriteRule]] = dict()
+        for t in self.tree[last_branch_index].keys():
+            candidates[t] = {
+                rule for s in set(preorder(t))
+                for rule in self._rule_index.retrieve_generalizations(s)
+            }
         # Apply each rewrite rule to the terms in the last branch
         for rule in self.rules:
             for t in self.tree[last_branch_index].keys():
+                if rule not in candidates[t]:
+                    continue
                 try:
                     new_terms = rule.apply(t)
                 except SortMismatch:
@@ -26,5 +26,18 @@ class TestRewrite(unittest.TestCase):
         self.assertEqual(r.apply(term)['1'], f(x, f(x, x)))
         self.assertEqual(r.apply(term, '2'), f(f(x,x), x))
 
+    def test_parse(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        a = Constant("a")
+        p = Parser(rule_factory=RewriteRule)
+        p.add(f)
+        p.add(x)
+        p.add(a)
+        rules = list(p.parse_many(["f(x, a) → x", "f(a, a) -> a", "f(x) -> x"]))
+        self.assertEqual(rules[0], RewriteRule(f(x, a), x))
+        self.assertEqual(rules[1], RewriteRule(f(a, a), a))
+        self.assertIsInstance(rules[2], ParseError)
+
 if __name__ == "__main__":
     unittest.main()
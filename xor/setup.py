@@ -6,6 +6,7 @@ setup(name="symcollab-xor",
     url="https://github.com/symcollab/cryptosolve",
     install_requires = [
         # Our dependencies
-        "symcollab-algebra"
+        "symcollab-algebra",
+        "numpy~=1.23.5",
     ],
 )
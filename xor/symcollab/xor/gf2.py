@@ -0,0 +1,97 @@
+"""
+Linear algebra over GF(2) on bit-packed matrices.
+
+Every row of a matrix is packed into 64 bit words, so that adding
+two rows is the exclusive or of their words. This is what solving
+the linear fragment of xor unification needs.
+"""
+from typing import Iterable, List, Sequence, Tuple
+import numpy as np
+
+__all__ = ['pack_rows', 'row_columns', 'reduce_rows']
+
+_WORD = 64
+
+def pack_rows(rows: Sequence[Iterable[int]], num_columns: int) -> np.ndarray:
+    """
+    Packs the rows of a matrix over GF(2), each given by the
+    columns where it is 1, into an array of 64 bit words.
+
+    Examples
+    --------
+    >>> from symcollab.xor.gf2 import pack_rows
+    >>> pack_rows([[0, 2], [1, 64]], 65).tolist()
+    [[5, 0], [2, 1]]
+    """
+    matrix = np.zeros((len(rows), max(1, -(-num_columns // _WORD))), dtype=np.uint64)
+    for i, row in enumerate(rows):
+        for j in row:
+            if not 0 <= j < num_columns:
+                raise ValueError(f"Column {j} is outside of the matrix")
+            matrix[i, j // _WORD] |= np.uint64(1 << (j % _WORD))
+    return matrix
+
+def row_columns(row: np.ndarray) -> List[int]:
+    """
+    The columns where a packed row is 1, in increasing order.
+
+    Examples
+    --------
+    >>> from symcollab.xor.gf2 import pack_rows, row_columns
+    >>> row_columns(pack_rows([[3, 70, 1]], 80)[0])
+    [1, 3, 70]
+    """
+    columns = []
+    for w, word in enumerate(row.tolist()):
+        while word:
+            low = word & -word
+            columns.append(w * _WORD + low.bit_length() - 1)
+            word ^= low
+    return columns
+
+def reduce_rows(matrix: np.ndarray, num_pivot_columns: int) -> List[Tuple[int, int]]:
+    """
+    Brings a packed matrix to reduced row echelon form in place with
+    Gauss-Jordan elimination, only choosing pivots among the first
+    columns. A column is only 1 in the row of its pivot, and the rows
+    below the pivot rows are 0 in every one of the pivot columns.
+
+    Parameters
+    ----------
+    matrix : np.ndarray
+        The matrix as returned by pack_rows.
+    num_pivot_columns : int
+        How many of the first columns can have a pivot.
+
+    Returns
+    -------
+    List[Tuple[int, int]]
+        The row and column of every pivot, in order.
+
+    Examples
+    --------
+    >>> from symcollab.xor.gf2 import pack_rows, reduce_rows, row_columns
+    >>> matrix = pack_rows([[0, 1, 2], [0, 3], [1, 2, 3]], 4)
+    >>> reduce_rows(matrix, 2)
+    [(0, 0), (1, 1)]
+    >>> [row_columns(row) for row in matrix]
+    [[0, 3], [1, 2, 3], []]
+    """
+    pivots: List[Tuple[int, int]] = []
+    rank = 0
+    for column in range(num_pivot_columns):
+        word, bit = divmod(column, _WORD)
+        has_bit = ((matrix[:, word] >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+        below = np.flatnonzero(has_bit[rank:])
+        if len(below) == 0:
+            continue
+        pivot = rank + below[0]
+        if pivot != rank:
+            matrix[[rank, pivot]] = matrix[[pivot, rank]]
+            has_bit[[rank, pivot]] = has_bit[[pivot, rank]]
+        # Clear the column in every other row at once
+        has_bit[rank] = False
+        matrix[has_bit] ^= matrix[rank]
+        pivots.append((rank, column))
+        rank += 1
+    return pivots
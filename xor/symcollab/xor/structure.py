@@ -43,7 +43,7 @@ class XORTerm:
         return "+ ".join(map(str, self.arguments))
     # Hash needed for network library
     def __hash__(self):
-        return hash(("xor", self.arguments[0]))
+        return hash(("xor", tuple(self.arguments)))
     def __eq__(self, x):
         return isinstance(x, XORTerm) and self.arguments == x.arguments
     def __contains__(self, term):
@@ -1,21 +1,59 @@
-from symcollab.algebra import Function, FuncTerm
+from symcollab.algebra import Function, FuncTerm, Variable
+from .structure import Zero
 
 __all__ = ['Xor', 'xor', 'XorTerm']
 
+_ZERO = Zero()
+
+def _term_key(t):
+    #A total order on terms, which sorts the arguments of an xor-term.
+    #Variables come first, then applications by symbol, arity and arguments.
+    if isinstance(t, Variable):
+        return (0, t.symbol, str(t.sort))
+    return (1, t.function.symbol, len(t.arguments), str(t.sort), tuple(_term_key(s) for s in t.arguments))
+
 class Xor(Function):
+    # xor is associative and commutative, so it takes any number of arguments
+    variadic = True
+
     def __init__(self):
         super().__init__("xor", 2)
 
     def __call__(self, *args):
-        term = XorTerm(self, (args[0], args[1]))
-        for t in args[2:]:
-            term = XorTerm(self, (term, t))
-        return term
+        #Builds the normal form of the exclusive or of the arguments:
+        #nested xor-terms are flattened, the 0s and the pairs of equal
+        #arguments cancel out, and the rest are sorted.
+        summands = dict()
+        stack = list(reversed(args))
+        while stack:
+            t = stack.pop()
+            if isinstance(t, FuncTerm) and isinstance(t.function, Xor):
+                # Substitutions don't normalize, so the arguments may be xor-terms too
+                stack.extend(reversed(t.arguments))
+            elif t == _ZERO:
+                continue
+            elif t in summands:
+                del summands[t]
+            else:
+                summands[t] = None
+        if len(summands) == 0:
+            return Zero()
+        if len(summands) == 1:
+            return next(iter(summands))
+        return super().__call__(*sorted(summands, key=_term_key))
+
+    def _new_term(self, args):
+        return XorTerm(self, args)
 
 xor = Xor()
+
 class XorTerm(FuncTerm):
-    def __init___(self, *args):
-        super().__init__(xor, args)
-    
-    def __str__(self):
-        return " ⊕ ".join([str(ti) for ti in self.arguments])
+    """
+    An exclusive or of two or more terms. Terms built by xor are in
+    normal form, so two of them are equal exactly when they are equal
+    modulo the associativity, commutativity, nilpotence and unit of xor.
+    """
+    __slots__ = ()
+
+    def _delimiters(self):
+        return "", " ⊕ ", ""
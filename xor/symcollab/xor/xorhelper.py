@@ -1,5 +1,5 @@
 from copy import deepcopy
-from symcollab.algebra import Constant, Variable, FuncTerm, Equation, SubstituteTerm
+from symcollab.algebra import Constant, Variable, FuncTerm, Equation, SubstituteTerm, TriangularSubstitution, preorder
 from symcollab.Unification.unif import unif
 from .structure import Zero, XORTerm, Equations, Disequations, Disequation, is_zero
 from .xor import xor
@@ -16,12 +16,7 @@ def is_XOR_Term(t):
 
 def xor_to_list(t):
     #convert a xor-term to a list of terms
-    if(not is_xor_term(t)):
-        return [t]
-    else:
-        lst1 = xor_to_list(t.arguments[0])
-        lst2 = xor_to_list(t.arguments[1])
-        return lst1 + lst2
+    return [s for s in preorder(t, descend=is_xor_term) if not is_xor_term(s)]
 
 def simplify(lst):
     result = []
@@ -45,13 +40,8 @@ def simplify_XOR_Term(t):
 
 def list_to_xor(lst):
     #convert a list of terms to a xor-term
-    if(len(lst) == 0):
-        return Zero()
-    elif(len(lst) == 1):
-        return lst[0]
-    else:
-        head, *tail = lst
-        return xor(head, list_to_xor(tail))
+    #xor builds the normal form, so an empty list gives 0
+    return xor(*lst)
 
 def collect_all_variables_in_term(t):
 #Returns a list of variables in a term.
@@ -93,17 +83,11 @@ def look_up_a_name(t, eqs):
     #t is a xor-term, eqs is a set of equations.
     #This function looks t up in eqs, and checks if t already has a name in eqs.
     #If so, it returns the existing name. Otherwise, it returns None.
-    first_term = t.arguments[0]
-    second_term = t.arguments[1]
+    #xor-terms are in normal form, so they are equal modulo AC when they are equal.
     for eq in eqs:
         rhs = eq.right_side
-        if(is_xor_term(rhs)):
-            fst_t = rhs.arguments[0]
-            snd_t = rhs.arguments[1]
-            possibility1 = first_term == fst_t and second_term == snd_t
-            possibility2 = first_term == snd_t and second_term == fst_t
-            if(possibility1 or possibility2):
-                return eq.left_side
+        if(is_xor_term(rhs) and rhs == t):
+            return eq.left_side
     return None
 
 
@@ -119,20 +103,17 @@ def name_xor_terms(t, eqs):
     elif (isinstance(t, Variable)):
         return (t, eqs)
     elif(is_xor_term(t)):
-        (term1, eqs) = purify_a_term(t.arguments[0], eqs)
-        #eqs = eqs + equation1
-        (term2, eqs) = purify_a_term(t.arguments[1], eqs)
-        #eqs = eqs + equation2
-        #equations = equation1 + equation2
+        (purified, eqs) = purify_a_term(t, eqs)
+        if(not is_xor_term(purified)):
+            #The purified summands cancelled out
+            return (purified, eqs)
 
-        name = look_up_a_name(xor(term1, term2), eqs)
+        name = look_up_a_name(purified, eqs)
         if(name != None):
             return (name, eqs)
         else:
-            global variable_counter
-            variable_counter += 1
-            new_variable = Variable("N" + str(variable_counter))
-            eqs.append(Equation(new_variable, xor(term1, term2)))
+            new_variable = fresh_variable()
+            eqs.append(Equation(new_variable, purified))
             return (new_variable, eqs)
     elif (isinstance(t, FuncTerm)):
         terms = []
@@ -153,11 +134,11 @@ def purify_a_term(t, eqs):
     elif (isinstance(t, Variable)):
         return (t, eqs)
     elif (is_xor_term(t)):
-        (left, eqs) = purify_a_term(t.arguments[0], eqs)
-        #eqs = eqs + equation1
-        (right, eqs) = purify_a_term(t.arguments[1], eqs)
-        #eqs = eqs + equation2
-        return (xor(left, right), eqs)
+        terms = []
+        for arg in t.arguments:
+            (term, eqs) = purify_a_term(arg, eqs)
+            terms.append(term)
+        return (xor(*terms), eqs)
     elif(isinstance(t, FuncTerm)):
         terms = []
         for arg in t.arguments:
@@ -197,9 +178,7 @@ def is_constrained_in_term(v, t):
     elif (isinstance(t, Variable)):
         return False
     elif(is_xor_term(t)):
-        left = is_constrained_in_term(v, t.arguments[0])
-        right = is_constrained_in_term(v, t.arguments[1])
-        return left or right
+        return any(is_constrained_in_term(v, arg) for arg in t.arguments)
     elif (isinstance(t, FuncTerm)):
         return (v in t)
 
@@ -216,14 +195,8 @@ def is_constrained_in_equations(v, eqs):
     return result
 
 def normalize_an_equation(eq):
-    if is_zero(eq.right_side):
-        lhs = eq.left_side
-    else:
-        lhs = xor(eq.left_side, eq.right_side)
-    lst = xor_to_list(lhs)
-    lst = simplify(lst)
-    new_lhs = list_to_xor(lst)
-
+    #xor flattens the sides and cancels out the pairs of equal summands
+    new_lhs = xor(eq.left_side, eq.right_side)
     new_rhs = Zero()
     new_eq = Equation(new_lhs, new_rhs)
     return new_eq
@@ -456,7 +429,7 @@ class Rule_Decompose(XOR_Rule):
     def __init__(self):
         pass
     def has_two_arguments(self, t):
-        if(is_xor_term(t)):
+        if(is_xor_term(t) and len(t.arguments) == 2):
             left_is_not_xor = not is_xor_term(t.arguments[0])
             right_is_not_xor = not is_xor_term(t.arguments[1])
             return left_is_not_xor and right_is_not_xor
@@ -539,15 +512,121 @@ def xor_unification_helper(state):
     else:
         return []
 
-def xor_unification(eqs):
+class XOR_unification_report:
+    #Records how xor_unification solved a problem.
+    #path is "gaussian" when the equations were solved as a linear system
+    #over GF(2), and "rules" when they needed the rule-based procedure.
+    def __init__(self):
+        self.path = None
+        self.variables = 0
+        self.atoms = 0
+        self.rank = 0
+
+    def __repr__(self):
+        return "path: " + str(self.path) + ", variables: " + str(self.variables) + \
+            ", atoms: " + str(self.atoms) + ", rank: " + str(self.rank)
+
+def is_linear_atom(t):
+    #Check if t can be treated as an opaque atom of a linear system:
+    #a ground term without xor, which can only cancel out with itself.
+    for s in preorder(t):
+        if isinstance(s, Variable) or is_xor_term(s):
+            return False
+    return True
+
+def linear_system(eqs):
+    #Abstract the equations to a linear system over GF(2) where the atoms are constants.
+    #Returns (variables, atoms, rows), where every row is the set of columns in an equation,
+    #and the columns are the variables followed by the atoms, in the order they first occur.
+    #Returns None if some summand needs to be decomposed.
+    equations = []
+    variables = dict()
+    atoms = dict()
+    for eq in eqs.contents:
+        summands = xor_to_list(eq.left_side) + xor_to_list(eq.right_side)
+        for t in summands:
+            if is_zero(t):
+                continue
+            if isinstance(t, Variable):
+                variables.setdefault(t, len(variables))
+            elif is_linear_atom(t):
+                atoms.setdefault(t, len(atoms))
+            else:
+                return None
+        equations.append(summands)
+
+    rows = []
+    for summands in equations:
+        row = set()
+        for t in summands:
+            if is_zero(t):
+                continue
+            column = variables[t] if isinstance(t, Variable) else len(variables) + atoms[t]
+            #x + x = 0
+            row ^= {column}
+        rows.append(row)
+    return (list(variables), list(atoms), rows)
+
+def linear_xor_unification(eqs, report=None):
+    #Solve the equations by Gaussian elimination over GF(2), if every summand
+    #is a variable or a ground term without xor. The most general unifier is
+    #read off the reduced system, so there is at most one unifier.
+    #Returns None when the equations aren't linear.
+    system = linear_system(eqs)
+    if(system == None):
+        return None
+    (variables, atoms, rows) = system
+    #numpy is slow to import, so only load it for linear systems
+    from .gf2 import pack_rows, reduce_rows, row_columns
+
+    terms = variables + atoms
+    matrix = pack_rows(rows, len(terms))
+    pivots = reduce_rows(matrix, len(variables))
+    if(report != None):
+        report.variables = len(variables)
+        report.atoms = len(atoms)
+        report.rank = len(pivots)
+
+    #The rows without a pivot only have atoms left, which must all cancel out
+    if(matrix[len(pivots):].any()):
+        return []
+
+    sigma = SubstituteTerm()
+    for (row, column) in pivots:
+        rest = [terms[j] for j in row_columns(matrix[row]) if j != column]
+        sigma.add(terms[column], list_to_xor(rest))
+    return [sigma]
+
+def xor_unification(eqs, report=None):
+    #Returns a list of unifiers of the equations.
+    #Linear equations are solved directly, the rest with the inference rules.
+    #If a report is given, it records which of the two was used.
+    unifiers = linear_xor_unification(eqs, report)
+    if(unifiers != None):
+        if(report != None):
+            report.path = "gaussian"
+        return unifiers
+    if(report != None):
+        report.path = "rules"
+
     equations = purify_equations(eqs)
     diseqs = Disequations([])
-    subst = SubstituteTerm()
+    # The substitution grows by one binding per rule applied,
+    # so only resolve it once a solution is found.
+    subst = TriangularSubstitution()
 
     state = XOR_proof_state(equations, diseqs, subst)
     solutions = xor_unification_helper(state)
 
-    return solutions
+    return [substs.to_idempotent() for substs in solutions]
+
 
+variable_counter = 0
 
-variable_counter = 0
\ No newline at end of file
+def fresh_variable(old=None):
+    # Returns a new variable for naming an xor term.
+    # The variable it replaces, if any, is ignored so that
+    # this can be given to a UnificationCache.
+    global variable_counter
+    variable_counter += 1
+    return Variable("N" + str(variable_counter))
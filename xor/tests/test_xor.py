@@ -1,5 +1,9 @@
 from symcollab.xor import *
+from symcollab.xor.structure import Equations, Zero
+from symcollab.xor.xor import Xor, XorTerm
+from symcollab.xor.xorhelper import XOR_unification_report, xor_unification
 from symcollab.algebra import *
+from copy import deepcopy
 import unittest
 
 class TestXor(unittest.TestCase):
@@ -12,5 +16,82 @@ class TestXor(unittest.TestCase):
         z = Variable("z")
         self.assertEqual(xor(a, b, x, x, y, a, c), xor(xor(b, y), c))
 
+    def test_normal_form(self):
+        f = Function("f", 1)
+        a = Constant("a")
+        b = Constant("b")
+        x = Variable("x")
+        t = xor(a, xor(f(x), b))
+        self.assertEqual(t.arguments, xor(b, f(x), a).arguments)
+        self.assertEqual(hash(t), hash(xor(f(x), xor(b, a))))
+        self.assertEqual(xor(t, a, f(x)), b)
+        self.assertEqual(xor(x, x), Zero())
+        parser = Parser()
+        for symbol in (f, xor, a, b, x):
+            parser.add(symbol)
+        self.assertEqual(parser.parse("xor(a, f(x), b)"), t)
+
+    def test_substitution(self):
+        b = Constant("b")
+        c = Constant("c")
+        x = Variable("x")
+        # Substitutions keep the structure of the term, and xor normalizes it again
+        sigma = SubstituteTerm()
+        sigma.add(x, c)
+        t = xor(x, b) * sigma
+        self.assertIsInstance(t, XorTerm)
+        self.assertEqual(t.arguments, (c, b))
+        self.assertEqual(xor(t), xor(b, c))
+        self.assertEqual(hash(xor(t)), hash(xor(b, c)))
+        sigma = SubstituteTerm()
+        sigma.add(x, b)
+        self.assertEqual((xor(x, b) * sigma).arguments, (b, b))
+        self.assertEqual(xor(xor(x, b) * sigma), Zero())
+        with TermStore() as store:
+            t = xor(x, b)
+            self.assertIsInstance(t, XorTerm)
+            self.assertIs(t, xor(b, x))
+        self.assertIs(store.intern(xor(x, b)), t)
+
+    def test_sort(self):
+        a = Constant("a")
+        b = Constant("b")
+        c = Constant("c")
+        t = xor(a, b, c)
+        t.sort = Sort("S")
+        self.assertIsInstance(t.function, Xor)
+        self.assertEqual(t.sort, Sort("S"))
+        self.assertEqual(xor.range_sort, None)
+        self.assertEqual(xor(t, a), xor(b, c))
+        self.assertEqual(t.function(a, a, b), b)
+        self.assertEqual(deepcopy(t), t)
+
+class TestXorUnification(unittest.TestCase):
+    def test_linear(self):
+        f = Function("f", 1)
+        a = Constant("a")
+        b = Constant("b")
+        x = Variable("x")
+        y = Variable("y")
+        report = XOR_unification_report()
+        unifiers = xor_unification(Equations([Equation(xor(x, y), a), Equation(xor(y, f(b)), x)]), report)
+        self.assertEqual(report.path, "gaussian")
+        self.assertEqual((report.variables, report.atoms, report.rank), (2, 2, 1))
+        self.assertEqual(len(unifiers), 0)
+        unifiers = xor_unification(Equations([Equation(xor(x, y), a), Equation(xor(y, f(b)), Zero())]), report)
+        self.assertEqual(len(unifiers), 1)
+        self.assertEqual(x * unifiers[0], xor(a, f(b)))
+        self.assertEqual(y * unifiers[0], f(b))
+
+    def test_rules(self):
+        f = Function("f", 1)
+        x = Variable("x")
+        y = Variable("y")
+        report = XOR_unification_report()
+        unifiers = xor_unification(Equations([Equation(xor(f(x), f(y)), Zero())]), report)
+        self.assertEqual(report.path, "rules")
+        self.assertEqual(len(unifiers), 1)
+        self.assertEqual(x * unifiers[0], y * unifiers[0])
+
 if __name__ == "__main__":
     unittest.main()